@@ -9,6 +9,9 @@ from app.clients.jira_client import JiraClient
 from app.clients.llm_client import LLMClient
 from app.services.impact_analyzer import ImpactAnalyzer
 from app.services.jql_builder import build_jql
+from app.services.jira_catalog import JiraTestCatalog
+from app.services.test_search import TermSearchCache, as_test, catalog_search, combined_search, preferred
+from app.config import settings
 from app.agent.report import build_report, summarize_changes
 
 
@@ -16,9 +19,13 @@ _gl = GitLabClient()
 _jira = JiraClient()
 _llm = LLMClient()
 _impact = ImpactAnalyzer(_gl._client)
+_term_cache = TermSearchCache.from_settings()
+_catalog = JiraTestCatalog.from_settings()
 
 # Helpers
 
+_NO_DIFFS = "No diffs found for the given MR."
+
 
 def _append_error(state: dict, msg: str) -> dict:
     errs = list(state.get("errors") or [])
@@ -28,10 +35,18 @@ def _append_error(state: dict, msg: str) -> dict:
 # Nodes
 def get_merge_request_diff(state: dict) -> dict:
     try:
-        mr_details = _gl.get_mr_changes(state["gitlab_project_id"], state["gitlab_mr_id"])
-        if not mr_details.get("changes"):
-            return {"merge_request_diffs": [], **_append_error(state, "No diffs found for the given MR.")}
-        return {"merge_request_diffs": mr_details.get("changes"), "mr_web_url": mr_details.get("web_url")}
+        snapshot = _gl.get_mr_snapshot(state["gitlab_project_id"], state["gitlab_mr_id"])
+        if snapshot.paginated:
+            # Diffs stream during impact analysis, which fills in the file list and count.
+            return {"merge_request_diffs": [], "mr_web_url": snapshot.web_url, "mr_snapshot": snapshot}
+        if not snapshot.changes:
+            return {"merge_request_diffs": [], "mr_snapshot": snapshot, **_append_error(state, _NO_DIFFS)}
+        return {
+            "merge_request_diffs": snapshot.changes,
+            "merge_request_diff_count": snapshot.total_changes,
+            "mr_web_url": snapshot.web_url,
+            "mr_snapshot": snapshot,
+        }
     except Exception as e:
         return _append_error(state, f"GitLab diff error: {e}")
     
@@ -84,7 +99,21 @@ def get_issue_details(state: dict) -> dict:
     
 def get_impacted_code_entities(state: dict) -> dict:
     try:
-        impacted = _impact.get_impacted_code_areas(state["gitlab_project_id"], state["gitlab_mr_id"]) or {}
+        snapshot = state.get("mr_snapshot")
+        impacted = _impact.get_impacted_code_areas(
+            state["gitlab_project_id"], state["gitlab_mr_id"], snapshot=snapshot
+        ) or {}
+        if snapshot is not None and snapshot.paginated:
+            # Metadata only; the diff text was dropped as each page was analyzed. A capped
+            # analysis stops paging early, so `files` can hold fewer diffs than the MR has.
+            update = {
+                "impacted_code_entities": impacted,
+                "merge_request_diffs": snapshot.files,
+                "merge_request_diff_count": snapshot.total_changes,
+            }
+            if not snapshot.files and not snapshot.total_changes:
+                update.update(_append_error(state, _NO_DIFFS))
+            return update
         return {"impacted_code_entities": impacted}
     except Exception as e:
         return _append_error(state, f"Impact analyzer error: {e}")
@@ -102,7 +131,7 @@ def summarize_for_keywords(state: dict) -> dict:
     else:
         jql_terms = _heuristic_keywords(diffs, impacted)
 
-    changes_summary = summarize_changes(diffs) if diffs else "No changes."
+    changes_summary = summarize_changes(diffs, state.get("merge_request_diff_count")) if diffs else "No changes."
 
     return {
         "keywords": jql_terms,                 
@@ -171,9 +200,15 @@ def find_jira_tests(state: dict) -> dict:
     keywords = state.get("keywords") or []
     jql, _meta = build_jql(project, component, keywords)
     try:
-        start = 0
-        page = _jira.search_jql(jql, start_at=start, max_results=50)
-        issues = page.get("issues", []) or []
+        issues = None
+        if _catalog is not None and _catalog.ready(_jira.search_jql, project):
+            try:
+                issues = _catalog.search(project, component, keywords, limit=50)
+            except Exception:
+                issues = None  # fall back to live JQL
+        if issues is None:
+            page = _jira.search_jql(jql, start_at=0, max_results=50)
+            issues = page.get("issues", []) or []
         tests: list[dict] = []
         for it in issues:
             fields = it.get("fields", {}) or {}
@@ -191,8 +226,6 @@ def find_jira_tests(state: dict) -> dict:
         return _append_error(state, f"Jira JQL error: {e}")
 
 
-PREFERRED_TYPES = {"test", "qa test", "xray test", "manual test", "automated test"}
-
 def _terms_from_category(cat: dict) -> list[str]:
     """Pull top terms from the category payload (from LLM or heuristic)."""
     terms = []
@@ -217,36 +250,44 @@ def find_jira_tests_by_category(state: dict) -> dict:
     if not cats:
         return find_jira_tests(state)
 
+    named = [(cat.get("name") or "uncategorized", _terms_from_category(cat)) for cat in cats]
+    named = [(cname, terms) for cname, terms in named if terms]
+    if _catalog is not None and named and _catalog.ready(_jira.search_jql, project):
+        try:
+            flat, buckets = catalog_search(_catalog, project, component, named)
+            return {"jira_tests": flat, "jira_tests_by_category": buckets}
+        except Exception:
+            pass  # fall back to live JQL
+
+    if settings.JIRA_COMBINED_TEST_SEARCH and named:
+        flat, buckets = combined_search(
+            _jira.search_jql, project, component, named,
+            max_terms=settings.JIRA_COMBINED_MAX_TERMS,
+            max_results=settings.JIRA_COMBINED_MAX_RESULTS,
+            term_cache=_term_cache,
+        )
+        return {"jira_tests": flat, "jira_tests_by_category": buckets}
+
     buckets: dict[str, dict] = {}
     flat: list[dict] = []
     seen_keys: set[str] = set()
 
-    for cat in cats:
-        cname = cat.get("name") or "uncategorized"
-        terms = _terms_from_category(cat)
-        if not terms:
-            continue
-
+    for cname, terms in named:
         jql, _ = build_jql(project, component, terms)
 
         try:
-            page = _jira.search_jql(jql, start_at=0, max_results=20)
-            issues = page.get("issues", []) or []
+            if _term_cache is not None:
+                issues = _term_cache.issues(_jira.search_jql, project, component, terms, max_results=20)
+            else:
+                page = _jira.search_jql(jql, start_at=0, max_results=20)
+                issues = page.get("issues", []) or []
         except Exception as e:
             buckets[cname] = {"terms_used": terms, "jql": jql, "tests": [], "error": str(e)}
             continue
 
         items = []
         for it in issues:
-            fields = it.get("fields", {}) or {}
-            issuetype = (fields.get("issuetype") or {}).get("name", "")
-            components = [c.get("name") for c in (fields.get("components") or [])]
-            item = {
-                "key": it.get("key"),
-                "summary": fields.get("summary"),
-                "issuetype": issuetype,
-                "components": components,
-            }
+            item = as_test(it)
             items.append(item)
 
             k = item["key"]
@@ -254,9 +295,7 @@ def find_jira_tests_by_category(state: dict) -> dict:
                 seen_keys.add(k)
                 flat.append(item)
 
-        filtered = [t for t in items if (t.get("issuetype") or "").lower() in PREFERRED_TYPES] or items
-
-        buckets[cname] = {"terms_used": terms, "jql": jql, "tests": filtered}
+        buckets[cname] = {"terms_used": terms, "jql": jql, "tests": preferred(items)}
 
     return {
         "jira_tests": flat,                    
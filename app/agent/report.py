@@ -1,4 +1,4 @@
-def summarize_changes(diffs: list[dict]) -> str:
+def summarize_changes(diffs: list[dict], total: int | None = None) -> str:
     added = deleted = modified = renamed = 0
     la = lr = 0
     files: list[str] = []
@@ -12,8 +12,10 @@ def summarize_changes(diffs: list[dict]) -> str:
         if not (d.get("new_file") or d.get("deleted_file") or d.get("renamed_file")):
             modified += 1
     files_list = "\n".join(f"- {f}" for f in sorted(set(files)) if f)
+    listed = len(set(files))
+    count = f"{listed} of {total}" if total and total > len(diffs) else str(listed)
     return (
-        f"Files: {len(set(files))} (added {added}, deleted {deleted}, renamed {renamed}, modified {modified})\n"
+        f"Files: {count} (added {added}, deleted {deleted}, renamed {renamed}, modified {modified})\n"
         f"Touched files:\n{files_list}"
     )
 
@@ -22,7 +24,8 @@ def build_report(state: dict) -> str:
     issue = state.get("jira_issue_details") or {}
     diffs = state.get("merge_request_diffs") or []
     tests = state.get("jira_tests") or []
-    changes_block = f"```\n{state.get('code_changes_summary') or summarize_changes(diffs)}\n```"
+    summary = state.get("code_changes_summary") or summarize_changes(diffs, state.get("merge_request_diff_count"))
+    changes_block = f"```\n{summary}\n```"
     keywords_line = ", ".join(state.get("keywords") or []) or "_-_"
 
 
@@ -1,6 +1,7 @@
 from typing import Optional
 from langgraph.graph import MessagesState
 
+from app.clients.gitlab_client import MergeRequestSnapshot
 from app.schemas.functional_category import FunctionalCategory
 
 
@@ -10,8 +11,10 @@ class AgentState(MessagesState):
     gitlab_mr_id: str
 
 
+    mr_snapshot: Optional[MergeRequestSnapshot] = None
     mr_web_url: Optional[str] = None
     merge_request_diffs: Optional[list[dict]] = None
+    merge_request_diff_count: Optional[int] = None
     jira_issue_details: Optional[dict] = None
     impacted_code_entities: Optional[dict] = None
 
@@ -3,6 +3,7 @@ import uuid
 from fastapi import APIRouter
 
 from app.agent.graph import agent
+from app.metrics import metrics
 from .schemas import AnalyzeRequest, AnalyzeResponse
 
 router = APIRouter()
@@ -22,3 +23,8 @@ async def analyze(req: AnalyzeRequest):
         status="completed",
         analysis=result.get("jira_comment_body"),
     )
+
+
+@router.get("/metrics")
+async def get_metrics():
+    return metrics.snapshot()
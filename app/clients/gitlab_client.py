@@ -1,19 +1,162 @@
 from __future__ import annotations
+from functools import partial
+from typing import Any, Callable, Iterable, Iterator
+
 import gitlab
-# from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
-from httpx import HTTPError
+from gitlab.utils import EncodedId
+from app.clients import transport
 from app.config import settings
 
 
+class MergeRequestSnapshot:
+    """Everything a run needs from one merge request, fetched once and shared by all graph nodes.
+
+    Exposes the same attribute names as python-gitlab's ProjectMergeRequest (`diff_refs`, `sha`,
+    `source_branch`, `target_branch`, `web_url`), so it can stand in for the MR object.
+
+    A paginated snapshot has `changes=None` and streams its diffs page by page through
+    `iter_changes()`; `files` then collects each streamed entry's metadata without the diff text.
+    `total_changes` counts every diff of the MR, including those a capped analysis never read;
+    for a paginated snapshot it comes from GitLab's `X-Total` header, or from the stream once it
+    has been read to the end, and is None until then.
+    """
+
+    __slots__ = (
+        "project_id",
+        "iid",
+        "title",
+        "web_url",
+        "source_branch",
+        "target_branch",
+        "sha",
+        "diff_refs",
+        "references",
+        "changes",
+        "files",
+        "total_changes",
+        "_pages",
+    )
+
+    def __init__(
+        self,
+        project_id: str | int,
+        iid: str | int,
+        *,
+        title: str | None = None,
+        web_url: str | None = None,
+        source_branch: str | None = None,
+        target_branch: str | None = None,
+        sha: str | None = None,
+        diff_refs: dict[str, str] | None = None,
+        references: dict[str, str] | None = None,
+        changes: list[dict[str, Any]] | None = None,
+        pages: Callable[[], Iterator[dict[str, Any]]] | None = None,
+    ):
+        self.project_id = project_id
+        self.iid = iid
+        self.title = title
+        self.web_url = web_url
+        self.source_branch = source_branch
+        self.target_branch = target_branch
+        self.sha = sha
+        self.diff_refs = diff_refs or {}
+        self.references = references or {}
+        self.changes = changes if changes is not None or pages is not None else []
+        self.files: list[dict[str, Any]] = [diff_metadata(entry) for entry in self.changes or ()]
+        self.total_changes: int | None = None if self.changes is None else len(self.changes)
+        self._pages = pages
+
+    @property
+    def paginated(self) -> bool:
+        return self.changes is None
+
+    def iter_changes(self, source: Iterable[dict[str, Any]] | None = None) -> Iterator[dict[str, Any]]:
+        """Yield diff entries; a paginated snapshot fetches the next page only when the last one is consumed.
+
+        A paginated snapshot can read its diffs from `source` instead (e.g. a local mirror).
+        """
+        if self.changes is not None:
+            yield from self.changes
+            return
+        self.files = []
+        stream = source if source is not None else self._pages()
+        self.total_changes = getattr(stream, "total", None)
+        for entry in stream:
+            self.files.append(diff_metadata(entry))
+            yield entry
+        self.total_changes = len(self.files)
+
+
+def diff_metadata(entry: dict[str, Any]) -> dict[str, Any]:
+    return {key: value for key, value in entry.items() if key != "diff"}
+
+
+def iter_mr_diffs(
+    gl: gitlab.Gitlab, project_id: str | int, mr_iid: str | int, per_page: int | None = None
+) -> gitlab.GitlabList:
+    """Stream `/projects/:id/merge_requests/:iid/diffs`, one page in memory at a time.
+
+    The first page is requested right away; the returned list's `total` is the MR's diff count.
+    """
+    path = f"/projects/{EncodedId(project_id)}/merge_requests/{mr_iid}/diffs"
+    return gl.http_list(path, iterator=True, per_page=per_page or settings.GITLAB_DIFFS_PER_PAGE)
+
+
+def fetch_mr_snapshot(
+    gl: gitlab.Gitlab, project_id: str | int, mr_id: str | int, paginated: bool | None = None
+) -> MergeRequestSnapshot:
+    """One MR GET plus the diffs; the project is never fetched (`lazy=True`).
+
+    Diffs come from one changes() call, or stream from the paginated diffs endpoint when
+    `paginated` (default: GITLAB_PAGINATED_DIFFS), which GitLab neither truncates nor times out on.
+    """
+    if paginated is None:
+        paginated = settings.GITLAB_PAGINATED_DIFFS
+    mr = gl.projects.get(project_id, lazy=True).mergerequests.get(mr_id)
+    iid = getattr(mr, "iid", mr_id)
+    changes = None if paginated else mr.changes().get("changes", [])
+    return MergeRequestSnapshot(
+        project_id,
+        iid,
+        title=getattr(mr, "title", None),
+        web_url=getattr(mr, "web_url", None),
+        source_branch=getattr(mr, "source_branch", None),
+        target_branch=getattr(mr, "target_branch", None),
+        sha=getattr(mr, "sha", None),
+        diff_refs=getattr(mr, "diff_refs", None),
+        references=getattr(mr, "references", None),
+        changes=changes,
+        pages=partial(iter_mr_diffs, gl, project_id, iid) if paginated else None,
+    )
+
+
+class _Gitlab(gitlab.Gitlab):
+    """python-gitlab with its own 429 handling off.
+
+    `http_request` otherwise sleeps and retries a 429 up to 10 times on top of the shared
+    transport, which already paces and retries rate-limited requests per host.
+    """
+
+    def http_request(self, *args: Any, obey_rate_limit: bool = False, **kwargs: Any):
+        return super().http_request(*args, obey_rate_limit=False, **kwargs)
+
+
 class GitLabClient:
     def __init__(self):
-        self._client = gitlab.Gitlab(str(settings.GITLAB_URL), private_token=settings.GITLAB_TOKEN.get_secret_value())
+        self._client = _Gitlab(
+            str(settings.GITLAB_URL),
+            private_token=settings.GITLAB_TOKEN.get_secret_value(),
+            timeout=settings.HTTP_TIMEOUT_SECS,
+            retry_transient_errors=False,  # the shared transport retries, within the global retry budget
+        )
+        # Pooled, budgeted retries; with HTTP_CACHE_ENABLED, repeated runs also revalidate MR
+        # metadata and files with ETags instead of downloading them again.
+        self.http = transport.mount(self._client.session, str(settings.GITLAB_URL))
     # Optional: self._client.session.verify = certifi.where()
 
+    def get_mr_snapshot(self, project_id: str, mr_id: str) -> MergeRequestSnapshot:
+        return fetch_mr_snapshot(self._client, project_id, mr_id)
 
-    # @retry(reraise=True, stop=stop_after_attempt(4), wait=wait_exponential(multiplier=0.5, max=8), retry=retry_if_exception_type((HTTPError, gitlab.GitlabError)))
     def get_mr_changes(self, project_id: str, mr_id: str) -> dict:
-        mr = self._client.projects.get(project_id).mergerequests.get(mr_id)
-        web_url = mr.web_url
-        summary = mr.changes()
-        return {"web_url": web_url, "changes": summary.get("changes", [])}
\ No newline at end of file
+        snapshot = self.get_mr_snapshot(project_id, mr_id)
+        return {"web_url": snapshot.web_url, "changes": list(snapshot.iter_changes())}
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+import httpx
+
+from app.clients.transport import IDEMPOTENT_METHODS, build_httpx_client
+from app.config import settings
+from app.metrics import metrics
+
+BLOBS_QUERY = """
+query($fullPath: ID!, $ref: String!, $paths: [String!]!) {
+  project(fullPath: $fullPath) {
+    repository {
+      blobs(ref: $ref, paths: $paths) {
+        nodes { path rawTextBlob }
+      }
+    }
+  }
+}
+"""
+
+
+class BlobBatchFetcher:
+    """Fetch many files of one ref through GitLab GraphQL (`repository.blobs`), a chunk of paths per request.
+
+    Paths the response does not carry (missing, binary, or the request failed) are simply absent
+    from the result; callers fall back to per-file REST reads for those.
+    """
+
+    def __init__(
+        self,
+        graphql_url: str,
+        token: str,
+        *,
+        batch_size: int = 50,
+        timeout: float = 30.0,
+        client: httpx.Client | None = None,
+    ):
+        self.graphql_url = graphql_url
+        self.batch_size = max(1, batch_size)
+        # The blobs query only reads, so its POSTs may be retried like GETs.
+        self._client = client or build_httpx_client(
+            graphql_url,
+            retry_methods=IDEMPOTENT_METHODS | {"POST"},
+            timeout=timeout,
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+    @classmethod
+    def from_settings(cls) -> BlobBatchFetcher:
+        url = settings.GITLAB_GRAPHQL_URL or f"{str(settings.GITLAB_URL).rstrip('/')}/api/graphql"
+        return cls(
+            url,
+            settings.GITLAB_TOKEN.get_secret_value(),
+            batch_size=settings.GITLAB_BLOB_BATCH_SIZE,
+            timeout=settings.HTTP_TIMEOUT_SECS,
+        )
+
+    def fetch(self, full_path: str, ref: str, paths: Iterable[str]) -> dict[str, str]:
+        """Return {path: text} for the paths found at `ref`."""
+        unique = list(dict.fromkeys(p for p in paths if p))
+        found: dict[str, str] = {}
+        for start in range(0, len(unique), self.batch_size):
+            chunk = unique[start:start + self.batch_size]
+            try:
+                nodes = self._query(full_path, ref, chunk)
+            except (httpx.HTTPError, ValueError, KeyError, TypeError) as e:
+                metrics.incr("gitlab.blob_batch.failures", reason=type(e).__name__)
+                continue
+            metrics.incr("gitlab.blob_batch.requests")
+            for node in nodes:
+                text = node.get("rawTextBlob")
+                if node.get("path") in chunk and text is not None:
+                    found[node["path"]] = text.lstrip('\ufeff')
+        metrics.incr("gitlab.blob_batch.hits", len(found))
+        metrics.incr("gitlab.blob_batch.misses", len(unique) - len(found))
+        return found
+
+    def _query(self, full_path: str, ref: str, paths: list[str]) -> list[dict[str, Any]]:
+        response = self._client.post(
+            self.graphql_url,
+            json={"query": BLOBS_QUERY, "variables": {"fullPath": full_path, "ref": ref, "paths": paths}},
+        )
+        response.raise_for_status()
+        body = response.json()
+        if body.get("errors"):
+            raise ValueError(body["errors"][0].get("message", "GraphQL error"))
+        project = (body.get("data") or {}).get("project")
+        if not project:
+            return []
+        return ((project.get("repository") or {}).get("blobs") or {}).get("nodes") or []
+
+    def close(self) -> None:
+        self._client.close()
@@ -0,0 +1,160 @@
+"""Local stand-in for the GitLab endpoints the impact analyzer reads files through.
+
+Serves the GraphQL `repository.blobs` query (`POST /api/graphql`) and the REST file reads
+(`GET /api/v4/projects/:id/repository/files/:path[/raw]?ref=`) from an in-memory store, and counts
+requests per endpoint so tests can assert how many round trips an analysis took.
+
+    with GitLabStubServer({("group/app", "main", "src/a.py"): "x = 1\n"}) as server:
+        fetcher = BlobBatchFetcher(server.graphql_url, "token")
+
+Run `python -m app.clients.gitlab_stub_server files.json` to serve a JSON list of
+`{"project": ..., "ref": ..., "path": ..., "content": ...}` entries on a fixed port.
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, unquote, urlparse
+
+
+class GitLabStubServer:
+    def __init__(self, files: dict[tuple[str, str, str], str] | None = None, host: str = "127.0.0.1", port: int = 0):
+        # Keyed by (project full path or id, ref, file path).
+        self.files: dict[tuple[str, str, str], str] = dict(files or {})
+        self.requests: Counter[str] = Counter()
+        # When set, GraphQL requests answer with this top-level error instead of data.
+        self.graphql_error: str | None = None
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def graphql_url(self) -> str:
+        return f"{self.url}/api/graphql"
+
+    def add(self, project: str | int, ref: str, path: str, content: str) -> None:
+        self.files[(str(project), ref, path)] = content
+
+    def start(self) -> GitLabStubServer:
+        self._thread = threading.Thread(target=self._server.serve_forever, name="gitlab-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> GitLabStubServer:
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def _blobs(self, variables: dict[str, Any]) -> dict[str, Any]:
+        project, ref = str(variables.get("fullPath")), variables.get("ref")
+        nodes = [
+            {"path": path, "rawTextBlob": self.files[(project, ref, path)]}
+            for path in variables.get("paths") or []
+            if (project, ref, path) in self.files
+        ]
+        return {"data": {"project": {"repository": {"blobs": {"nodes": nodes}}}}}
+
+    def _file(self, project: str, path: str, ref: str) -> dict[str, Any] | None:
+        content = self.files.get((project, ref, path))
+        if content is None:
+            return None
+        data = content.encode("utf-8")
+        return {
+            "file_path": path,
+            "file_name": path.rsplit("/", 1)[-1],
+            "ref": ref,
+            "size": len(data),
+            "encoding": "base64",
+            "content": base64.b64encode(data).decode("ascii"),
+        }
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def _reply(self, status: int, body: Any) -> None:
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self) -> None:
+                if urlparse(self.path).path != "/api/graphql":
+                    return self._reply(404, {"message": "404 Not Found"})
+                stub.requests["graphql"] += 1
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                if stub.graphql_error:
+                    return self._reply(200, {"data": None, "errors": [{"message": stub.graphql_error}]})
+                self._reply(200, stub._blobs(payload.get("variables") or {}))
+
+            def do_GET(self) -> None:
+                url = urlparse(self.path)
+                parts = url.path.split("/")
+                # /api/v4/projects/<id>/repository/files/<path>[/raw]
+                raw = len(parts) == 9 and parts[8] == "raw"
+                if (len(parts) == 8 or raw) and parts[1:4] == ["api", "v4", "projects"] and parts[5:7] == ["repository", "files"]:
+                    ref = (parse_qs(url.query).get("ref") or [""])[0]
+                    project, path = unquote(parts[4]), unquote(parts[7])
+                    if raw:
+                        stub.requests["files_raw"] += 1
+                        content = stub.files.get((project, ref, path))
+                        if content is None:
+                            return self._reply(404, {"message": "404 File Not Found"})
+                        data = content.encode("utf-8")
+                        self.send_response(200)
+                        self.send_header("Content-Type", "text/plain; charset=utf-8")
+                        self.send_header("Content-Length", str(len(data)))
+                        self.end_headers()
+                        self.wfile.write(data)
+                        return
+                    stub.requests["files"] += 1
+                    found = stub._file(project, path, ref)
+                    if found is None:
+                        return self._reply(404, {"message": "404 File Not Found"})
+                    return self._reply(200, found)
+                self._reply(404, {"message": "404 Not Found"})
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve GitLab file reads from a JSON fixture.")
+    parser.add_argument("fixture", help="JSON list of {project, ref, path, content}")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8929)
+    args = parser.parse_args()
+
+    with open(args.fixture, "r", encoding="utf-8") as fh:
+        entries = json.load(fh)
+    server = GitLabStubServer(host=args.host, port=args.port)
+    for entry in entries:
+        server.add(entry["project"], entry["ref"], entry["path"], entry["content"])
+    print(f"GitLab stub listening on {server.url}", flush=True)
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
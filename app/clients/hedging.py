@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, TypeVar
+
+from app.config import settings
+from app.metrics import metrics
+
+T = TypeVar("T")
+
+
+class HedgedCalls:
+    """Run a blocking call and, if it is still pending after a latency-percentile threshold,
+    start a duplicate and return whichever finishes first.
+
+    The threshold is the `percentile` of recent successful call latencies, never below
+    `min_delay_secs`; until `min_samples` latencies are known no call is hedged. Hedges are
+    capped at `max_rate` of the recent calls, so a slow backend is not hit twice as hard.
+    A running thread cannot be interrupted: the losing call is cancelled when it has not
+    started yet, otherwise its result is dropped when it completes.
+
+    Latencies are measured from submission, so time spent queued counts as it does for the
+    hedge delay. When every worker is busy, the call runs on the caller's thread unhedged: a
+    hedge would only queue behind the same backlog, and the pool never caps the callers' own
+    concurrency.
+    """
+
+    def __init__(
+        self,
+        *,
+        percentile: float = 95.0,
+        min_delay_secs: float = 0.05,
+        max_rate: float = 0.05,
+        min_samples: int = 20,
+        window: int = 512,
+        max_workers: int = 16,
+        name: str = "hedge",
+    ):
+        self.percentile = min(100.0, max(0.0, percentile))
+        self.min_delay_secs = max(0.0, min_delay_secs)
+        self.max_rate = max(0.0, max_rate)
+        self.min_samples = max(1, min_samples)
+        self.name = name  # metrics prefix
+        self._latencies: deque[float] = deque(maxlen=max(1, window))
+        self._hedged: deque[bool] = deque(maxlen=max(1, window))  # per recent call: was it hedged
+        self._lock = threading.Lock()
+        self.max_workers = max(2, max_workers)
+        self._outstanding = 0  # calls submitted to the pool and not finished yet
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=name)
+
+    @classmethod
+    def from_settings(cls, name: str = "gitlab.hedge") -> HedgedCalls:
+        return cls(
+            percentile=settings.HEDGE_PERCENTILE,
+            min_delay_secs=settings.HEDGE_MIN_DELAY_MS / 1000,
+            max_rate=settings.HEDGE_MAX_RATE,
+            min_samples=settings.HEDGE_MIN_SAMPLES,
+            max_workers=settings.HEDGE_MAX_WORKERS,
+            name=name,
+        )
+
+    def threshold(self) -> float | None:
+        """Seconds to wait before hedging; None while there are too few samples."""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, max(0, math.ceil(self.percentile / 100 * len(ordered)) - 1))
+        return max(self.min_delay_secs, ordered[index])
+
+    def call(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        if not self._claim():
+            metrics.incr(f"{self.name}.saturated")
+            self._record_call(hedged=False)
+            return self._timed(fn, args, kwargs, time.perf_counter())
+        primary = self._submit(fn, args, kwargs)
+        delay = self.threshold()
+        if delay is not None:
+            metrics.set_gauge(f"{self.name}.threshold_secs", delay)
+            done, _ = wait([primary], timeout=delay)
+            if not done:
+                if not self._claim():
+                    # A hedge would only queue behind the backlog that is slowing the primary.
+                    metrics.incr(f"{self.name}.saturated")
+                elif self._reserve_hedge():
+                    return self._race(primary, self._submit(fn, args, kwargs))
+                else:
+                    self._release()
+        self._record_call(hedged=False)
+        return primary.result()
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _race(self, primary: Future, hedge: Future) -> T:
+        metrics.incr(f"{self.name}.issued")
+        pending = {primary, hedge}
+        error: BaseException | None = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    if future is hedge:
+                        metrics.incr(f"{self.name}.won")
+                    return future.result()
+                error = error or future.exception()
+        raise error
+
+    def _submit(self, fn: Callable[..., T], args: tuple, kwargs: dict) -> Future:
+        """Run `fn` on the pool; the caller has claimed its slot."""
+        future = self._pool.submit(self._timed, fn, args, kwargs, time.perf_counter())
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    def _timed(self, fn: Callable[..., T], args: tuple, kwargs: dict, submitted: float) -> T:
+        result = fn(*args, **kwargs)
+        with self._lock:
+            self._latencies.append(time.perf_counter() - submitted)
+        return result
+
+    def _claim(self) -> bool:
+        """Reserve an idle worker; False when every worker is busy."""
+        with self._lock:
+            if self._outstanding >= self.max_workers:
+                return False
+            self._outstanding += 1
+            return True
+
+    def _release(self) -> None:
+        with self._lock:
+            self._outstanding -= 1
+
+    def _reserve_hedge(self) -> bool:
+        with self._lock:
+            recent = max(len(self._hedged), self.min_samples)
+            if sum(self._hedged) + 1 > self.max_rate * recent:
+                suppressed = True
+            else:
+                self._hedged.append(True)
+                suppressed = False
+        if suppressed:
+            metrics.incr(f"{self.name}.suppressed")
+        return not suppressed
+
+    def _record_call(self, hedged: bool) -> None:
+        with self._lock:
+            self._hedged.append(hedged)
@@ -0,0 +1,214 @@
+"""Conditional-request cache for the `requests` sessions behind the GitLab and Jira clients.
+
+`CachingAdapter` is mounted on a session in front of the shared transport
+(`app.clients.transport.mount`). GET responses
+that carry a validator (`ETag` / `Last-Modified`) are kept in a byte-bounded LRU. Within
+the TTL of the endpoint's class they are served without any request; after it, the request is
+sent with `If-None-Match` / `If-Modified-Since` and a `304 Not Modified` is answered from the
+cache. Endpoint classes are matched on the URL path (`HTTP_CACHE_TTLS` overrides their TTLs),
+and every lookup is counted per class so hit rates show up in `GET /metrics`.
+"""
+from __future__ import annotations
+
+import io
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from app.config import settings
+from app.metrics import metrics
+
+# (endpoint class, URL pattern, default TTL in seconds); the first match wins. A TTL of 0
+# means "always revalidate". Content addressed by a commit sha never changes, so it is
+# served from memory for a long time.
+DEFAULT_ENDPOINTS: list[tuple[str, str, float]] = [
+    ("gitlab.file_at_commit", r"/repository/(?:files/[^?]+|blobs/[^/?]+)(?:/raw)?\?(?:.*&)?ref=[0-9a-f]{40}(?:&|$)", 86400.0),
+    ("gitlab.file", r"/repository/files/", 0.0),
+    ("gitlab.merge_request_diffs", r"/merge_requests/\d+/(?:changes|diffs)", 0.0),
+    ("gitlab.merge_request", r"/merge_requests/\d+(?:\?|$)", 0.0),
+    ("gitlab.project", r"/api/v4/projects/[^/?]+(?:\?|$)", 60.0),
+    ("jira.epic", r"/rest/agile/[^/]+/epic/", 30.0),
+    ("jira.issue", r"/rest/api/[^/]+/issue/[^/?]+(?:\?|$)", 0.0),
+]
+_STORED_HEADERS = ("Content-Type", "Content-Encoding", "ETag", "Last-Modified", "X-Total", "X-Total-Pages", "X-Next-Page", "Link")
+
+
+class _Entry:
+    __slots__ = ("status", "headers", "body", "etag", "last_modified", "stored_at")
+
+    def __init__(self, status: int, headers: dict[str, str], body: bytes, etag: str | None, last_modified: str | None):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = time.monotonic()
+
+
+class ResponseCache:
+    """Byte-bounded LRU of GET responses keyed by URL."""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max(0, max_bytes)
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> _Entry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, entry: _Entry) -> None:
+        size = len(entry.body)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.body)
+            self._entries[key] = entry
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.body)
+                metrics.incr("http_cache.evictions")
+            metrics.set_gauge("http_cache.bytes", self._bytes)
+
+    def touch(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.stored_at = time.monotonic()
+
+
+class CachingAdapter(HTTPAdapter):
+    """HTTPAdapter that answers GETs from a ResponseCache, revalidating with conditional requests."""
+
+    def __init__(
+        self,
+        cache: ResponseCache | None = None,
+        *,
+        ttls: dict[str, float] | None = None,
+        max_entry_bytes: int = 2 * 1024 * 1024,
+        transport: HTTPAdapter | None = None,
+        **kwargs: Any,
+    ):
+        super().__init__(**kwargs)
+        self.transport = transport  # adapter that actually sends; this one when None
+        self.cache = cache or ResponseCache()
+        self.max_entry_bytes = max_entry_bytes
+        overrides = ttls or {}
+        self.endpoints = [
+            (name, re.compile(pattern), float(overrides.get(name, ttl)))
+            for name, pattern, ttl in DEFAULT_ENDPOINTS
+        ]
+        self.default_ttl = float(overrides.get("other", 0.0))
+        self._stats: dict[str, list[int]] = {}  # endpoint -> [hits, lookups]
+        self._stats_lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, **kwargs: Any) -> CachingAdapter:
+        return cls(
+            ResponseCache(settings.HTTP_CACHE_MAX_MB * 1024 * 1024),
+            ttls=settings.HTTP_CACHE_TTLS,
+            max_entry_bytes=settings.HTTP_CACHE_MAX_ENTRY_KB * 1024,
+            **kwargs,
+        )
+
+    def send(self, request: requests.PreparedRequest, stream: bool = False, **kwargs: Any) -> requests.Response:
+        if request.method != "GET" or "Range" in request.headers:
+            return self._send(request, stream=stream, **kwargs)
+
+        endpoint, ttl = self._classify(request.url or "")
+        key = f"{request.url}\0{request.headers.get('Accept', '')}"
+        entry = self.cache.get(key)
+        if entry is not None and time.monotonic() - entry.stored_at < ttl:
+            self._count(endpoint, "fresh")
+            return self._from_cache(request, entry)
+
+        if entry is not None:
+            if entry.etag:
+                request.headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                request.headers["If-Modified-Since"] = entry.last_modified
+
+        response = self._send(request, stream=stream, **kwargs)
+        if entry is not None and response.status_code == 304:
+            response.close()
+            self.cache.touch(key)
+            self._count(endpoint, "revalidated")
+            return self._from_cache(request, entry)
+
+        self._count(endpoint, "miss")
+        if response.status_code == 200:
+            self._store(key, response)
+        return response
+
+    def close(self) -> None:
+        if self.transport is not None:
+            self.transport.close()
+        super().close()
+
+    def hit_rates(self) -> dict[str, float]:
+        with self._stats_lock:
+            return {name: hits / total for name, (hits, total) in self._stats.items() if total}
+
+    def _send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+        if self.transport is not None:
+            return self.transport.send(request, **kwargs)
+        return super().send(request, **kwargs)
+
+    def _classify(self, url: str) -> tuple[str, float]:
+        for name, pattern, ttl in self.endpoints:
+            if pattern.search(url):
+                return name, ttl
+        return "other", self.default_ttl
+
+    def _store(self, key: str, response: requests.Response) -> None:
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not (etag or last_modified) or "no-store" in response.headers.get("Cache-Control", ""):
+            return
+        length = response.headers.get("Content-Length")
+        # A streamed body is only buffered when its declared size fits an entry; otherwise it
+        # stays a stream and is not cached.
+        if length is None or not length.isdigit() or int(length) > self.max_entry_bytes:
+            return
+        body = response.content
+        headers = {name: response.headers[name] for name in _STORED_HEADERS if name in response.headers}
+        self.cache.put(key, _Entry(response.status_code, headers, body, etag, last_modified))
+
+    def _from_cache(self, request: requests.PreparedRequest, entry: _Entry) -> requests.Response:
+        response = requests.Response()
+        response.status_code = entry.status
+        response.reason = "OK"
+        response.headers = CaseInsensitiveDict(entry.headers)
+        # The stored body is already decoded; the caller must not decode it again.
+        response.headers.pop("Content-Encoding", None)
+        response.headers["Content-Length"] = str(len(entry.body))
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = io.BytesIO(entry.body)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def _count(self, endpoint: str, outcome: str) -> None:
+        metrics.incr("http_cache.requests", endpoint=endpoint, outcome=outcome)
+        with self._stats_lock:
+            stats = self._stats.setdefault(endpoint, [0, 0])
+            stats[0] += outcome != "miss"
+            stats[1] += 1
+            rate = stats[0] / stats[1]
+        metrics.set_gauge("http_cache.hit_rate", round(rate, 4), endpoint=endpoint)
+
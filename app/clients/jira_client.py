@@ -1,6 +1,7 @@
 from __future__ import annotations
 from typing import Optional, Iterable, Dict, Any
 from atlassian import Jira
+from app.clients import transport
 from app.config import settings
 
 TEST_PLAN_ISSUE_TYPE = "Test Plan"
@@ -12,7 +13,9 @@ class JiraClient:
             token=settings.JIRA_API_TOKEN.get_secret_value(),
             username=settings.JIRA_USERNAME,
             cloud=settings.JIRA_IS_CLOUD,
+            timeout=settings.HTTP_TIMEOUT_SECS,
         )
+        self.http = transport.mount(self._jira.session, str(settings.JIRA_INSTANCE_URL))
 
     def get_issue(self, key: str) -> dict:
         return self._jira.issue(key)
@@ -20,7 +23,7 @@ class JiraClient:
     def add_comment(self, issue_key: str, comment: str):
         self._jira.issue_add_comment(issue_key, comment)
 
-    def search_jql(self, jql: str, start_at: int = 0, max_results: int = 50) -> dict:
+    def search_jql(self, jql: str, start_at: int = 0, max_results: int = 50, fields: Optional[list] = None) -> dict:
         """
         Wrapper around the REST search endpoint.
         """
@@ -28,7 +31,7 @@ class JiraClient:
             "jql": jql,
             "startAt": start_at,
             "maxResults": max_results,
-            "fields": ["key", "summary", "issuetype", "status", "components", "description"],
+            "fields": fields or ["key", "summary", "issuetype", "status", "components", "description"],
         }
         # NOTE: library expects path without leading slash
         return self._jira.post("rest/api/2/search", data=payload) or {}
@@ -1,10 +1,9 @@
 from __future__ import annotations
 import json
 from typing import Optional
-import certifi
-import httpx
 from langchain_openai import ChatOpenAI
 from app.schemas.functional_keyword_summary import FunctionalKeywordSummary
+from app.clients.transport import IDEMPOTENT_METHODS, build_httpx_client
 from app.config import settings
 from app.utils.prompts import extract_functional_prompt
 from langchain_core.messages import SystemMessage, HumanMessage
@@ -36,7 +35,12 @@ class LLMClient:
                 base_url=settings.LLM_BASE_URL.__str__(),
                 api_key=settings.LLM_API_KEY.get_secret_value(),
                 temperature=0,
-                http_client=httpx.Client(verify=certifi.where())
+                # The transport is the only retry layer: a completion has no side effects, so its
+                # POST retries like a read, paced and within the shared retry budget.
+                max_retries=0,
+                http_client=build_httpx_client(
+                    str(settings.LLM_BASE_URL), retry_methods=IDEMPOTENT_METHODS | {"POST"}
+                ),
             )
 
 
@@ -71,9 +75,11 @@ class LLMClient:
                 "name": symbol.get("name"),
                 "namespace": symbol.get("namespace"),
                 "containers": symbol.get("qualifiers"),
+                "enclosing": block.get("enclosing"),
                 "signature": symbol.get("signature"),
                 "span": block.get("span"),
                 "changed_lines": block.get("changed_lines"),
+                "removed_lines": block.get("removed_lines"),
                 "code": block.get("snippet"),
             }
 
@@ -93,6 +99,10 @@ class LLMClient:
         summary = impacted_entities.get("summary")
         if summary:
             payload["summary"] = summary
+
+        dependents = impacted_entities.get("dependents")
+        if dependents:
+            payload["dependents"] = dependents
         
         if jira_issue_details:
             js = (jira_issue_details.get("summary") or "")[:MAX_JIRA_SUMMARY_CHARS]
@@ -0,0 +1,134 @@
+"""Per-host adaptive concurrency limits for the shared HTTP transport.
+
+Every host gets one `AdaptiveLimiter`, shared by all clients in the process, so overlapping
+`/analyze` runs together stay under what Jira or GitLab accept. The limit follows AIMD: each
+successful response raises it by about one per `limit` responses, and a `429` (or a `503`
+carrying `Retry-After`) halves it and pauses the host for the `Retry-After` delay. Requests
+over the limit, or sent during a pause, wait in line instead of failing.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Mapping
+
+from app.config import settings
+from app.metrics import metrics
+
+
+class RateLimitWaitTimeout(TimeoutError):
+    """A request waited longer than `HTTP_RATE_LIMIT_MAX_WAIT_SECS` for its host's limiter."""
+
+    def __init__(self, host: str, waited: float):
+        super().__init__(f"waited {waited:.1f}s for a request slot on {host}")
+        self.host = host
+        self.waited = waited
+
+
+def retry_after_secs(headers: Mapping[str, str], cap: float | None = None) -> float | None:
+    """Seconds to wait from a `Retry-After` header (delta seconds or an HTTP date), capped."""
+    value = (headers.get("Retry-After") or "").strip()
+    if not value:
+        return None
+    try:
+        delay = float(value)
+    except ValueError:
+        try:
+            delay = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    cap = settings.HTTP_RETRY_AFTER_MAX_SECS if cap is None else cap
+    return min(max(0.0, delay), cap)
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit of one host, with a pause until the latest `Retry-After`."""
+
+    def __init__(
+        self,
+        host: str,
+        *,
+        max_limit: int = 16,
+        min_limit: int = 1,
+        decrease: float = 0.5,
+        max_wait_secs: float = 120.0,
+    ):
+        self.host = host
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.decrease = min(1.0, max(0.0, decrease))
+        self.max_wait_secs = max(0.0, max_wait_secs)
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self.waiting = 0
+        self.paused_until = 0.0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        """Block until the host has a free slot and is not paused."""
+        started = time.monotonic()
+        deadline = started + self.max_wait_secs
+        with self._cond:
+            self.waiting += 1
+            self._publish()
+            try:
+                while True:
+                    now = time.monotonic()
+                    if now >= self.paused_until and self.in_flight < int(self.limit):
+                        break
+                    if now >= deadline:
+                        metrics.incr("http.rate_limit_timeouts", host=self.host)
+                        raise RateLimitWaitTimeout(self.host, now - started)
+                    wake = min(self.paused_until, deadline) if now < self.paused_until else deadline
+                    self._cond.wait(wake - now)
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+            self._publish()
+        waited = time.monotonic() - started
+        if waited > 0.001:
+            metrics.observe("http.queue_wait", waited, host=self.host)
+
+    def release(self, status: int | None = None, retry_after: float | None = None) -> None:
+        """Free the slot and adapt the limit to the response (`status` None for a transport error)."""
+        with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if status == 429 or (status == 503 and retry_after is not None):
+                metrics.incr("http.throttled", host=self.host, status=status)
+                if retry_after:
+                    self.paused_until = max(self.paused_until, now + retry_after)
+                # Responses to requests sent before the last decrease reflect the old limit;
+                # cut once per pause rather than once per throttled response.
+                if now >= self._last_decrease + max(1.0, retry_after or 0.0):
+                    self.limit = max(float(self.min_limit), self.limit * self.decrease)
+                    self._last_decrease = now
+            elif status is not None and status < 500:
+                self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+            self._publish()
+            self._cond.notify_all()
+
+    def _publish(self) -> None:
+        metrics.set_gauge("http.concurrency_limit", int(self.limit), host=self.host)
+        metrics.set_gauge("http.queue_depth", self.waiting, host=self.host)
+
+
+_limiters: dict[str, AdaptiveLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter_for(host: str, max_limit: int) -> AdaptiveLimiter | None:
+    """The process-wide limiter of `host`, created with `max_limit`; None when HTTP_ADAPTIVE_LIMIT is off."""
+    if not settings.HTTP_ADAPTIVE_LIMIT:
+        return None
+    with _limiters_lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = _limiters[host] = AdaptiveLimiter(
+                host,
+                max_limit=max_limit,
+                max_wait_secs=settings.HTTP_RATE_LIMIT_MAX_WAIT_SECS,
+            )
+        return limiter
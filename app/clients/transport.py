@@ -0,0 +1,283 @@
+"""One HTTP transport layer for the GitLab, Jira and LLM clients.
+
+`requests`-based clients (python-gitlab, atlassian) get a `PooledAdapter` mounted on their
+session; httpx-based ones (LLM, GitLab GraphQL) are built by `build_httpx_client`. Both give:
+
+- keep-alive pools sized per host (`HTTP_POOL_MAXSIZE`, overridable in `HTTP_POOL_LIMITS`),
+- `HTTP_TIMEOUT_SECS` on every request that does not set its own timeout,
+- retries of transient failures with full-jitter exponential backoff, but only while the
+  process-wide `RetryBudget` allows it, so an outage does not turn into a retry storm,
+- a per-host adaptive concurrency limit that backs off on `429` and waits out `Retry-After`
+  (`app.clients.rate_limit`), shared by every client talking to that host,
+- per-host request, retry, in-flight and pool utilization metrics.
+"""
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable
+from urllib.parse import urlparse
+
+import certifi
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+from app.clients.http_cache import CachingAdapter
+from app.clients.rate_limit import AdaptiveLimiter, limiter_for, retry_after_secs
+from app.config import settings
+from app.metrics import metrics
+
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+class RetryBudget:
+    """Allow retries only up to `ratio` of the requests seen in the last `window_secs`.
+
+    `min_retries` per window are always allowed, so a quiet process can still retry at all.
+    """
+
+    def __init__(self, ratio: float = 0.1, window_secs: float = 10.0, min_retries: int = 10):
+        self.ratio = max(0.0, ratio)
+        self.window_secs = max(0.001, window_secs)
+        self.min_retries = max(0, min_retries)
+        self._requests: deque[float] = deque()
+        self._retries: deque[float] = deque()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> RetryBudget:
+        return cls(settings.HTTP_RETRY_BUDGET_RATIO, min_retries=settings.HTTP_RETRY_BUDGET_MIN)
+
+    def record_request(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._requests.append(now)
+            self._trim(now)
+
+    def try_acquire(self) -> bool:
+        """Spend one retry if the budget has room."""
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            allowed = max(self.min_retries, int(self.ratio * len(self._requests)))
+            if len(self._retries) >= allowed:
+                return False
+            self._retries.append(now)
+            return True
+
+    def _trim(self, now: float) -> None:
+        horizon = now - self.window_secs
+        for events in (self._requests, self._retries):
+            while events and events[0] < horizon:
+                events.popleft()
+
+
+retry_budget = RetryBudget.from_settings()
+
+
+def backoff_delay(attempt: int, base: float | None = None, cap: float | None = None) -> float:
+    """Full jitter: uniform in [0, min(cap, base * 2**attempt)]."""
+    base = settings.HTTP_RETRY_BACKOFF_SECS if base is None else base
+    cap = settings.HTTP_RETRY_BACKOFF_MAX_SECS if cap is None else cap
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def pool_size(host: str) -> int:
+    return max(1, int(settings.HTTP_POOL_LIMITS.get(host, settings.HTTP_POOL_MAXSIZE)))
+
+
+class _InFlight:
+    """Per-host in-flight counter feeding the utilization gauges."""
+
+    def __init__(self, host: str, capacity: int):
+        self.host = host
+        self.capacity = capacity
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> _InFlight:
+        self._move(1)
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._move(-1)
+
+    def _move(self, delta: int) -> None:
+        with self._lock:
+            self._count += delta
+            count = self._count
+        metrics.set_gauge("http.in_flight", count, host=self.host)
+        metrics.set_gauge("http.pool_utilization", round(count / self.capacity, 4), host=self.host)
+
+
+class _Retries:
+    """Pacing and retry loop shared by the requests and httpx transports."""
+
+    host: str
+    attempts: int
+    budget: RetryBudget
+    limiter: AdaptiveLimiter | None
+    _in_flight: _InFlight
+
+    def _run(
+        self,
+        send: Callable[[], Any],
+        retryable: bool,
+        errors: tuple[type[Exception], ...],
+        connect_failed: Callable[[Exception], bool],
+    ) -> Any:
+        attempt = 0
+        while True:
+            self.budget.record_request()
+            if self.limiter is not None:
+                self.limiter.acquire()
+            status: int | None = None
+            retry_after: float | None = None
+            started = time.perf_counter()
+            try:
+                with self._in_flight:
+                    response = send()
+            except errors as e:
+                metrics.incr("http.requests", host=self.host, status=type(e).__name__)
+                # A failed connect never reached the server, so any method may retry it.
+                if not ((retryable or connect_failed(e)) and self._may_retry(attempt)):
+                    raise
+                delay = backoff_delay(attempt)
+            else:
+                status = response.status_code
+                metrics.incr("http.requests", host=self.host, status=status)
+                metrics.observe("http.latency", time.perf_counter() - started, host=self.host)
+                if status in RETRY_STATUSES:
+                    retry_after = retry_after_secs(response.headers)
+                # A 429, or a 503 with Retry-After, says the request was not processed, so any
+                # method may retry it. A 429 with Retry-After is paced by the server's delay, not
+                # charged to the retry budget.
+                rejected = status == 429 or (status == 503 and retry_after is not None)
+                paced = status == 429 and retry_after is not None
+                if not (
+                    (retryable or rejected)
+                    and status in RETRY_STATUSES
+                    and self._may_retry(attempt, budgeted=not paced)
+                ):
+                    return response
+                response.close()
+                if retry_after is None:
+                    delay = backoff_delay(attempt)
+                else:
+                    # The limiter already holds every request to this host until then.
+                    delay = 0.0 if self.limiter is not None else retry_after
+            finally:
+                if self.limiter is not None:
+                    self.limiter.release(status, retry_after)
+            attempt += 1
+            time.sleep(delay)
+
+    def _may_retry(self, attempt: int, budgeted: bool = True) -> bool:
+        if attempt + 1 >= self.attempts:
+            return False
+        if budgeted and not self.budget.try_acquire():
+            metrics.incr("http.retry_budget_exhausted", host=self.host)
+            return False
+        metrics.incr("http.retries", host=self.host)
+        return True
+
+
+class PooledAdapter(_Retries, HTTPAdapter):
+    """HTTPAdapter with a per-host pool size and limiter, a default timeout and budgeted, jittered retries."""
+
+    def __init__(
+        self,
+        host: str,
+        *,
+        timeout: float | None = None,
+        max_retries: int | None = None,
+        budget: RetryBudget | None = None,
+        retry_methods: frozenset[str] = IDEMPOTENT_METHODS,
+    ):
+        size = pool_size(host)
+        super().__init__(pool_connections=1, pool_maxsize=size, pool_block=False)
+        self.host = host
+        self.timeout = settings.HTTP_TIMEOUT_SECS if timeout is None else timeout
+        self.attempts = 1 + max(0, settings.HTTP_MAX_RETRIES if max_retries is None else max_retries)
+        self.budget = budget or retry_budget
+        self.retry_methods = retry_methods
+        self.limiter = limiter_for(host, size)
+        self._in_flight = _InFlight(host, size)
+
+    def send(self, request: requests.PreparedRequest, stream: bool = False, timeout: Any = None, **kwargs: Any):
+        timeout = self.timeout if timeout is None else timeout
+        return self._run(
+            lambda: super(PooledAdapter, self).send(request, stream=stream, timeout=timeout, **kwargs),
+            (request.method or "GET").upper() in self.retry_methods,
+            (requests.ConnectionError, requests.Timeout),
+            _connect_failed,
+        )
+
+
+def _connect_failed(error: Exception) -> bool:
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+def mount(session: requests.Session, base_url: str) -> HTTPAdapter:
+    """Mount the shared transport (and the response cache, if enabled) for `base_url` on a session."""
+    host = urlparse(base_url).netloc
+    adapter: HTTPAdapter = PooledAdapter(host)
+    if settings.HTTP_CACHE_ENABLED:
+        adapter = CachingAdapter.from_settings(transport=adapter)
+    session.mount(base_url.rstrip("/") + "/", adapter)
+    return adapter
+
+
+class RetryingTransport(_Retries, httpx.BaseTransport):
+    """httpx transport with the same budgeted, jittered retries and metrics as PooledAdapter."""
+
+    def __init__(
+        self,
+        host: str,
+        transport: httpx.BaseTransport,
+        *,
+        max_retries: int | None = None,
+        budget: RetryBudget | None = None,
+        retry_methods: frozenset[str] = IDEMPOTENT_METHODS,
+    ):
+        self.host = host
+        self._transport = transport
+        self.attempts = 1 + max(0, settings.HTTP_MAX_RETRIES if max_retries is None else max_retries)
+        self.budget = budget or retry_budget
+        self.retry_methods = retry_methods
+        self.limiter = limiter_for(host, pool_size(host))
+        self._in_flight = _InFlight(host, pool_size(host))
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        return self._run(
+            lambda: self._transport.handle_request(request),
+            request.method.upper() in self.retry_methods,
+            (httpx.ConnectError, httpx.ConnectTimeout, httpx.ReadTimeout, httpx.RemoteProtocolError),
+            lambda e: isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout)),
+        )
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+def build_httpx_client(
+    base_url: str,
+    *,
+    retry_methods: frozenset[str] = IDEMPOTENT_METHODS,
+    **client_kwargs: Any,
+) -> httpx.Client:
+    """An httpx.Client on the shared transport: pooled per host, timed out and retried within budget."""
+    host = urlparse(base_url).netloc
+    size = pool_size(host)
+    limits = httpx.Limits(max_connections=size, max_keepalive_connections=size)
+    inner = httpx.HTTPTransport(verify=certifi.where(), limits=limits)
+    client_kwargs.setdefault("timeout", httpx.Timeout(settings.HTTP_TIMEOUT_SECS))
+    return httpx.Client(transport=RetryingTransport(host, inner, retry_methods=retry_methods), **client_kwargs)
@@ -1,4 +1,5 @@
 ﻿from pathlib import Path
+from typing import Any
 
 from pydantic import AnyUrl, SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -28,15 +29,76 @@ class Settings(BaseSettings):
     # GitLab
     GITLAB_URL: AnyUrl
     GITLAB_TOKEN: SecretStr
+    GITLAB_PAGINATED_DIFFS: bool = False  # stream MR diffs page by page instead of one changes() call
+    GITLAB_DIFFS_PER_PAGE: int = 50
+    GITLAB_GRAPHQL_URL: str | None = None  # defaults to <GITLAB_URL>/api/graphql
+    GITLAB_BLOB_BATCH_SIZE: int = 50  # paths per GraphQL `repository.blobs` request
 
     # Jira
     JIRA_INSTANCE_URL: AnyUrl
     JIRA_API_TOKEN: SecretStr
     JIRA_USERNAME: str
     JIRA_IS_CLOUD: bool = True
+    JIRA_COMBINED_TEST_SEARCH: bool = False  # one JQL for all functional categories, attributed to categories locally
+    JIRA_COMBINED_MAX_TERMS: int = 60  # text terms in the combined JQL
+    JIRA_COMBINED_MAX_RESULTS: int = 200  # tests read (in pages of 50) before attribution
+    JIRA_TERM_CACHE_TTL_SECS: int = 0  # remember the tests each category term matched; 0 = off
+    JIRA_TERM_CACHE_MAX_ENTRIES: int = 5000  # (project, component, label, term) entries
+    JIRA_TERM_CACHE_FETCH_LIMIT: int = 50  # newest tests read for the uncached terms of a query (at least its max results)
+    TEST_CATALOG_PATH: str | None = None  # SQLite file of the local test catalog; None = always search Jira live
+    TEST_CATALOG_SYNC_INTERVAL_SECS: int = 300  # incremental sync (`updated >=` watermark) at most this often per project
+    TEST_CATALOG_FULL_SYNC_HOURS: int = 24  # full resync, dropping tests that were deleted or lost the label
+    TEST_CATALOG_SYNC_OVERLAP_MINS: int = 900  # re-read window before the watermark; JQL dates use the Jira user's time zone
+
+    # HTTP response cache (GitLab and Jira GETs)
+    HTTP_CACHE_ENABLED: bool = False  # revalidate repeated GETs with ETag / Last-Modified
+    HTTP_CACHE_MAX_MB: int = 64  # per client
+    HTTP_CACHE_MAX_ENTRY_KB: int = 2048  # larger responses are never buffered for the cache
+    HTTP_CACHE_TTLS: dict[str, float] = {}  # seconds served without revalidating, per endpoint class, e.g. {"jira.issue": 30}
 
     # Code analysis
     cs_code_analyzer: str | None = _default_cs_code_analyzer()
+    CS_ANALYZER_WORKERS: int = 0  # resident analyzer processes; 0 = one `dotnet` process per file
+    CS_ANALYZER_WORKER_COMMAND: str | None = None  # overrides `dotnet <dll> --worker`, e.g. "python -m app.services.code_analyzer.stub_worker"
+    CS_ANALYZER_TIMEOUT_SECS: int = 20
+    CS_ANALYZER_HEALTH_CHECK_SECS: int = 60  # ping idle workers older than this before reuse
+    ANALYZER_MAX_FILES: int = 0  # stop reading diffs after this many files; 0 = no cap
+    ANALYZER_MAX_DIFF_BYTES: int = 0  # stop reading diffs once their total size would exceed this; 0 = no cap
+    ANALYZER_BATCH_BLOBS: bool = False  # prefetch changed files through batched GraphQL blob queries
+    ANALYZER_GIT_MIRROR: bool = False  # read contents (and paginated-mode diffs) from local bare mirrors
+    GIT_MIRROR_DIR: str | None = None  # one `<group%2Fproject>.git` mirror per project
+    GIT_MIRROR_FETCH_INTERVAL_SECS: int = 30  # a missing commit triggers at most one fetch per interval
+    GIT_MIRROR_MAX_DISK_MB: int = 10240  # least recently used mirrors are removed beyond this
+    GIT_MIRROR_CLONE_TIMEOUT_SECS: int = 1800  # a clone running longer is killed and retried after the fetch interval
+    GIT_MIRROR_FETCH_TIMEOUT_SECS: int = 300  # a fetch running longer is killed; the run falls back to the API
+    ANALYZER_PATH_RULES: dict[str, dict[str, Any]] = {}  # per project (or "*"): rules, languages, generated_markers, max_diff_bytes
+    ANALYZER_MAX_FILE_BYTES: int = 2 * 1024 * 1024  # larger files are skipped as "file too large"; 0 = no cap
+    ANALYZER_DEPENDENTS: bool = False  # expand impacted symbols to their dependents on the target branch
+    ANALYZER_DEPENDENT_HOPS: int = 1  # levels of callers-of-callers to follow
+    ANALYZER_MAX_DEPENDENTS: int = 50
+    DEPENDENCY_INDEX_DIR: str | None = None  # persisted indexes; None keeps them in memory only
+    DEPENDENCY_INDEX_MAX_ENTRIES: int = 8  # indexes kept in memory
+    DEPENDENCY_INDEX_WAIT_SECS: float = 0  # how long a run waits for an index still being built
+    DEPENDENCY_INDEX_MAX_FANOUT: int = 200  # names used by more symbols than this are not expanded
+    ANALYZER_HEDGED_FETCH: bool = False  # duplicate file fetches that run past the hedge threshold
+    HEDGE_PERCENTILE: float = 95.0  # hedge threshold = this percentile of recent fetch latencies
+    HEDGE_MIN_DELAY_MS: int = 50  # never hedge sooner than this
+    HEDGE_MAX_RATE: float = 0.05  # at most this fraction of recent fetches is hedged
+    HEDGE_MIN_SAMPLES: int = 20  # latencies needed before any fetch is hedged
+    HEDGE_MAX_WORKERS: int = 32  # threads running hedged fetches; when all are busy a fetch runs unhedged on its caller
+    ANALYZER_MAX_PARALLELISM: int = 8  # files fetched/analyzed concurrently per MR; 1 = sequential
+    ANALYZER_PARSER_PARALLELISM: int = 4  # concurrent parser calls per MR
+    ANALYZER_BASE_SIDE: bool = True  # map removed lines to symbols of the base revision
+    BASE_SYMBOL_CACHE_MAX_ENTRIES: int = 512  # base-side symbol tables kept per (project, base sha, path)
+    ANALYZER_SKIP_FORMATTING_ONLY: bool = True  # drop hunks whose code only differs in whitespace/comments
+    ANALYZER_COLLAPSE_BLOCKS: bool = False  # emit only innermost impacted symbols; containers go to `enclosing`/summary
+    ANALYZER_DIFF_FAST_PATH: bool = False  # resolve symbols of modified files from hunk headers/context; fetch + parse only when ambiguous
+    PARSER_MAX_INPUT_CHARS: int = 2_000_000  # larger files are skipped instead of parsed
+    PARSER_PROCESS_POOL_SIZE: int = 2  # processes for in-process parsers that opt into `use_process_pool` via PARSER_LIMITS
+    PARSER_LIMITS: dict[str, dict[str, Any]] = {}  # per-parser overrides, e.g. {"python-ast": {"max_input_chars": 500000, "concurrency": 1}}
+    SYMBOL_CACHE_MAX_ENTRIES: int = 2048  # in-memory LRU of parser output, keyed by content
+    SYMBOL_CACHE_DIR: str | None = None  # enables the on-disk tier
+    SYMBOL_CACHE_MAX_DISK_MB: int = 512
 
     # LLM (optional)
     LLM_MODEL: str | None = None
@@ -50,7 +112,19 @@ class Settings(BaseSettings):
     REDIS_URL: AnyUrl | None = None
 
     # Timeouts
-    HTTP_TIMEOUT_SECS: int = 30
+    HTTP_TIMEOUT_SECS: int = 30  # connect and read timeout of every GitLab, Jira and LLM request
+
+    # Shared HTTP transport (all integration clients)
+    HTTP_POOL_MAXSIZE: int = 16  # keep-alive connections per host
+    HTTP_POOL_LIMITS: dict[str, int] = {}  # per-host overrides, e.g. {"gitlab.example.com": 32}
+    HTTP_MAX_RETRIES: int = 3  # per request, for connection errors and 429/502/503/504 on idempotent calls
+    HTTP_RETRY_BACKOFF_SECS: float = 0.25  # full-jitter exponential backoff base
+    HTTP_RETRY_BACKOFF_MAX_SECS: float = 8.0
+    HTTP_RETRY_BUDGET_RATIO: float = 0.1  # retries allowed per request over the last 10 s, process-wide
+    HTTP_RETRY_BUDGET_MIN: int = 10  # retries always allowed per 10 s
+    HTTP_ADAPTIVE_LIMIT: bool = True  # per-host AIMD concurrency limit (starting at the pool size) that backs off on 429
+    HTTP_RATE_LIMIT_MAX_WAIT_SECS: float = 120.0  # longest a request queues for its host before failing
+    HTTP_RETRY_AFTER_MAX_SECS: float = 60.0  # cap on a server's Retry-After delay
 
 
 settings = Settings()
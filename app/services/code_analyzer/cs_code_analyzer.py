@@ -1,16 +1,48 @@
 from __future__ import annotations
 
+import atexit
 import json
+import os
+import shlex
 import subprocess
+import threading
 from typing import Any
 
 from app.config import settings
+from app.metrics import metrics
+from app.services.impact_records import Span, Symbol
+from app.services.code_analyzer.worker_pool import AnalyzerWorkerError, AnalyzerWorkerPool
+
+# Bump when _normalize_symbols changes shape so cached parser output is invalidated.
+NORMALIZER_VERSION = "3"
+
+
+def parser_version() -> str:
+    """Identify the analyzer build in use; part of the symbol cache key."""
+    source = settings.CS_ANALYZER_WORKER_COMMAND or settings.cs_code_analyzer
+    stamp = "none"
+    if settings.cs_code_analyzer:
+        try:
+            st = os.stat(settings.cs_code_analyzer)
+            stamp = f"{st.st_size}-{int(st.st_mtime)}"
+        except OSError:
+            stamp = "missing"
+    return f"roslyn/{NORMALIZER_VERSION}/{source}/{stamp}"
 
 
 def analyze_cs_file_with_roslyn(content: str) -> dict[str, Any]:
     """Analyze a C# source file and normalize results into the generic parser contract."""
     analysis = {"language": "csharp", "symbols": []}
 
+    pool = _worker_pool()
+    if pool is not None:
+        try:
+            analysis["symbols"] = _normalize_symbols(pool.analyze(content))
+            return analysis
+        except AnalyzerWorkerError as e:
+            # Fall back to the one-shot CLI below.
+            metrics.incr("cs_analyzer.worker_fallbacks", reason=type(e).__name__)
+
     analyze_exe = settings.cs_code_analyzer
     if not analyze_exe:
         return analysis
@@ -22,7 +54,7 @@ def analyze_cs_file_with_roslyn(content: str) -> dict[str, Any]:
             text=True,
             encoding="utf-8",
             stderr=subprocess.STDOUT,
-            timeout=20,
+            timeout=settings.CS_ANALYZER_TIMEOUT_SECS,
         )
         payload = json.loads(result)
     except subprocess.CalledProcessError as e:
@@ -35,15 +67,53 @@ def analyze_cs_file_with_roslyn(content: str) -> dict[str, Any]:
     return analysis
 
 
-def _normalize_symbols(raw_items: Any) -> list[dict[str, Any]]:
+_pool: AnalyzerWorkerPool | None = None
+_pool_lock = threading.Lock()
+
+
+def _worker_pool() -> AnalyzerWorkerPool | None:
+    """Return the shared resident analyzer pool, or None when worker mode is off."""
+    global _pool
+    if settings.CS_ANALYZER_WORKERS <= 0:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                command = _worker_command()
+                if not command:
+                    return None
+                _pool = AnalyzerWorkerPool(
+                    command,
+                    size=settings.CS_ANALYZER_WORKERS,
+                    request_timeout=settings.CS_ANALYZER_TIMEOUT_SECS,
+                    health_check_interval=settings.CS_ANALYZER_HEALTH_CHECK_SECS,
+                )
+                atexit.register(_pool.close)
+    return _pool
+
+
+def _worker_command() -> list[str] | None:
+    if settings.CS_ANALYZER_WORKER_COMMAND:
+        return shlex.split(settings.CS_ANALYZER_WORKER_COMMAND)
+    if settings.cs_code_analyzer:
+        return ["dotnet", settings.cs_code_analyzer, "--worker"]
+    return None
+
+
+def _normalize_symbols(raw_items: Any) -> list[Symbol]:
     if not isinstance(raw_items, list):
         return []
 
-    normalized: list[dict[str, Any]] = []
+    normalized: list[Symbol] = []
     for node in raw_items:
         if not isinstance(node, dict):
             continue
 
+        start_line = _int_or_none(node.get("StartLine"))
+        end_line = _int_or_none(node.get("EndLine"))
+        if not start_line or not end_line:
+            continue
+
         display = (
             node.get("DisplayName")
             or node.get("Signature")
@@ -54,47 +124,38 @@ def _normalize_symbols(raw_items: Any) -> list[dict[str, Any]]:
         identifier = node.get("Name") or node.get("Identifier") or display
 
         qualifiers, leaf = _split_symbol(identifier)
-        namespace = node.get("Namespace") or node.get("NamespaceName")
-
-        symbol = {
-            "kind": node.get("Type") or node.get("Kind") or "symbol",
-            "display_name": display or leaf or identifier,
-            "name": leaf or identifier,
-            "qualifiers": qualifiers,
-        }
-        if namespace:
-            symbol["namespace"] = namespace
-        signature = node.get("Signature") or node.get("DisplaySignature")
-        if signature:
-            symbol["signature"] = signature
+
         qualified_name = node.get("QualifiedName") or node.get("FullName")
         if not qualified_name:
-            parts = [*qualifiers]
-            if leaf:
-                parts.append(leaf)
-            qualified_name = ".".join(parts)
-        if qualified_name:
-            symbol["qualified_name"] = qualified_name
-
-        span = {
-            "start": {
-                "line": node.get("StartLine"),
-                "column": node.get("StartColumn"),
-            },
-            "end": {
-                "line": node.get("EndLine"),
-                "column": node.get("EndColumn"),
-            },
-        }
-
-        normalized.append({
-            "symbol": symbol,
-            "span": span,
-        })
+            qualified_name = ".".join([*qualifiers, leaf] if leaf else qualifiers)
+
+        normalized.append(Symbol(
+            Span(
+                start_line,
+                end_line,
+                _int_or_none(node.get("StartColumn")),
+                _int_or_none(node.get("EndColumn")),
+            ),
+            kind=node.get("Type") or node.get("Kind") or "symbol",
+            display_name=display or leaf or identifier,
+            name=leaf or identifier,
+            qualifiers=qualifiers,
+            namespace=node.get("Namespace") or node.get("NamespaceName") or None,
+            signature=node.get("Signature") or node.get("DisplaySignature") or None,
+            qualified_name=qualified_name or None,
+            references=[name for name in node.get("References") or [] if isinstance(name, str)] or None,
+        ))
 
     return normalized
 
 
+def _int_or_none(value: Any) -> int | None:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
 def _split_symbol(identifier: str) -> tuple[list[str], str]:
     if not identifier:
         return [], ""
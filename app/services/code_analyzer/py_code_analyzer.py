@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import ast
+import sys
+from typing import Any
+
+from app.services.impact_records import Span, Symbol
+
+# Bump when the emitted symbols change shape so cached parser output is invalidated.
+ANALYZER_VERSION = "2"
+
+
+def parser_version() -> str:
+    """Identify the analyzer build in use; part of the symbol cache key."""
+    return f"ast/{ANALYZER_VERSION}/{sys.version_info.major}.{sys.version_info.minor}"
+
+
+def analyze_py_file_with_ast(content: str) -> dict[str, Any]:
+    """Analyze a Python source file in-process and return the generic parser contract."""
+    analysis: dict[str, Any] = {"language": "python", "symbols": []}
+    try:
+        tree = ast.parse(content)
+    except (SyntaxError, ValueError):
+        return analysis
+
+    symbols: list[Symbol] = []
+    _collect(tree, [], False, symbols)
+    analysis["symbols"] = symbols
+    return analysis
+
+
+def _collect(node: ast.AST, qualifiers: list[str], in_class: bool, out: list[Symbol]) -> None:
+    for child in ast.iter_child_nodes(node):
+        if isinstance(child, ast.ClassDef):
+            kind = "class"
+            signature = None
+        elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            kind = "method" if in_class else "function"
+            signature = _signature(child)
+        else:
+            # Definitions nested in if/try/with blocks still belong to the enclosing scope.
+            _collect(child, qualifiers, in_class, out)
+            continue
+
+        qualified = ".".join([*qualifiers, child.name])
+        # Decorators are part of the definition, as attributes are for Roslyn spans.
+        start_line = min([child.lineno, *(d.lineno for d in child.decorator_list)])
+        out.append(Symbol(
+            Span(
+                start_line,
+                child.end_lineno or child.lineno,
+                child.col_offset + 1,
+                (child.end_col_offset or 0) + 1,
+            ),
+            kind=kind,
+            name=child.name,
+            display_name=qualified,
+            qualified_name=qualified,
+            qualifiers=list(qualifiers),
+            signature=signature,
+            references=_references(child),
+        ))
+        _collect(child, [*qualifiers, child.name], kind == "class", out)
+
+
+def _references(definition: ast.ClassDef | ast.FunctionDef | ast.AsyncFunctionDef) -> list[str] | None:
+    """Names and attribute names used by the definition itself; nested definitions report their own."""
+    names: set[str] = set()
+    stack = list(ast.iter_child_nodes(definition))
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        if isinstance(node, ast.Name):
+            names.add(node.id)
+        elif isinstance(node, ast.Attribute):
+            names.add(node.attr)
+        stack.extend(ast.iter_child_nodes(node))
+    names.discard(definition.name)
+    return sorted(names) or None
+
+
+def _signature(func: ast.FunctionDef | ast.AsyncFunctionDef) -> str:
+    prefix = "async def" if isinstance(func, ast.AsyncFunctionDef) else "def"
+    signature = f"{prefix} {func.name}({ast.unparse(func.args)})"
+    if func.returns is not None:
+        signature += f" -> {ast.unparse(func.returns)}"
+    return signature
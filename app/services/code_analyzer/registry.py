@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable
+
+from app.config import settings
+from app.metrics import metrics
+from app.services.code_analyzer import cs_code_analyzer, py_code_analyzer
+
+IN_PROCESS = "in_process"
+EXTERNAL = "external"
+
+_LIMIT_TYPES = {"timeout_secs": float, "max_input_chars": int, "concurrency": int, "use_process_pool": bool}
+
+
+class ParserError(RuntimeError):
+    """A parser refused the input, timed out or failed; the message is the skip reason."""
+
+
+class ParserSpec:
+    """A language parser and its execution limits.
+
+    `mode` is IN_PROCESS for pure-Python parsers and EXTERNAL for parsers that shell out
+    (and enforce their own timeout). In-process parsers marked `use_process_pool` run in a
+    shared ProcessPoolExecutor so CPU-heavy parsing does not hold the API worker's GIL.
+    `timeout_secs` is only enforced there: a parser running on the calling thread cannot be
+    interrupted, so it is bounded by `max_input_chars` alone.
+    """
+
+    __slots__ = (
+        "name",
+        "language",
+        "extensions",
+        "handler",
+        "mode",
+        "version",
+        "timeout_secs",
+        "max_input_chars",
+        "concurrency",
+        "use_process_pool",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        language: str,
+        extensions: tuple[str, ...],
+        handler: Callable[[str], Any],
+        *,
+        mode: str = IN_PROCESS,
+        version: Callable[[], str] = lambda: "0",
+        timeout_secs: float = 20.0,
+        max_input_chars: int = 2_000_000,
+        concurrency: int = 4,
+        use_process_pool: bool = False,
+    ):
+        self.name = name
+        self.language = language
+        self.extensions = tuple(ext.lower() for ext in extensions)
+        self.handler = handler
+        self.mode = mode
+        self.version = version
+        self.timeout_secs = timeout_secs
+        self.max_input_chars = max_input_chars
+        self.concurrency = max(1, concurrency)
+        self.use_process_pool = use_process_pool and mode == IN_PROCESS
+
+
+class ParserRegistry:
+    def __init__(self, process_pool_size: int = 2):
+        self.process_pool_size = max(1, process_pool_size)
+        self._by_extension: dict[str, ParserSpec] = {}
+        self._slots: dict[str, threading.BoundedSemaphore] = {}
+        self._process_pool: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def register(self, spec: ParserSpec) -> ParserSpec:
+        """Register a parser for its extensions, applying any PARSER_LIMITS override for its name.
+
+        A `timeout_secs` override is rejected unless the parser runs in the process pool, the
+        only place it is enforced.
+        """
+        limits = settings.PARSER_LIMITS.get(spec.name) or {}
+        for key, value in limits.items():
+            if key in _LIMIT_TYPES:
+                setattr(spec, key, _LIMIT_TYPES[key](value))
+        spec.use_process_pool = spec.use_process_pool and spec.mode == IN_PROCESS
+        if "timeout_secs" in limits and not spec.use_process_pool:
+            raise ValueError(
+                f"PARSER_LIMITS[{spec.name!r}].timeout_secs is only enforced with use_process_pool"
+                + (" (external parsers have their own timeout setting)" if spec.mode == EXTERNAL else "")
+            )
+        for ext in spec.extensions:
+            self._by_extension[ext] = spec
+        self._slots[spec.name] = threading.BoundedSemaphore(max(1, spec.concurrency))
+        return spec
+
+    def for_extension(self, ext: str) -> ParserSpec | None:
+        return self._by_extension.get((ext or "").lower())
+
+    def for_language(self, language: str) -> ParserSpec | None:
+        """The parser of a language mapped onto extensions it was not registered for."""
+        return next((spec for spec in self._by_extension.values() if spec.language == language), None)
+
+    def run(self, spec: ParserSpec, content: str) -> Any:
+        if len(content) > spec.max_input_chars:
+            metrics.incr("parser.rejected", parser=spec.name)
+            raise ParserError(f"{spec.name}: input of {len(content)} chars exceeds {spec.max_input_chars}")
+
+        with self._slots[spec.name]:
+            started = time.perf_counter()
+            try:
+                if spec.use_process_pool:
+                    result = self._run_in_process_pool(spec, content)
+                else:
+                    result = spec.handler(content)
+            except FuturesTimeout:
+                metrics.incr("parser.failures", parser=spec.name, reason="timeout")
+                raise ParserError(f"{spec.name}: timed out after {spec.timeout_secs}s") from None
+            except Exception as e:
+                metrics.incr("parser.failures", parser=spec.name, reason=type(e).__name__)
+                raise ParserError(f"{spec.name}: {e}") from e
+            finally:
+                metrics.observe("parser.latency", time.perf_counter() - started, parser=spec.name)
+
+        metrics.incr("parser.calls", parser=spec.name)
+        return result
+
+    def _run_in_process_pool(self, spec: ParserSpec, content: str) -> Any:
+        pool = self._processes()
+        try:
+            return pool.submit(spec.handler, content).result(timeout=spec.timeout_secs)
+        except BrokenProcessPool:
+            # A crashed child poisons the executor; replace it so later files still parse.
+            with self._lock:
+                if self._process_pool is pool:
+                    self._process_pool = None
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    def _processes(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(max_workers=self.process_pool_size)
+            return self._process_pool
+
+    def close(self) -> None:
+        with self._lock:
+            pool, self._process_pool = self._process_pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def default_registry() -> ParserRegistry:
+    """Registry with the parsers shipped in this repo, limits taken from settings."""
+    registry = ParserRegistry(process_pool_size=settings.PARSER_PROCESS_POOL_SIZE)
+    registry.register(ParserSpec(
+        "roslyn",
+        "csharp",
+        (".cs",),
+        cs_code_analyzer.analyze_cs_file_with_roslyn,
+        mode=EXTERNAL,
+        version=cs_code_analyzer.parser_version,
+        timeout_secs=settings.CS_ANALYZER_TIMEOUT_SECS,
+        max_input_chars=settings.PARSER_MAX_INPUT_CHARS,
+        concurrency=settings.CS_ANALYZER_WORKERS or settings.ANALYZER_PARSER_PARALLELISM,
+    ))
+    registry.register(ParserSpec(
+        "python-ast",
+        "python",
+        (".py",),
+        py_code_analyzer.analyze_py_file_with_ast,
+        mode=IN_PROCESS,
+        version=py_code_analyzer.parser_version,
+        timeout_secs=10,  # only applies once PARSER_LIMITS turns on use_process_pool
+        max_input_chars=settings.PARSER_MAX_INPUT_CHARS,
+        concurrency=settings.ANALYZER_PARSER_PARALLELISM,
+        # ast.parse is fast enough that pickling the source and symbols to a worker costs more
+        # than it saves; opt in with PARSER_LIMITS={"python-ast": {"use_process_pool": true}}.
+        use_process_pool=False,
+    ))
+    return registry
@@ -0,0 +1,121 @@
+"""Python stand-in for the resident C# analyzer (`CSharpCodeParser.dll --worker`).
+
+Speaks the same newline-delimited JSON protocol so the worker pool can be exercised
+without the .NET SDK. Symbols come from a light regex scan of namespace and type
+declarations, which is enough to drive block building end to end. A type's `References`
+are the identifiers in its body, nested types included.
+
+    python -m app.services.code_analyzer.stub_worker [--delay SECONDS]
+"""
+from __future__ import annotations
+
+import argparse
+import bisect
+import json
+import re
+import sys
+import time
+from typing import Any
+
+_DECLARATION = re.compile(
+    r"^[ \t]*(?:(?:public|private|protected|internal|static|sealed|abstract|partial|readonly|file)\s+)*"
+    r"(namespace|class|interface|struct|record|enum)\s+([A-Za-z_][\w.]*)",
+    re.M,
+)
+_IDENTIFIER = re.compile(r"\b[A-Za-z_]\w*\b")
+_KEYWORDS = {
+    "abstract", "as", "base", "bool", "break", "case", "catch", "class", "const", "continue", "decimal",
+    "default", "do", "double", "else", "enum", "false", "finally", "float", "for", "foreach", "get", "if",
+    "in", "int", "interface", "internal", "is", "long", "namespace", "new", "null", "object", "out",
+    "override", "private", "protected", "public", "readonly", "record", "ref", "return", "sealed", "set",
+    "static", "string", "struct", "switch", "this", "throw", "true", "try", "using", "var", "virtual",
+    "void", "while",
+}
+
+
+def scan_declarations(content: str) -> list[dict[str, Any]]:
+    symbols: list[dict[str, Any]] = []
+    line_starts = [0]
+    for i, ch in enumerate(content):
+        if ch == "\n":
+            line_starts.append(i + 1)
+
+    def line_of(offset: int) -> int:
+        return bisect.bisect_right(line_starts, offset)
+
+    stack: list[tuple[str, str, int]] = []  # (kind, qualified name, end offset)
+    for match in _DECLARATION.finditer(content):
+        kind, name = match.group(1), match.group(2)
+        start = match.start(2)
+        while stack and stack[-1][2] < start:
+            stack.pop()
+
+        brace = content.find("{", match.end())
+        semicolon = content.find(";", match.end())
+        if kind == "namespace" and semicolon != -1 and (brace == -1 or semicolon < brace):
+            end = len(content) - 1  # file-scoped namespace
+        elif brace == -1:
+            continue
+        else:
+            depth, end = 0, len(content) - 1
+            for i in range(brace, len(content)):
+                if content[i] == "{":
+                    depth += 1
+                elif content[i] == "}":
+                    depth -= 1
+                    if depth == 0:
+                        end = i
+                        break
+
+        parent = stack[-1][1] if stack else ""
+        qualified = f"{parent}.{name}" if parent else name
+        namespace = next((q for k, q, _ in reversed(stack) if k == "namespace"), None)
+        symbols.append({
+            "Type": kind,
+            "Kind": kind,
+            "Name": name.split(".")[-1],
+            "QualifiedName": qualified,
+            "DisplayName": name,
+            "Namespace": namespace,
+            "StartLine": line_of(match.start()),
+            "EndLine": line_of(end),
+        })
+        if kind != "namespace":
+            used = set(_IDENTIFIER.findall(content, match.end(), end)) - _KEYWORDS - {symbols[-1]["Name"]}
+            symbols[-1]["References"] = sorted(used) or None
+        stack.append((kind, qualified, end))
+    return symbols
+
+
+def handle(line: str) -> dict[str, Any]:
+    request_id = None
+    try:
+        request = json.loads(line)
+        request_id = request.get("id")
+        op = request.get("op") or "analyze"
+        if op == "ping":
+            return {"id": request_id, "ok": True}
+        if op == "analyze":
+            return {"id": request_id, "ok": True, "symbols": scan_declarations(request.get("content") or "")}
+        return {"id": request_id, "ok": False, "error": f"unknown op '{op}'"}
+    except Exception as e:
+        return {"id": request_id, "ok": False, "error": str(e)}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds to sleep before each answer")
+    args = parser.parse_args(argv)
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        if args.delay:
+            time.sleep(args.delay)
+        sys.stdout.write(json.dumps(handle(line)) + "\n")
+        sys.stdout.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import json
+import queue
+import subprocess
+import threading
+import time
+from typing import Any
+
+
+class AnalyzerWorkerError(RuntimeError):
+    """Raised when a resident analyzer fails, crashes or returns an error response."""
+
+
+class AnalyzerWorkerTimeout(AnalyzerWorkerError):
+    """Raised when a resident analyzer does not answer within the request timeout."""
+
+
+class AnalyzerWorker:
+    """One resident analyzer process speaking newline-delimited JSON over STDIN/STDOUT.
+
+    Request:  {"id": 1, "op": "analyze", "content": "..."}  or  {"id": 2, "op": "ping"}
+    Response: {"id": 1, "ok": true, "symbols": [...]}        or  {"id": 1, "ok": false, "error": "..."}
+    """
+
+    def __init__(self, command: list[str]):
+        self.command = command
+        self.restarts = 0
+        self.last_used = 0.0
+        self._proc: subprocess.Popen | None = None
+        self._responses: queue.Queue[str | None] = queue.Queue()
+        self._next_id = 0
+
+    def start(self) -> None:
+        if self.last_used:
+            self.restarts += 1
+        self.stop()
+        self._responses = queue.Queue()
+        self._proc = subprocess.Popen(
+            self.command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+        )
+        threading.Thread(
+            target=self._pump,
+            args=(self._proc.stdout, self._responses),
+            daemon=True,
+        ).start()
+        self.last_used = time.monotonic()
+
+    @staticmethod
+    def _pump(stream, sink: queue.Queue) -> None:
+        try:
+            for line in stream:
+                sink.put(line)
+        except (OSError, ValueError):
+            pass
+        sink.put(None)
+
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def request(self, op: str, timeout: float, **fields: Any) -> dict[str, Any]:
+        if not self.alive():
+            raise AnalyzerWorkerError("analyzer worker is not running")
+
+        self._next_id += 1
+        request_id = self._next_id
+        line = json.dumps({"id": request_id, "op": op, **fields})
+        try:
+            self._proc.stdin.write(line + "\n")
+            self._proc.stdin.flush()
+        except (BrokenPipeError, OSError, ValueError) as e:
+            raise AnalyzerWorkerError(f"analyzer worker stdin closed: {e}") from e
+
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise AnalyzerWorkerTimeout(f"analyzer worker did not answer within {timeout}s")
+            try:
+                raw = self._responses.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if raw is None:
+                raise AnalyzerWorkerError(f"analyzer worker exited with code {self._proc.poll()}")
+            try:
+                message = json.loads(raw)
+            except ValueError:
+                # Stray diagnostic output; responses are always single JSON lines.
+                continue
+            if not isinstance(message, dict) or message.get("id") != request_id:
+                continue
+            self.last_used = time.monotonic()
+            return message
+
+    def ping(self, timeout: float) -> bool:
+        try:
+            return bool(self.request("ping", timeout).get("ok"))
+        except AnalyzerWorkerError:
+            return False
+
+    def stop(self, kill: bool = False) -> None:
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        if kill:
+            proc.kill()
+            proc.wait()
+            return
+        try:
+            proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            proc.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+
+class AnalyzerWorkerPool:
+    """Fixed-size pool of resident analyzers with lazy start, health checks and restart on crash."""
+
+    def __init__(
+        self,
+        command: list[str],
+        size: int,
+        request_timeout: float = 20.0,
+        health_check_interval: float = 60.0,
+    ):
+        self.command = command
+        self.size = max(1, size)
+        self.request_timeout = request_timeout
+        self.health_check_interval = health_check_interval
+        self._idle: queue.Queue[AnalyzerWorker] = queue.Queue()
+        self._workers = [AnalyzerWorker(command) for _ in range(self.size)]
+        for worker in self._workers:
+            self._idle.put(worker)
+        self._closed = False
+
+    def analyze(self, content: str) -> Any:
+        """Run one analysis on a free worker; blocks while every worker is busy."""
+        if self._closed:
+            raise AnalyzerWorkerError("analyzer worker pool is closed")
+
+        worker = self._checkout()
+        try:
+            message = worker.request("analyze", self.request_timeout, content=content)
+        except AnalyzerWorkerError:
+            # Timed-out or crashed workers are discarded; the next checkout restarts them.
+            worker.stop(kill=True)
+            raise
+        finally:
+            self._idle.put(worker)
+
+        if not message.get("ok", False):
+            raise AnalyzerWorkerError(message.get("error") or "analyzer worker returned an error")
+        return message.get("symbols") or []
+
+    def _checkout(self) -> AnalyzerWorker:
+        worker = self._idle.get()
+        try:
+            if not worker.alive():
+                worker.start()
+            elif time.monotonic() - worker.last_used > self.health_check_interval:
+                if not worker.ping(min(self.request_timeout, 5.0)):
+                    worker.start()
+        except Exception as e:
+            self._idle.put(worker)
+            raise AnalyzerWorkerError(f"unable to start analyzer worker: {e}") from e
+        return worker
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": self.size,
+            "alive": sum(1 for w in self._workers if w.alive()),
+            "idle": self._idle.qsize(),
+            "restarts": sum(w.restarts for w in self._workers),
+        }
+
+    def close(self) -> None:
+        self._closed = True
+        for worker in self._workers:
+            worker.stop()
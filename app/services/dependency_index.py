@@ -0,0 +1,218 @@
+"""Reverse-dependency index of a project's target branch, used to expand impact to callers.
+
+For one (project, commit) the index keeps, per file, every symbol that references other
+names (`[qualified_name, kind, references]`, straight from parser output). Inverting it gives,
+for a simple name, the symbols that use it, so the dependents of an impacted method are a
+dictionary lookup per hop instead of a parse of the whole repository.
+
+References are plain names, not resolved symbols: a caller of some other `Save` also shows
+up as a dependent of `Save`. Names used by very many symbols (`ToString`, `get`) therefore
+stop expanding once they pass `max_fanout`.
+
+Indexes are built in the background, persisted as JSON and updated incrementally: the index
+of the branch's previous commit is copied and only the files changed since then are parsed.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Iterable
+from urllib.parse import quote
+
+from app.config import settings
+from app.metrics import metrics
+
+# (qualified name, kind, referenced names) of one symbol.
+IndexedSymbol = list[Any]
+
+
+class DependencyIndex:
+    __slots__ = ("project", "commit", "files", "_referrers")
+
+    def __init__(self, project: str, commit: str, files: dict[str, list[IndexedSymbol]]):
+        self.project = project
+        self.commit = commit
+        self.files = files
+        self._referrers: dict[str, list[tuple[str, str, str]]] | None = None
+
+    def referrers(self) -> dict[str, list[tuple[str, str, str]]]:
+        """Referenced name -> (path, qualified name, kind) of every symbol using it."""
+        if self._referrers is None:
+            referrers: dict[str, list[tuple[str, str, str]]] = {}
+            for path in sorted(self.files):
+                for qualified, kind, names in self.files[path]:
+                    for name in names:
+                        referrers.setdefault(name, []).append((path, qualified, kind))
+            self._referrers = referrers
+        return self._referrers
+
+    def dependents(
+        self,
+        names: Iterable[str],
+        *,
+        hops: int = 1,
+        limit: int = 50,
+        max_fanout: int = 200,
+        exclude: Iterable[tuple[str, str]] = (),
+    ) -> list[dict[str, Any]]:
+        """Symbols that use `names`, then symbols that use those, up to `hops` levels.
+
+        `exclude` holds (path, qualified name) pairs already reported as impacted.
+        """
+        referrers = self.referrers()
+        seen = set(exclude)
+        expanded: set[str] = set()
+        frontier = sorted(set(names))
+        found: list[dict[str, Any]] = []
+        for hop in range(1, max(0, hops) + 1):
+            next_names: set[str] = set()
+            for name in frontier:
+                expanded.add(name)
+                users = referrers.get(name, ())
+                if len(users) > max_fanout:
+                    metrics.incr("dependency_index.fanout_skips")
+                    continue
+                for path, qualified, kind in users:
+                    if (path, qualified) in seen:
+                        continue
+                    seen.add((path, qualified))
+                    found.append({"path": path, "symbol": qualified, "kind": kind, "via": name, "hops": hop})
+                    if len(found) >= limit:
+                        return found
+                    next_names.add(qualified.rsplit(".", 1)[-1])
+            frontier = sorted(next_names - expanded)
+            if not frontier:
+                break
+        return found
+
+    def to_json(self) -> dict[str, Any]:
+        return {"project": self.project, "commit": self.commit, "files": self.files}
+
+    @classmethod
+    def from_json(cls, data: dict[str, Any]) -> DependencyIndex:
+        return cls(data["project"], data["commit"], data.get("files") or {})
+
+
+class DependencyIndexStore:
+    """Indexes per (project, commit): an LRU in memory, JSON files on disk, builds on one background thread.
+
+    `<root>/<project>/<commit>.json` holds an index and `<root>/<project>/<branch>.latest` the
+    commit of the branch's newest one, which seeds the incremental build of the next commit.
+    Only the `keep_per_project` newest index files of a project stay on disk.
+    """
+
+    def __init__(self, root: str | None = None, *, max_entries: int = 8, keep_per_project: int = 4):
+        self.root = Path(root) if root else None
+        self.max_entries = max(1, max_entries)
+        self.keep_per_project = max(1, keep_per_project)
+        self._memory: OrderedDict[tuple[str, str], DependencyIndex] = OrderedDict()
+        self._latest: dict[tuple[str, str], str] = {}
+        self._building: dict[tuple[str, str], Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dependency-index")
+
+    @classmethod
+    def from_settings(cls) -> DependencyIndexStore:
+        return cls(settings.DEPENDENCY_INDEX_DIR, max_entries=settings.DEPENDENCY_INDEX_MAX_ENTRIES)
+
+    def get(self, project: str, commit: str) -> DependencyIndex | None:
+        key = (project, commit)
+        with self._lock:
+            index = self._memory.get(key)
+            if index is not None:
+                self._memory.move_to_end(key)
+                return index
+        index = self._load(project, commit)
+        if index is not None:
+            self._remember(index)
+        return index
+
+    def latest(self, project: str, branch: str) -> DependencyIndex | None:
+        commit = self._latest.get((project, branch))
+        if commit is None and self.root:
+            try:
+                commit = (self._dir(project) / f"{quote(branch, safe='')}.latest").read_text().strip()
+            except OSError:
+                commit = None
+        return self.get(project, commit) if commit else None
+
+    def ensure(
+        self,
+        project: str,
+        branch: str,
+        commit: str,
+        build: Callable[[DependencyIndex | None], DependencyIndex],
+    ) -> Future:
+        """A future for the index of `commit`, scheduling `build(previous_index)` if it does not exist yet."""
+        index = self.get(project, commit)
+        if index is not None:
+            done: Future = Future()
+            done.set_result(index)
+            return done
+        key = (project, commit)
+        with self._lock:
+            pending = self._building.get(key)
+            if pending is None:
+                pending = self._building[key] = self._executor.submit(self._build, project, branch, commit, build)
+        return pending
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _build(
+        self, project: str, branch: str, commit: str, build: Callable[[DependencyIndex | None], DependencyIndex]
+    ) -> DependencyIndex:
+        try:
+            previous = self.latest(project, branch)
+            index = build(previous if previous is not None and previous.commit != commit else None)
+            metrics.incr("dependency_index.builds", mode="incremental" if previous else "full")
+            self._remember(index)
+            self._latest[(project, branch)] = commit
+            self._save(index, branch)
+            return index
+        except Exception as e:
+            metrics.incr("dependency_index.failures", reason=type(e).__name__)
+            raise
+        finally:
+            with self._lock:
+                self._building.pop((project, commit), None)
+
+    def _remember(self, index: DependencyIndex) -> None:
+        with self._lock:
+            self._memory[(index.project, index.commit)] = index
+            self._memory.move_to_end((index.project, index.commit))
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _dir(self, project: str) -> Path:
+        return self.root / quote(project, safe="")
+
+    def _load(self, project: str, commit: str) -> DependencyIndex | None:
+        if not self.root:
+            return None
+        try:
+            with open(self._dir(project) / f"{commit}.json", "r", encoding="utf-8") as fh:
+                return DependencyIndex.from_json(json.load(fh))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _save(self, index: DependencyIndex, branch: str) -> None:
+        if not self.root:
+            return
+        directory = self._dir(index.project)
+        directory.mkdir(parents=True, exist_ok=True)
+        target = directory / f"{index.commit}.json"
+        tmp = target.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(index.to_json(), fh, separators=(",", ":"))
+        os.replace(tmp, target)
+        (directory / f"{quote(branch, safe='')}.latest").write_text(index.commit)
+
+        # Keep the newest files; an evicted commit is simply rebuilt from a newer one if needed.
+        saved = sorted(directory.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+        for stale in saved[self.keep_per_project:]:
+            stale.unlink(missing_ok=True)
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import re
+
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@ ?(.*)$")
+
+# (line comment, block comment open, block comment close) per language; None = no such comment.
+_COMMENT_SYNTAX: dict[str, tuple[str | None, str | None, str | None]] = {
+    "csharp": ("//", "/*", "*/"),
+    "typescript": ("//", "/*", "*/"),
+    "python": ("#", None, None),
+}
+# Languages where a line's indentation is part of the code.
+_INDENT_SENSITIVE = {"python"}
+# Characters that cannot fuse with a neighbouring token, so spaces next to them are insignificant.
+_NO_SPACE = frozenset("()[]{},;")
+
+
+class DiffLine:
+    __slots__ = ("kind", "text", "old_line", "new_line")
+
+    def __init__(self, kind: str, text: str, old_line: int | None, new_line: int | None):
+        self.kind = kind  # " " context, "+" added, "-" removed
+        self.text = text
+        self.old_line = old_line
+        self.new_line = new_line
+
+
+class Hunk:
+    __slots__ = ("old_start", "old_count", "new_start", "new_count", "context", "lines")
+
+    def __init__(self, old_start: int, old_count: int, new_start: int, new_count: int, context: str):
+        self.old_start = old_start
+        self.old_count = old_count
+        self.new_start = new_start
+        self.new_count = new_count
+        self.context = context  # the `@@ ... @@ <enclosing line>` text git/GitLab put after the ranges
+        self.lines: list[DiffLine] = []
+
+    @property
+    def added_lines(self) -> list[int]:
+        return [line.new_line for line in self.lines if line.kind == "+"]
+
+    @property
+    def removed_lines(self) -> list[int]:
+        return [line.old_line for line in self.lines if line.kind == "-"]
+
+
+def parse_hunks(diff_text: str) -> list[Hunk]:
+    """Split a unified diff (GitLab `diff` field) into hunks with old/new line numbers."""
+    hunks: list[Hunk] = []
+    current: Hunk | None = None
+    a_line = b_line = 0
+    for line in (diff_text or "").splitlines():
+        if line.startswith("@@"):
+            m = _HUNK_HEADER.match(line)
+            if not m:
+                current = None
+                continue
+            a_line = int(m.group(1))
+            b_line = int(m.group(3))
+            current = Hunk(
+                a_line,
+                int(m.group(2)) if m.group(2) is not None else 1,
+                b_line,
+                int(m.group(4)) if m.group(4) is not None else 1,
+                (m.group(5) or "").rstrip(),
+            )
+            hunks.append(current)
+        elif current is None:
+            continue
+        elif line.startswith(" "):
+            current.lines.append(DiffLine(" ", line[1:], a_line, b_line))
+            a_line += 1
+            b_line += 1
+        elif line.startswith("-"):
+            current.lines.append(DiffLine("-", line[1:], a_line, None))
+            a_line += 1
+        elif line.startswith("+"):
+            current.lines.append(DiffLine("+", line[1:], None, b_line))
+            b_line += 1
+    return hunks
+
+
+def is_formatting_only(hunk: Hunk, language: str | None) -> bool:
+    """True when the hunk's added and removed code are equal once whitespace and comments are normalized.
+
+    Lines are compared as one joined text per side, so re-wrapping a statement across lines,
+    re-spacing and editing comments all count as formatting. Re-indenting only does in
+    languages where indentation is not part of the code.
+    """
+    added = [line.text for line in hunk.lines if line.kind == "+"]
+    removed = [line.text for line in hunk.lines if line.kind == "-"]
+    if not added and not removed:
+        return False
+    syntax = _COMMENT_SYNTAX.get(language or "", (None, None, None))
+    indented = language in _INDENT_SENSITIVE
+    return _normalize_code(added, syntax, indented) == _normalize_code(removed, syntax, indented)
+
+
+def _normalize_code(
+    lines: list[str],
+    syntax: tuple[str | None, str | None, str | None],
+    indented: bool = False,
+) -> str:
+    """Strip comments outside string literals and collapse each whitespace run to one space.
+
+    The space is dropped next to brackets, commas and semicolons, which never fuse with a
+    neighbouring token, so `f(a, b)` equals `f( a,b )` but `a - -b` does not equal `a--b`.
+    With `indented`, every logical line outside brackets starts with a newline and its
+    original indentation, so a dedent is a code change.
+    """
+    line_comment, block_open, block_close = syntax
+    text = "\n".join(lines)
+    out: list[str] = []
+    quote: str | None = None
+    depth = 0
+    space = False
+    line_start = indented
+    indent = ""
+
+    def emit(ch: str) -> None:
+        nonlocal space, line_start
+        if line_start:
+            out.append("\n" + indent)
+        elif space and out and out[-1][-1] not in _NO_SPACE and ch not in _NO_SPACE:
+            out.append(" ")
+        out.append(ch)
+        space = line_start = False
+
+    i, n = 0, len(text)
+    while i < n:
+        ch = text[i]
+        if quote:
+            if ch == "\n":  # unterminated on this line; the newline is handled as code below
+                quote = None
+                continue
+            out.append(ch)
+            if ch == "\\" and i + 1 < n:
+                out.append(text[i + 1])
+                i += 2
+                continue
+            if ch == quote:
+                quote = None
+            i += 1
+        elif ch in "\"'":
+            emit(ch)
+            quote = ch
+            i += 1
+        elif line_comment and text.startswith(line_comment, i):
+            end = text.find("\n", i)
+            i = n if end < 0 else end
+        elif block_open and text.startswith(block_open, i):
+            end = text.find(block_close, i + len(block_open))
+            i = n if end < 0 else end + len(block_close)
+        elif ch == "\n" and indented and depth == 0:
+            line_start, indent, space = True, "", False
+            i += 1
+        elif ch.isspace():
+            if line_start:
+                indent += ch
+            else:
+                space = True
+            i += 1
+        else:
+            if ch in "([{":
+                depth += 1
+            elif ch in ")]}":
+                depth = max(0, depth - 1)
+            emit(ch)
+            i += 1
+    return "".join(out)
@@ -0,0 +1,484 @@
+"""Local bare mirrors of GitLab projects, used as a content backend by the impact analyzer.
+
+Each project is cloned once with `git clone --mirror` and then only fetched incrementally when
+an MR needs commits the mirror does not have yet. The first clone runs in the background and
+callers use the API until it lands. File contents are read by `<sha>:<path>` through
+one long-lived `git cat-file --batch-command` process per mirror and diffs come from `git diff`, so an MR
+whose commits are already local costs no GitLab HTTP calls at all.
+"""
+from __future__ import annotations
+
+import base64
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterator
+from urllib.parse import quote
+
+from app.config import settings
+from app.metrics import metrics
+
+
+_ESCAPE = re.compile(r"\\(?:([0-7]{3})|(.))")
+_ESCAPES = {"a": "\a", "b": "\b", "t": "\t", "n": "\n", "v": "\v", "f": "\f", "r": "\r"}
+
+
+class GitMirrorError(RuntimeError):
+    """A git command against a mirror failed."""
+
+
+class CatFileBatch:
+    """A `git cat-file --batch-command` process answering object reads one at a time."""
+
+    def __init__(self, git_dir: Path):
+        self.git_dir = git_dir
+        self._proc: subprocess.Popen | None = None
+        self._lock = threading.Lock()
+
+    def read(self, spec: str) -> bytes | None:
+        """Content of the object named by `spec` (`<rev>:<path>` or a sha); None when it does not exist."""
+        if "\n" in spec:
+            return None
+        with self._lock:
+            proc = self._process()
+            try:
+                proc.stdin.write(b"contents " + spec.encode("utf-8") + b"\n")
+                proc.stdin.flush()
+                header = proc.stdout.readline()
+                if not header:
+                    raise GitMirrorError("git cat-file exited")
+                parts = header.split()
+                if len(parts) != 3:  # "<spec> missing" / "<spec> ambiguous"
+                    return None
+                size = int(parts[2])
+                data = proc.stdout.read(size)
+                proc.stdout.read(1)  # trailing newline
+            except (OSError, ValueError, GitMirrorError):
+                self._stop()
+                raise
+            return data if parts[1] == b"blob" else None
+
+    def object_type(self, spec: str) -> str | None:
+        if "\n" in spec:
+            return None
+        with self._lock:
+            proc = self._process()
+            try:
+                proc.stdin.write(b"info " + spec.encode("utf-8") + b"\n")
+                proc.stdin.flush()
+                parts = proc.stdout.readline().split()
+            except OSError:
+                self._stop()
+                raise
+        return parts[1].decode() if len(parts) == 3 else None
+
+    def _process(self) -> subprocess.Popen:
+        if self._proc is None or self._proc.poll() is not None:
+            self._proc = subprocess.Popen(
+                ["git", "--git-dir", str(self.git_dir), "cat-file", "--batch-command"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        return self._proc
+
+    def _stop(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            proc.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+    def close(self) -> None:
+        with self._lock:
+            self._stop()
+
+
+class GitMirror:
+    """One project's bare mirror: clone, incremental fetch, blob reads and diffs."""
+
+    def __init__(
+        self,
+        remote_url: str,
+        path: Path,
+        *,
+        fetch_interval_secs: float = 30.0,
+        token: str | None = None,
+        clone_timeout_secs: float = 1800.0,
+        fetch_timeout_secs: float = 300.0,
+    ):
+        self.remote_url = remote_url
+        self.path = Path(path)
+        self.fetch_interval_secs = fetch_interval_secs
+        self.clone_timeout_secs = clone_timeout_secs
+        self.fetch_timeout_secs = fetch_timeout_secs
+        self._token = token
+        self._lock = threading.Lock()
+        self._cat_file = CatFileBatch(self.path)
+        self._clone_thread: threading.Thread | None = None
+        self._clone_failed_at = float("-inf")
+        self._disk_bytes: int | None = None
+        self.last_fetch = 0.0
+        self.last_used = time.time()
+        self.leases = 0  # runs currently reading this mirror; guarded by the owning MirrorStore
+        self.evicted = False
+
+    def ensure(self, *commits: str) -> bool:
+        """Make sure every commit is local, fetching as needed; False if one is still missing.
+
+        Commits are immutable, so a mirror that has them is never refetched. A missing commit
+        triggers at most one fetch per `fetch_interval_secs`. A mirror that does not exist yet
+        starts cloning in the background and answers False until the clone is in place.
+        """
+        self.last_used = time.time()
+        with self._lock:
+            if not self.cloned:
+                self._start_clone()
+                metrics.incr("git_mirror.not_cloned")
+                return False
+            missing = [sha for sha in commits if sha and not self.has_commit(sha)]
+            if missing and time.monotonic() - self.last_fetch >= self.fetch_interval_secs:
+                self._fetch()
+                missing = [sha for sha in missing if not self.has_commit(sha)]
+        if missing:
+            metrics.incr("git_mirror.missing_commits", len(missing))
+        return not missing
+
+    @property
+    def cloned(self) -> bool:
+        return (self.path / "HEAD").exists()
+
+    @property
+    def cloning(self) -> bool:
+        thread = self._clone_thread
+        return thread is not None and thread.is_alive()
+
+    def has_commit(self, sha: str) -> bool:
+        return self._cat_file.object_type(sha) == "commit"
+
+    def read(self, rev: str, path: str) -> str | None:
+        self.last_used = time.time()
+        data = self._cat_file.read(f"{rev}:{path}")
+        if data is None:
+            metrics.incr("git_mirror.misses")
+            return None
+        metrics.incr("git_mirror.reads")
+        return data.decode("utf-8", errors="replace").lstrip('\ufeff')
+
+    def changes(self, base: str, head: str) -> Iterator[dict[str, Any]]:
+        """Diff entries between two commits, shaped like GitLab's MR `changes`."""
+        proc = subprocess.Popen(
+            [
+                "git", "--git-dir", str(self.path), "-c", "core.quotePath=false",
+                "diff", "--no-color", "--no-ext-diff", "-M", "--src-prefix=a/", "--dst-prefix=b/", base, head,
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            yield from _split_diff(line.decode("utf-8", errors="replace").rstrip("\n") for line in proc.stdout)
+        finally:
+            proc.stdout.close()
+            proc.wait()
+
+    def tree(self, commit: str) -> Iterator[str]:
+        """Paths of every file in the commit."""
+        yield from self._z_output("ls-tree", "-r", "-z", "--name-only", "--full-tree", commit)
+
+    def changed_paths(self, old: str, new: str) -> Iterator[str]:
+        """Paths that differ between two commits, both sides of a rename included."""
+        yield from self._z_output("diff", "--name-only", "-z", "--no-renames", old, new)
+
+    def disk_bytes(self) -> int:
+        """Size on disk, walked once and again only after a clone or fetch changed it."""
+        size = self._disk_bytes
+        if size is None:
+            size = 0
+            for root, _, files in os.walk(self.path):
+                for name in files:
+                    try:
+                        size += os.path.getsize(os.path.join(root, name))
+                    except OSError:
+                        continue
+            self._disk_bytes = size
+        return size
+
+    def close(self) -> None:
+        self._cat_file.close()
+
+    def _start_clone(self) -> None:
+        """Start the clone unless one is running or the last one failed under `fetch_interval_secs` ago."""
+        if self.cloning or time.monotonic() - self._clone_failed_at < self.fetch_interval_secs:
+            return
+        self._clone_thread = threading.Thread(target=self._clone, name="git-mirror-clone", daemon=True)
+        self._clone_thread.start()
+
+    def _clone(self) -> None:
+        started = time.perf_counter()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        try:
+            self._git(None, "clone", "--mirror", "--quiet", self.remote_url, str(tmp), timeout=self.clone_timeout_secs)
+            os.replace(tmp, self.path)
+            self._disk_bytes = None
+        except (GitMirrorError, OSError) as e:
+            shutil.rmtree(tmp, ignore_errors=True)
+            self._clone_failed_at = time.monotonic()
+            metrics.incr("git_mirror.failures", operation="clone", reason=type(e).__name__)
+            return
+        self.last_fetch = time.monotonic()
+        metrics.incr("git_mirror.clones")
+        metrics.observe("git_mirror.clone_latency", time.perf_counter() - started)
+
+    def _fetch(self) -> None:
+        started = time.perf_counter()
+        try:
+            self._git(self.path, "fetch", "--prune", "--quiet", "origin", timeout=self.fetch_timeout_secs)
+        finally:
+            self._disk_bytes = None  # even a failed fetch may have left new objects behind
+        self.last_fetch = time.monotonic()
+        # A running cat-file may not see packs added by the fetch.
+        self._cat_file.close()
+        metrics.incr("git_mirror.fetches")
+        metrics.observe("git_mirror.fetch_latency", time.perf_counter() - started)
+
+    def _git(self, git_dir: Path | None, *args: str, timeout: float | None = None) -> None:
+        command = ["git", *(("--git-dir", str(git_dir)) if git_dir else ()), *args]
+        try:
+            result = subprocess.run(command, env=self._env(), capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            raise GitMirrorError(f"git {args[0]} timed out after {timeout:g}s") from None
+        if result.returncode != 0:
+            raise GitMirrorError(f"git {args[0]} failed: {result.stderr.strip()}")
+
+    def _z_output(self, *args: str) -> Iterator[str]:
+        result = subprocess.run(["git", "--git-dir", str(self.path), *args], capture_output=True)
+        if result.returncode != 0:
+            raise GitMirrorError(f"git {args[0]} failed: {result.stderr.decode(errors='replace').strip()}")
+        self.last_used = time.time()
+        for name in result.stdout.split(b"\0"):
+            if name:
+                yield name.decode("utf-8", errors="replace")
+
+    def _env(self) -> dict[str, str]:
+        env = dict(os.environ, GIT_TERMINAL_PROMPT="0")
+        if self._token and self.remote_url.startswith(("http://", "https://")):
+            # Pass the token as a header through the environment so it never lands in the mirror's config.
+            basic = base64.b64encode(f"oauth2:{self._token}".encode()).decode()
+            env.update({
+                "GIT_CONFIG_COUNT": "1",
+                "GIT_CONFIG_KEY_0": "http.extraHeader",
+                "GIT_CONFIG_VALUE_0": f"Authorization: Basic {basic}",
+            })
+        return env
+
+
+class MirrorStore:
+    """Mirrors under one directory, one per project, kept within a disk budget (least recently used go first).
+
+    `mirror_for` hands out a lease; a leased or cloning mirror is never evicted, so callers
+    `release` it once the run is done reading.
+    """
+
+    def __init__(
+        self,
+        root: str | Path,
+        *,
+        remote_base: str,
+        token: str | None = None,
+        fetch_interval_secs: float = 30.0,
+        max_disk_bytes: int = 10 * 1024 * 1024 * 1024,
+        clone_timeout_secs: float = 1800.0,
+        fetch_timeout_secs: float = 300.0,
+    ):
+        self.root = Path(root)
+        self.remote_base = remote_base.rstrip("/")
+        self.token = token
+        self.fetch_interval_secs = fetch_interval_secs
+        self.max_disk_bytes = max_disk_bytes
+        self.clone_timeout_secs = clone_timeout_secs
+        self.fetch_timeout_secs = fetch_timeout_secs
+        self._mirrors: dict[str, GitMirror] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> MirrorStore:
+        return cls(
+            settings.GIT_MIRROR_DIR,
+            remote_base=str(settings.GITLAB_URL),
+            token=settings.GITLAB_TOKEN.get_secret_value(),
+            fetch_interval_secs=settings.GIT_MIRROR_FETCH_INTERVAL_SECS,
+            max_disk_bytes=settings.GIT_MIRROR_MAX_DISK_MB * 1024 * 1024,
+            clone_timeout_secs=settings.GIT_MIRROR_CLONE_TIMEOUT_SECS,
+            fetch_timeout_secs=settings.GIT_MIRROR_FETCH_TIMEOUT_SECS,
+        )
+
+    def remote_url(self, full_path: str) -> str:
+        if "://" in self.remote_base:
+            return f"{self.remote_base}/{full_path}.git"
+        # A local directory of repositories, e.g. for tests.
+        return str(Path(self.remote_base) / full_path)
+
+    def get(self, full_path: str) -> GitMirror:
+        with self._lock:
+            mirror = self._mirrors.get(full_path)
+            if mirror is None:
+                mirror = GitMirror(
+                    self.remote_url(full_path),
+                    self.root / f"{quote(full_path, safe='')}.git",
+                    fetch_interval_secs=self.fetch_interval_secs,
+                    token=self.token,
+                    clone_timeout_secs=self.clone_timeout_secs,
+                    fetch_timeout_secs=self.fetch_timeout_secs,
+                )
+                self._mirrors[full_path] = mirror
+            return mirror
+
+    def mirror_for(self, full_path: str, *commits: str) -> GitMirror | None:
+        """The project's mirror, leased, once it holds `commits`; None if unusable.
+
+        The store is trimmed afterwards. Pass a returned mirror to `release` when done with it.
+        """
+        mirror = self.get(full_path)
+        if not self.acquire(mirror):
+            return None
+        try:
+            ready = mirror.ensure(*commits)
+        except GitMirrorError as e:
+            metrics.incr("git_mirror.failures", operation="fetch", reason=type(e).__name__)
+            ready = False
+        if not ready:
+            self.release(mirror)
+        self.enforce_budget()
+        return mirror if ready else None
+
+    def acquire(self, mirror: GitMirror) -> bool:
+        """Take another lease on `mirror`; False if it has been evicted meanwhile."""
+        with self._lock:
+            if mirror.evicted:
+                return False
+            mirror.leases += 1
+            return True
+
+    def release(self, mirror: GitMirror) -> None:
+        with self._lock:
+            mirror.leases = max(0, mirror.leases - 1)
+
+    def enforce_budget(self) -> None:
+        with self._lock:
+            mirrors = sorted(self._mirrors.items(), key=lambda item: item[1].last_used)
+        sizes = {name: mirror.disk_bytes() for name, mirror in mirrors}
+        total = sum(sizes.values())
+        for name, mirror in mirrors:
+            if total <= self.max_disk_bytes:
+                break
+            with self._lock:
+                if mirror.leases or mirror.cloning or self._mirrors.get(name) is not mirror:
+                    continue
+                del self._mirrors[name]
+                mirror.evicted = True
+            mirror.close()
+            shutil.rmtree(mirror.path, ignore_errors=True)
+            total -= sizes[name]
+            metrics.incr("git_mirror.evictions")
+        metrics.set_gauge("git_mirror.disk_bytes", total)
+
+    def close(self) -> None:
+        with self._lock:
+            mirrors, self._mirrors = list(self._mirrors.values()), {}
+        for mirror in mirrors:
+            mirror.close()
+
+
+class MirrorContent:
+    """(path, ref) lookups against a mirror, interchangeable with the analyzer's prefetched blob map."""
+
+    def __init__(self, mirror: GitMirror):
+        self.mirror = mirror
+
+    def get(self, key: tuple[str, str], default: str | None = None) -> str | None:
+        path, ref = key
+        try:
+            content = self.mirror.read(ref, path)
+        except (OSError, ValueError, GitMirrorError):
+            return default
+        return default if content is None else content
+
+
+def _split_diff(lines: Iterator[str]) -> Iterator[dict[str, Any]]:
+    """Turn `git diff` output into GitLab-style entries (paths, flags and the hunk text as `diff`)."""
+    entry: dict[str, Any] | None = None
+    hunk_lines: list[str] = []
+
+    def finish() -> dict[str, Any]:
+        entry["diff"] = "\n".join(hunk_lines) + "\n" if hunk_lines else ""
+        return entry
+
+    for line in lines:
+        if line.startswith("diff --git "):
+            if entry is not None:
+                yield finish()
+            a_path, b_path = _paths_from_header(line[len("diff --git "):])
+            entry = {
+                "old_path": a_path,
+                "new_path": b_path,
+                "new_file": False,
+                "renamed_file": False,
+                "deleted_file": False,
+            }
+            hunk_lines = []
+        elif entry is None:
+            continue
+        elif hunk_lines or line.startswith("@@"):
+            hunk_lines.append(line)
+        elif line.startswith("new file mode"):
+            entry["new_file"] = True
+        elif line.startswith("deleted file mode"):
+            entry["deleted_file"] = True
+        elif line.startswith("rename from "):
+            entry["renamed_file"] = True
+            entry["old_path"] = _unquote(line[len("rename from "):])
+        elif line.startswith("rename to "):
+            entry["new_path"] = _unquote(line[len("rename to "):])
+        elif line.startswith("--- a/"):
+            entry["old_path"] = _unquote(line[len("--- a/"):])
+        elif line.startswith("+++ b/"):
+            entry["new_path"] = _unquote(line[len("+++ b/"):])
+        elif line.startswith("Binary files "):
+            entry["binary"] = True
+    if entry is not None:
+        yield finish()
+
+
+def _paths_from_header(rest: str) -> tuple[str, str]:
+    if rest.startswith('"'):
+        a_end = rest.index('"', 1)
+        return _unquote(rest[:a_end + 1])[2:], _unquote(rest[a_end + 2:])[2:]
+    # "a/<path> b/<path>" with identical paths unless renamed; the ---/+++ lines refine it.
+    half = (len(rest) - 1) // 2
+    if rest[half] == " " and rest[2:half] == rest[half + 3:]:
+        return rest[2:half], rest[half + 3:]
+    a, _, b = rest.partition(" b/")
+    return a[2:], b
+
+
+def _unquote(value: str) -> str:
+    """Undo git's C-style quoting of unusual paths ("a/tab\\there")."""
+    value = value.rstrip("\t")
+    if len(value) < 2 or value[0] != '"' or value[-1] != '"':
+        return value
+    return _ESCAPE.sub(
+        lambda m: chr(int(m.group(1), 8)) if m.group(1) else _ESCAPES.get(m.group(2), m.group(2)),
+        value[1:-1],
+    )
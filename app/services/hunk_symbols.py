@@ -0,0 +1,266 @@
+"""Diff-only symbol resolution for small edits.
+
+GitLab diffs carry the enclosing declaration in each hunk header (`@@ -10,6 +10,7 @@ public void Foo()`)
+and a few lines of context around every change. When every hunk of a file can be pinned to a single
+member from that information alone, the impacted symbols are known without fetching or parsing the
+file. Anything uncertain (a declaration or brace that changed, a change that crosses a member
+boundary, a member declaration that is not in the hunk's context lines) makes the whole file fall
+back to the regular fetch + parse path.
+"""
+from __future__ import annotations
+
+import re
+
+from app.services.diff_parser import Hunk
+from app.services.impact_records import Span, Symbol
+
+_CS_MODIFIERS = (
+    r"(?:public|private|protected|internal|static|virtual|override|abstract|sealed|async|extern"
+    r"|unsafe|new|partial|readonly|required|file)"
+)
+_CS_METHOD = re.compile(
+    r"^\s*(?:\[[^\]]*\]\s*)*(?P<mods>(?:" + _CS_MODIFIERS + r"\s+)*)"
+    r"(?:(?P<type>[\w.?\[\],]+(?:<[^()]*>)?[?\[\]]*)\s+)?"
+    r"(?P<name>~?[A-Za-z_]\w*)\s*(?:<[^()]*>)?\s*\("
+)
+_CS_PROPERTY = re.compile(
+    r"^\s*(?:\[[^\]]*\]\s*)*(?P<mods>(?:" + _CS_MODIFIERS + r"\s+)+)"
+    r"(?P<type>[\w.?\[\],]+(?:<[^()]*>)?[?\[\]]*)\s+(?P<name>[A-Za-z_]\w*)\s*(?:\{|=>|$)"
+)
+_CS_CONTAINER = re.compile(
+    r"^\s*(?:\[[^\]]*\]\s*)*(?:" + _CS_MODIFIERS + r"\s+)*"
+    r"(?P<kind>class|struct|interface|record|enum|namespace)\s+(?P<name>[A-Za-z_][\w.]*)"
+)
+_CS_NOT_DECLARATION = {
+    "if", "for", "foreach", "while", "switch", "catch", "using", "lock", "return", "new", "nameof",
+    "typeof", "sizeof", "default", "base", "this", "await", "throw", "else", "yield", "case", "when",
+    "is", "as", "in", "out", "ref", "var", "fixed", "checked", "unchecked", "goto",
+}
+
+_PY_FUNCTION = re.compile(r"^\s*(?:async\s+)?def\s+(?P<name>[A-Za-z_]\w*)\s*\(")
+_PY_CLASS = re.compile(r"^\s*class\s+(?P<name>[A-Za-z_]\w*)")
+
+
+def _indent(text: str) -> int:
+    return len(text) - len(text.lstrip())
+
+
+class _CSharpRules:
+    @staticmethod
+    def member(text: str) -> tuple[str, str] | None:
+        stripped = text.strip()
+        if not stripped or stripped.endswith(";") or stripped.startswith(("//", "/*", "*")):
+            return None
+        m = _CS_METHOD.match(text)
+        if m:
+            name, type_ = m.group("name"), m.group("type")
+            if name in _CS_NOT_DECLARATION or (type_ and type_ in _CS_NOT_DECLARATION):
+                return None
+            if not type_ and not m.group("mods").strip():
+                return None  # a bare call such as `Foo(x)` rather than a constructor
+            if not type_:
+                return "constructor", name
+            return "method", name
+        m = _CS_PROPERTY.match(text)
+        if m and m.group("name") not in _CS_NOT_DECLARATION:
+            return "property", m.group("name")
+        return None
+
+    @staticmethod
+    def container(text: str) -> tuple[str, str] | None:
+        m = _CS_CONTAINER.match(text)
+        return (m.group("kind"), m.group("name")) if m else None
+
+    @staticmethod
+    def closes(text: str, indent: int) -> bool:
+        return text.strip().startswith("}") and _indent(text) <= indent
+
+    @staticmethod
+    def closes_inline(text: str) -> bool:
+        """A declaration whose body opens and closes on its own line, e.g. `class Empty { }`."""
+        return "{" in text and text.count("}") >= text.count("{")
+
+
+class _PythonRules:
+    @staticmethod
+    def member(text: str) -> tuple[str, str] | None:
+        m = _PY_FUNCTION.match(text)
+        if not m:
+            return None
+        return ("method" if _indent(text) else "function"), m.group("name")
+
+    @staticmethod
+    def container(text: str) -> tuple[str, str] | None:
+        m = _PY_CLASS.match(text)
+        return ("class", m.group("name")) if m else None
+
+    @staticmethod
+    def closes(text: str, indent: int) -> bool:
+        stripped = text.strip()
+        return bool(stripped) and not stripped.startswith("#") and _indent(text) <= indent
+
+    @staticmethod
+    def closes_inline(text: str) -> bool:
+        return False
+
+
+_RULES = {
+    "csharp": _CSharpRules,
+    "python": _PythonRules,
+}
+
+
+def supports(language: str | None) -> bool:
+    return language in _RULES
+
+
+class HunkImpact:
+    __slots__ = ("symbol", "changed_lines", "removed_lines", "snippet_lines")
+
+    def __init__(
+        self,
+        symbol: Symbol,
+        changed_lines: list[int],
+        removed_lines: list[int],
+        snippet_lines: list[str],
+    ):
+        self.symbol = symbol
+        self.changed_lines = changed_lines
+        self.removed_lines = removed_lines
+        self.snippet_lines = snippet_lines
+
+    @property
+    def snippet(self) -> str:
+        return "\n".join(self.snippet_lines)
+
+
+def resolve_from_diff(hunks: list[Hunk], language: str | None) -> list[HunkImpact] | None:
+    """Return impacted members per symbol for parsed `hunks`, or None when any hunk is ambiguous."""
+    rules = _RULES.get(language or "")
+    if rules is None or not hunks:
+        return None
+
+    merged: dict[tuple[str, str | None], HunkImpact] = {}
+    for hunk in hunks:
+        if not hunk.lines or all(line.kind == " " for line in hunk.lines):
+            return None
+        impact = _resolve_hunk(hunk, rules)
+        if impact is None:
+            return None
+        # Hunks of one member share its declaration; the signature keeps same-named members apart.
+        key = (impact.symbol.qualified_name, impact.symbol.signature)
+        existing = merged.get(key)
+        if existing is None:
+            merged[key] = impact
+            continue
+        existing.changed_lines.extend(impact.changed_lines)
+        existing.removed_lines.extend(impact.removed_lines)
+        existing.snippet_lines.extend(impact.snippet_lines)
+        existing.symbol.span.start_line = min(existing.symbol.span.start_line, impact.symbol.span.start_line)
+        existing.symbol.span.end_line = max(existing.symbol.span.end_line, impact.symbol.span.end_line)
+
+    return list(merged.values())
+
+
+def _resolve_hunk(hunk: Hunk, rules) -> HunkImpact | None:
+    lines = hunk.lines
+    changes = [i for i, line in enumerate(lines) if line.kind != " "]
+    first, last = changes[0], changes[-1]
+
+    # A changed declaration means symbol boundaries moved; only a real parse can tell.
+    for i in changes:
+        if rules.member(lines[i].text) or rules.container(lines[i].text):
+            return None
+
+    # The declaration must be in the leading context. A member named only by the hunk header has
+    # no known start line, and its type and namespace lie outside the hunk, so leave it to the parser.
+    decl_index = None
+    member = None
+    for i in range(first - 1, -1, -1):
+        member = rules.member(lines[i].text)
+        if member:
+            decl_index = i
+            break
+        if rules.container(lines[i].text):
+            break
+    if not member:
+        return None
+    decl_text = lines[decl_index].text
+    start_line = lines[decl_index].new_line
+
+    indent = _indent(decl_text)
+    for i in range(decl_index + 1, first):
+        if rules.closes(lines[i].text, indent):
+            return None
+
+    # Every change must sit inside the member body: deeper than the declaration and before it closes.
+    closed = False
+    for i in range(first, last + 1):
+        line = lines[i]
+        if line.kind == " ":
+            if rules.closes(line.text, indent):
+                closed = True
+            continue
+        if closed or (line.text.strip() and _indent(line.text) <= indent):
+            return None
+
+    # The nearest enclosing type above the member qualifies it; a namespace is only kept alongside
+    # a known type, otherwise the location would read as if the member were a type in that namespace.
+    # A declaration encloses the member only if it is indented less than what it contains and has
+    # not closed in between; a type or namespace line that fails that before the member's type is
+    # known (a sibling, or a header naming an unrelated type) leaves the file to the parser.
+    container = namespace = None
+    limit = indent
+    between: list[str] = []
+    for text in [*(lines[i].text for i in range(decl_index - 1, -1, -1)), hunk.context]:
+        found = rules.container(text)
+        if not found:
+            between.append(text)
+            continue
+        file_scoped = found[0] == "namespace" and text.rstrip().endswith(";")
+        encloses = (
+            (file_scoped or _indent(text) < limit)
+            and not rules.closes_inline(text)
+            and not any(rules.closes(other, _indent(text)) for other in between)
+        )
+        between.append(text)
+        if not encloses:
+            if container is None:
+                return None
+            continue
+        if found[0] == "namespace":
+            namespace = found[1]
+            break
+        container = container or found[1]
+        limit = _indent(text)
+    if container is None:
+        namespace = None
+
+    kind, name = member
+    qualifiers = [container] if container else []
+    qualified = ".".join([*qualifiers, name])
+    end_line = max(line.new_line for line in lines if line.new_line is not None)
+    symbol = Symbol(
+        Span(start_line, end_line),
+        kind=kind,
+        name=name,
+        display_name=qualified,
+        qualified_name=qualified,
+        qualifiers=qualifiers,
+        namespace=namespace,
+        signature=decl_text.strip().rstrip("{").strip() or None,
+    )
+
+    if hunk.added_lines:
+        snippet = [
+            f"{line.new_line:5d}{'>>' if line.kind == '+' else '  '} {line.text}"
+            for line in lines
+            if line.kind != "-"
+        ]
+    else:
+        # Nothing survives on the new side; show the removed code with base line numbers.
+        snippet = [
+            f"{line.old_line:5d}{'--' if line.kind == '-' else '  '} {line.text}"
+            for line in lines
+        ]
+    return HunkImpact(symbol, hunk.added_lines, hunk.removed_lines, snippet)
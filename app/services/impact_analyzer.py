@@ -1,116 +1,692 @@
 from __future__ import annotations
 
 import os
-from typing import Any, Iterable
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from functools import partial
+from typing import Any, Iterable, Iterator
 
-from app.services.code_analyzer.cs_code_analyzer import analyze_cs_file_with_roslyn
+from app.clients.gitlab_client import MergeRequestSnapshot, fetch_mr_snapshot
+from app.clients.gitlab_graphql import BlobBatchFetcher
+from app.clients.hedging import HedgedCalls
+from app.config import settings
+from app.metrics import metrics
+from app.services import hunk_symbols
+from app.services.code_analyzer.registry import ParserError, ParserRegistry, ParserSpec, default_registry
+from app.services.dependency_index import DependencyIndex, DependencyIndexStore
+from app.services.diff_parser import Hunk, is_formatting_only, parse_hunks
+from app.services.git_mirror import GitMirror, MirrorContent, MirrorStore
+from app.services.impact_records import Block, FileImpact, Span, Symbol
+from app.services.path_classifier import PathClassifier, PathDecision
+from app.services.symbol_cache import SymbolCache
+
+_COMMIT_SHA = re.compile(r"[0-9a-f]{40}|[0-9a-f]{64}")
+_REMOVED_LINE = re.compile(r"^-", re.M)
+_RAW_CHUNK_BYTES = 64 * 1024
+
+
+class FileTooLargeError(ValueError):
+    """A file is larger than ANALYZER_MAX_FILE_BYTES; it is skipped instead of parsed."""
+
+    def __init__(self, path: str, size: int, limit: int):
+        super().__init__(f"{path} is larger than {limit} bytes")
+        self.path = path
+        self.size = size  # bytes read before giving up, i.e. a lower bound
+        self.limit = limit
 
 
 class ImpactAnalyzer:
-    def __init__(self, gitlab_client):
+    def __init__(
+        self,
+        gitlab_client,
+        symbol_cache: SymbolCache | None = None,
+        parsers: ParserRegistry | None = None,
+        blob_fetcher: BlobBatchFetcher | None = None,
+        mirrors: MirrorStore | None = None,
+        hedger: HedgedCalls | None = None,
+        dependency_index: DependencyIndexStore | None = None,
+    ):
         self.gl = gitlab_client
+        self.parsers = parsers or default_registry()
+        self.symbol_cache = symbol_cache or SymbolCache(
+            max_entries=settings.SYMBOL_CACHE_MAX_ENTRIES,
+            disk_dir=settings.SYMBOL_CACHE_DIR,
+            disk_max_bytes=settings.SYMBOL_CACHE_MAX_DISK_MB * 1024 * 1024,
+            dump=self._dump_parse_result,
+            load=self._unwrap_analysis,
+        )
+        # Base revisions are shared by every MR against the same target commit, so their
+        # symbol tables (and lines, for snippets of removed code) are kept per (project, sha, path).
+        self.base_symbols = SymbolCache(
+            max_entries=settings.BASE_SYMBOL_CACHE_MAX_ENTRIES,
+            name="base_symbol_cache",
+        )
+        self._base_pool: ThreadPoolExecutor | None = None
+        self._base_pool_lock = threading.Lock()
+        self.blob_fetcher = blob_fetcher or (BlobBatchFetcher.from_settings() if settings.ANALYZER_BATCH_BLOBS else None)
+        self.mirrors = mirrors or (
+            MirrorStore.from_settings() if settings.ANALYZER_GIT_MIRROR and settings.GIT_MIRROR_DIR else None
+        )
+        self.hedger = hedger or (HedgedCalls.from_settings() if settings.ANALYZER_HEDGED_FETCH else None)
+        self._classifiers: dict[str | None, PathClassifier] = {}
+        self.dependency_index = dependency_index or (
+            DependencyIndexStore.from_settings() if settings.ANALYZER_DEPENDENTS else None
+        )
 
-    def get_impacted_code_areas(self, project_id: int, merge_request_id: int):
+    def get_impacted_code_areas(
+        self,
+        project_id: int,
+        merge_request_id: int,
+        snapshot: MergeRequestSnapshot | None = None,
+    ):
+        """Analyze the MR; pass the run's `snapshot` to reuse its metadata and diffs instead of refetching."""
+        mirror = None
         try:
-            project = self.gl.projects.get(project_id)
-            mr = project.mergerequests.get(merge_request_id)
+            # File reads only need the project id, so the project itself is never fetched.
+            project = self.gl.projects.get(project_id, lazy=True)
+            mr = snapshot or fetch_mr_snapshot(self.gl, project_id, merge_request_id)
 
             head_ref, base_ref = self._mr_refs(mr)
-            summary = mr.changes()
-            mr_diff_files = summary.get("changes", [])
-            if not mr_diff_files:
-                return {"files": [], "skipped": []}
+            mirror = self._mirror_for(mr, head_ref, base_ref)
 
-            impacted_files: list[dict[str, Any]] = []
+            impacted_files: list[FileImpact] = []
             skipped: list[dict[str, Any]] = []
             summary_acc = self._summary_bucket()
+            analysis_paths = {"diff": 0, "parse": 0}
+            formatting_only = 0
+            container_changes: dict[str, int] = {}
+            path_rules: dict[str, int] = {}
+            budget: dict[str, Any] = {}
 
-            for file in mr_diff_files:
-                try:
-                    new_path = file.get("new_path")
-                    old_path = file.get("old_path")
-                    is_new = file.get("new_file", False)
-                    is_deleted = file.get("deleted_file", False)
-                    is_renamed = file.get("renamed_file", False)
-                    is_binary = file.get("binary", False)
-                    diff_text = file.get("diff", "")
-
-                    path_for_check = new_path or old_path or ""
-                    if is_binary or not self.is_code_file(path_for_check):
-                        skipped.append({"file": path_for_check, "reason": "non-code or binary"})
-                        continue
+            # Entries are consumed as they arrive, so a paginated snapshot only ever holds the
+            # pages still being analyzed; the caps stop reading further pages altogether.
+            # A paginated snapshot with a ready mirror diffs locally and never pages over HTTP.
+            local_diffs = mirror.changes(base_ref, head_ref) if mirror and mr.paginated else None
+            entries = self._capped_diffs(mr.iter_changes(local_diffs), budget)
+            analyzed = 0
+            for impacted, skip in self._analyze_files(project, mr, head_ref, base_ref, entries, mirror):
+                analyzed += 1
+                if impacted:
+                    impacted_files.append(impacted)
+                    analysis_paths[impacted.analysis_path] += 1
+                    formatting_only += impacted.formatting_only_hunks
+                    self._update_summary(summary_acc, impacted.path, [*impacted.blocks, *impacted.collapsed])
+                    for block in impacted.collapsed:
+                        location = block.location or block.symbol.qualified_name or block.symbol.name
+                        container_changes[location] = (
+                            container_changes.get(location, 0)
+                            + len(block.changed_lines)
+                            + len(block.removed_lines or ())
+                        )
+                if skip:
+                    skipped.append(skip)
+                    formatting_only += skip.get("formatting_only_hunks", 0)
+                    if skip.get("rule"):
+                        path_rules[skip["rule"]] = path_rules.get(skip["rule"], 0) + 1
 
-                    if is_deleted:
-                        path = old_path
-                        if not path:
-                            skipped.append({"file": path_for_check, "reason": "deleted_file but old_path missing"})
-                            continue
-                        refs_to_try = [base_ref, mr.target_branch]
-                    else:
-                        path = new_path
-                        if not path:
-                            skipped.append({"file": path_for_check, "reason": "no new_path to read"})
-                            continue
-                        refs_to_try = [head_ref, mr.source_branch, mr.target_branch]
-
-                    ext = self.get_extension(path)
-                    handler = self.get_handler(ext)
-                    if not handler:
-                        skipped.append({"file": path, "reason": f"no handler for {ext}"})
-                        continue
-
-                    try:
-                        file_content = self._try_get_file_content(project, path, refs_to_try)
-                    except Exception as fe:
-                        skipped.append({"file": path, "reason": f"fetch failed @ {refs_to_try}: {fe}"})
-                        continue
-
-                    analysis_output = handler(file_content)
-                    language, symbols = self._unwrap_analysis(analysis_output)
-                    language = language or self._language_for_extension(ext)
-
-                    if is_deleted:
-                        blocks = self.get_impacted_blocks(symbols, None, file_content, "file deleted")
-                        if blocks:
-                            impacted_files.append({
-                                "path": path,
-                                "language": language,
-                                "change": "deleted",
-                                "blocks": blocks,
-                            })
-                            self._update_summary(summary_acc, path, blocks)
-                        else:
-                            skipped.append({"file": path, "reason": "no symbols found in deleted file"})
-                        continue
+            if not analyzed:
+                return {"files": [], "skipped": []}
 
-                    changed_lines = set(self.get_changed_lines_from_diff(diff_text))
-                    blocks = self.get_impacted_blocks(symbols, changed_lines, file_content, "overlaps changed lines")
-                    if blocks:
-                        impacted_files.append({
-                            "path": path,
-                            "language": language,
-                            "change": "new" if is_new else ("renamed" if is_renamed else "modified"),
-                            "blocks": blocks,
-                        })
-                        self._update_summary(summary_acc, path, blocks)
-                    else:
-                        skipped.append({"file": path, "reason": "no symbols overlap changed lines"})
-
-                except Exception as per_file_err:
-                    skipped.append({
-                        "file": file.get("new_path") or file.get("old_path") or "?",
-                        "reason": f"unexpected: {per_file_err}"
-                    })
-                    continue
+            dependents = (
+                self._dependents(project, mr, mirror, base_ref, impacted_files) if self.dependency_index else None
+            )
 
-            payload = {"files": impacted_files, "skipped": skipped}
+            payload = {
+                "files": [f.to_dict() for f in impacted_files],
+                "skipped": skipped,
+                "analysis_paths": analysis_paths,
+            }
+            if budget:
+                payload["truncated"] = budget
+            if dependents:
+                payload["dependents"] = dependents
             summary = self._finalize_summary(summary_acc)
+            if formatting_only:
+                summary["formatting_only_hunks"] = formatting_only
+            if container_changes:
+                summary["container_changes"] = dict(sorted(container_changes.items()))
+            if path_rules:
+                summary["path_rules"] = dict(sorted(path_rules.items()))
             if summary:
                 payload["summary"] = summary
             return payload
 
         except Exception as e:
             return {"files": [], "skipped": [], "error": f"Error at MR level: {e}"}
+        finally:
+            if mirror is not None:
+                self.mirrors.release(mirror)
+
+    def _capped_diffs(self, entries: Iterable[dict[str, Any]], budget: dict[str, Any]) -> Iterator[dict[str, Any]]:
+        """Pass entries through until ANALYZER_MAX_FILES or ANALYZER_MAX_DIFF_BYTES is reached.
+
+        When a cap stops the stream, `budget` records which one and how much was analyzed.
+        """
+        max_files = settings.ANALYZER_MAX_FILES
+        max_bytes = settings.ANALYZER_MAX_DIFF_BYTES
+        files = total_bytes = 0
+        for entry in entries:
+            size = len((entry.get("diff") or "").encode("utf-8"))
+            limit = None
+            if max_files and files >= max_files:
+                limit = "ANALYZER_MAX_FILES"
+            elif max_bytes and files and total_bytes + size > max_bytes:
+                limit = "ANALYZER_MAX_DIFF_BYTES"
+            if limit:
+                budget.update({"limit": limit, "files": files, "diff_bytes": total_bytes})
+                metrics.incr("analyzer.truncated", limit=limit)
+                return
+            files += 1
+            total_bytes += size
+            yield entry
+
+    def _analyze_files(
+        self,
+        project,
+        mr,
+        head_ref,
+        base_ref,
+        mr_diff_files: Iterable[dict[str, Any]],
+        mirror: GitMirror | None = None,
+    ) -> Iterator[tuple[FileImpact | None, dict[str, Any] | None]]:
+        """Analyze diff entries as they arrive, concurrently when allowed; results keep the diff order.
+
+        At most two entries per worker are in flight, so a streamed diff is never held in full.
+        Entries the path classifier rules out are reported without reading anything. File
+        contents come from `mirror` when given, else from batched or per-file API reads.
+        """
+        workers = max(1, settings.ANALYZER_MAX_PARALLELISM)
+        classified = self._classified(mr_diff_files, self.path_classifier(self._project_full_path(mr)))
+        local = MirrorContent(mirror) if mirror else None
+        full_path = self._project_full_path(mr) if self.blob_fetcher and not local else None
+        # With batching, entries are read a window at a time and their blobs fetched in one
+        # request per ref; files the batch missed fall back to per-file reads.
+        window_size = self.blob_fetcher.batch_size if full_path else 1
+
+        if workers == 1:
+            for window in self._windows(classified, window_size):
+                blobs = local or self._prefetch_blobs(project, full_path, window, head_ref, base_ref)
+                for file, decision in window:
+                    if decision.skip:
+                        yield None, decision.skip
+                        continue
+                    yield self._analyze_file(
+                        project, mr, head_ref, base_ref, file, self._run_handler, blobs, decision.language
+                    )
+            return
+
+        # File fetches are I/O bound and get one thread each; parser calls go through a
+        # separate, smaller pool so a large MR cannot start dozens of analyzers at once.
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="impact-io") as io_pool, \
+                ThreadPoolExecutor(max_workers=max(1, settings.ANALYZER_PARSER_PARALLELISM), thread_name_prefix="impact-parse") as parse_pool:
+            def run_handler(handler, content):
+                return parse_pool.submit(handler, content).result()
+
+            pending: deque[Future] = deque()
+            for window in self._windows(classified, window_size):
+                blobs = local or self._prefetch_blobs(project, full_path, window, head_ref, base_ref)
+                for file, decision in window:
+                    if decision.skip:
+                        ruled_out: Future = Future()
+                        ruled_out.set_result((None, decision.skip))
+                        pending.append(ruled_out)
+                        continue
+                    pending.append(io_pool.submit(
+                        self._analyze_file,
+                        project, mr, head_ref, base_ref, file, run_handler, blobs, decision.language,
+                    ))
+                    if len(pending) >= max(workers * 2, window_size):
+                        yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def _dependents(
+        self, project, mr, mirror: GitMirror | None, base_ref: str, impacted_files: list[FileImpact]
+    ) -> list[dict[str, Any]] | None:
+        """Symbols of the target branch that use the impacted ones, up to ANALYZER_DEPENDENT_HOPS away.
+
+        The index of the base commit is built in the background on first use; until it is ready
+        (or DEPENDENCY_INDEX_WAIT_SECS passes) the run reports no dependents.
+        """
+        if not impacted_files or not _COMMIT_SHA.fullmatch(base_ref or ""):
+            return None
+        full_path = self._project_full_path(mr)
+        key = full_path or str(getattr(project, "id", "") or "")
+        if not key:
+            return None
+        build = partial(self._build_dependency_index, project, mirror, full_path, key, base_ref)
+        future = self.dependency_index.ensure(key, mr.target_branch, base_ref, build)
+        try:
+            index = future.result(timeout=settings.DEPENDENCY_INDEX_WAIT_SECS)
+        except FuturesTimeout:
+            metrics.incr("dependency_index.not_ready")
+            return None
+        except Exception:
+            return None
+
+        impacted = [(f.path, block.symbol) for f in impacted_files for block in self._innermost(f.blocks)]
+        return index.dependents(
+            {symbol.name for _, symbol in impacted if symbol.name},
+            hops=settings.ANALYZER_DEPENDENT_HOPS,
+            limit=settings.ANALYZER_MAX_DEPENDENTS,
+            max_fanout=settings.DEPENDENCY_INDEX_MAX_FANOUT,
+            exclude={(path, symbol.qualified_name or symbol.name) for path, symbol in impacted},
+        )
+
+    def _innermost(self, blocks: list[Block]) -> list[Block]:
+        """Blocks that contain no other block; a changed method stands for its class and namespace."""
+        return [
+            block for block in blocks
+            if not any(other is not block and block.span.contains(other.span) for other in blocks)
+        ]
+
+    def _build_dependency_index(
+        self,
+        project,
+        mirror: GitMirror | None,
+        full_path: str | None,
+        key: str,
+        commit: str,
+        previous: DependencyIndex | None,
+    ) -> DependencyIndex:
+        """Index `commit`, parsing only the files changed since `previous` when there is one."""
+        # The build can outlive the run that started it, so it holds its own lease on the mirror.
+        if mirror is not None and not self.mirrors.acquire(mirror):
+            mirror = None
+        try:
+            return self._index_files(project, mirror, full_path, key, commit, previous)
+        finally:
+            if mirror is not None:
+                self.mirrors.release(mirror)
+
+    def _index_files(
+        self,
+        project,
+        mirror: GitMirror | None,
+        full_path: str | None,
+        key: str,
+        commit: str,
+        previous: DependencyIndex | None,
+    ) -> DependencyIndex:
+        changed = self._changed_paths(project, mirror, previous.commit, commit) if previous else None
+        if changed is None:
+            files: dict[str, list] = {}
+            paths = list(self._repository_paths(project, mirror, commit))
+        else:
+            files = {path: symbols for path, symbols in previous.files.items() if path not in changed}
+            paths = sorted(changed)
+
+        classifier = self.path_classifier(full_path)
+        blobs = MirrorContent(mirror) if mirror else None
+
+        def index_file(path: str) -> tuple[str, list | None]:
+            decision = classifier.classify({"new_path": path})
+            parser = None if decision.skip else self.get_parser(self.get_extension(path), decision.language)
+            if not parser:
+                return path, None
+            try:
+                content = self._try_get_file_content(project, path, [commit], blobs)
+                _, symbols = self._parse(parser, content, self._run_handler)
+            except Exception:
+                # Deleted since the previous index, oversized or unparsable: the file is left out.
+                return path, None
+            return path, [
+                [symbol.qualified_name or symbol.name, symbol.kind, symbol.references]
+                for symbol in symbols
+                if symbol.references
+            ]
+
+        workers = max(1, settings.ANALYZER_MAX_PARALLELISM)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dependency-index-io") as pool:
+            for path, symbols in pool.map(index_file, paths):
+                if symbols:
+                    files[path] = symbols
+        metrics.incr("dependency_index.files_parsed", len(paths))
+        return DependencyIndex(key, commit, files)
+
+    def _repository_paths(self, project, mirror: GitMirror | None, commit: str) -> Iterator[str]:
+        if mirror:
+            yield from mirror.tree(commit)
+            return
+        for item in project.repository_tree(ref=commit, recursive=True, iterator=True, per_page=100):
+            if item.get("type") == "blob":
+                yield item["path"]
+
+    def _changed_paths(self, project, mirror: GitMirror | None, old: str, new: str) -> set[str] | None:
+        """Paths that differ between two commits; None when GitLab could not compare them in full."""
+        if mirror:
+            return set(mirror.changed_paths(old, new))
+        result = project.repository_compare(old, new, straight=True)
+        if result.get("compare_timeout") or result.get("overflow"):
+            return None
+        paths: set[str] = set()
+        for diff in result.get("diffs") or []:
+            paths.update(p for p in (diff.get("old_path"), diff.get("new_path")) if p)
+        return paths
+
+    def _mirror_for(self, mr, head_ref: str, base_ref: str) -> GitMirror | None:
+        """The project's local mirror once it holds both MR commits; None to use the GitLab API."""
+        if not self.mirrors or not (_COMMIT_SHA.fullmatch(head_ref or "") and _COMMIT_SHA.fullmatch(base_ref or "")):
+            return None
+        full_path = self._project_full_path(mr)
+        return self.mirrors.mirror_for(full_path, base_ref, head_ref) if full_path else None
+
+    def path_classifier(self, full_path: str | None = None) -> PathClassifier:
+        """The compiled path rules of a project (None = rules shared by all projects)."""
+        classifier = self._classifiers.get(full_path)
+        if classifier is None:
+            classifier = self._classifiers[full_path] = PathClassifier.for_project(full_path)
+        return classifier
+
+    def _classified(
+        self, entries: Iterable[dict[str, Any]], classifier: PathClassifier
+    ) -> Iterator[tuple[dict[str, Any], PathDecision]]:
+        for entry in entries:
+            decision = classifier.classify(entry)
+            if decision.rule:
+                metrics.incr("analyzer.path_rule_skips", rule=decision.rule)
+            yield entry, decision
+
+    def _windows(self, entries: Iterable[Any], size: int) -> Iterator[list[Any]]:
+        window: list[Any] = []
+        for entry in entries:
+            window.append(entry)
+            if len(window) >= size:
+                yield window
+                window = []
+        if window:
+            yield window
+
+    def _project_full_path(self, mr) -> str | None:
+        """`group/project` from the MR's `references.full` (`group/project!12`)."""
+        full = (getattr(mr, "references", None) or {}).get("full")
+        return full.rsplit("!", 1)[0] if full else None
+
+    def _prefetch_blobs(
+        self,
+        project,
+        full_path: str | None,
+        window: list[tuple[dict[str, Any], PathDecision]],
+        head_ref: str,
+        base_ref: str,
+    ) -> dict[tuple[str, str], str] | None:
+        """Fetch every blob the window's analyzed files will read, one batched request per ref."""
+        if not full_path:
+            return None
+        wanted: dict[str, list[str]] = {}
+        for file, decision in window:
+            if decision.skip:
+                continue
+            for path, ref in self._blob_needs(project, file, head_ref, base_ref):
+                wanted.setdefault(ref, []).append(path)
+        blobs: dict[tuple[str, str], str] = {}
+        for ref, paths in wanted.items():
+            for path, text in self.blob_fetcher.fetch(full_path, ref, paths).items():
+                blobs[(path, ref)] = text
+        return blobs
+
+    def _blob_needs(self, project, file: dict[str, Any], head_ref: str, base_ref: str) -> list[tuple[str, str]]:
+        """(path, ref) pairs `_analyze_file` is going to read for this entry, on its first-choice refs."""
+        new_path, old_path = file.get("new_path"), file.get("old_path")
+        if file.get("deleted_file"):
+            return [(old_path, base_ref)] if old_path and self.get_parser(self.get_extension(old_path)) else []
+        parser = self.get_parser(self.get_extension(new_path or ""))
+        if not new_path or not parser:
+            return []
+
+        diff_text = file.get("diff") or ""
+        is_new, is_renamed = file.get("new_file", False), file.get("renamed_file", False)
+        if settings.ANALYZER_DIFF_FAST_PATH and not (is_new or is_renamed):
+            if hunk_symbols.resolve_from_diff(parse_hunks(diff_text), parser.language):
+                return []
+        needs = [(new_path, head_ref)]
+        if settings.ANALYZER_BASE_SIDE and not is_new and _REMOVED_LINE.search(diff_text):
+            base_path = old_path or new_path
+            if self._base_table_key(project, base_path, base_ref) not in self.base_symbols:
+                needs.append((base_path, base_ref))
+        return needs
+
+    def _run_handler(self, handler, content: str):
+        return handler(content)
+
+    def _parse(self, parser: ParserSpec, content: str, run_handler) -> tuple[str | None, list[Symbol]]:
+        """Parse through the symbol cache; identical content is analyzed once."""
+        key = SymbolCache.key(parser.language, parser.version(), content)
+        cached = self.symbol_cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = self._unwrap_analysis(run_handler(partial(self.parsers.run, parser), content))
+        # Empty output is also what a failed parser returns, so it is never cached.
+        if result[1]:
+            self.symbol_cache.put(key, result)
+        return result
+
+    def _dump_parse_result(self, result: tuple[str | None, list[Symbol]]) -> dict[str, Any]:
+        language, symbols = result
+        return {"language": language, "symbols": [symbol.to_contract() for symbol in symbols]}
+
+    def _analyze_file(
+        self, project, mr, head_ref, base_ref, file: dict[str, Any], run_handler, blobs=None, language=None
+    ) -> tuple[FileImpact | None, dict[str, Any] | None]:
+        """Return (impacted_file, skipped_entry) for one diff entry; at most one of them is set.
+
+        The entry has passed the path classifier, which mapped it to `language`. `blobs` maps
+        (path, ref) to content prefetched for the entry's window, or reads a local mirror.
+        """
+        try:
+            new_path = file.get("new_path")
+            old_path = file.get("old_path")
+            is_new = file.get("new_file", False)
+            is_deleted = file.get("deleted_file", False)
+            is_renamed = file.get("renamed_file", False)
+            diff_text = file.get("diff", "")
+
+            path_for_check = new_path or old_path or ""
+
+            if is_deleted:
+                path = old_path
+                if not path:
+                    return None, {"file": path_for_check, "reason": "deleted_file but old_path missing"}
+                refs_to_try = [base_ref, mr.target_branch]
+            else:
+                path = new_path
+                if not path:
+                    return None, {"file": path_for_check, "reason": "no new_path to read"}
+                refs_to_try = [head_ref, mr.source_branch, mr.target_branch]
+
+            ext = self.get_extension(path)
+            parser = self.get_parser(ext, language)
+            if not parser:
+                return None, {"file": path, "reason": f"no handler for {ext}"}
+
+            hunks = [] if is_deleted else parse_hunks(diff_text)
+            formatting_only = 0
+            if hunks and settings.ANALYZER_SKIP_FORMATTING_ONLY:
+                kept = [hunk for hunk in hunks if not is_formatting_only(hunk, parser.language)]
+                formatting_only = len(hunks) - len(kept)
+                if formatting_only:
+                    metrics.incr("analyzer.formatting_only_hunks", formatting_only)
+                    if not kept:
+                        return None, {
+                            "file": path,
+                            "reason": "formatting-only changes",
+                            "formatting_only_hunks": formatting_only,
+                        }
+                hunks = kept
+
+            if settings.ANALYZER_DIFF_FAST_PATH and not (is_new or is_deleted or is_renamed):
+                impacted = self._analyze_from_diff(path, parser, hunks)
+                metrics.incr("analyzer.diff_fast_path", outcome="resolved" if impacted else "fallback")
+                if impacted:
+                    impacted.formatting_only_hunks = formatting_only
+                    return impacted, None
+
+            try:
+                file_content = self._try_get_file_content(project, path, refs_to_try, blobs)
+            except FileTooLargeError as tl:
+                metrics.incr("analyzer.oversized_files")
+                return None, {"file": path, "reason": "file too large", "bytes": tl.size, "limit": tl.limit}
+            except Exception as fe:
+                return None, {"file": path, "reason": f"fetch failed @ {refs_to_try}: {fe}"}
+
+            try:
+                language, symbols = self._parse(parser, file_content, run_handler)
+            except ParserError as pe:
+                return None, {"file": path, "reason": f"parse failed: {pe}"}
+            language = language or parser.language
+
+            if is_deleted:
+                blocks = self.get_impacted_blocks(symbols, None, file_content, "file deleted")
+                if blocks:
+                    return FileImpact(path, language, "deleted", blocks), None
+                return None, {"file": path, "reason": "no symbols found in deleted file"}
+
+            removed_lines = sorted(line for hunk in hunks for line in hunk.removed_lines)
+            base_side: Future | None = None
+            if removed_lines and not is_new and settings.ANALYZER_BASE_SIDE:
+                # Removed lines only exist in the base revision. It is read only once the head has
+                # parsed, so a file that is skipped never leaves base-side work running.
+                base_side = self._base_executor().submit(
+                    self._base_symbol_table, project, old_path or path, base_ref, parser, run_handler, blobs
+                )
+            changed_lines = {line for hunk in hunks for line in hunk.added_lines}
+            blocks = self.get_impacted_blocks(symbols, changed_lines, file_content, "overlaps changed lines")
+            if base_side is not None:
+                base_table = base_side.result()
+                if base_table is not None:
+                    self._attach_removed_lines(blocks, symbols, base_table, removed_lines)
+            if blocks:
+                collapsed: list[Block] = []
+                if settings.ANALYZER_COLLAPSE_BLOCKS:
+                    blocks, collapsed = self.collapse_blocks(blocks, file_content.splitlines())
+                change = "new" if is_new else ("renamed" if is_renamed else "modified")
+                return FileImpact(
+                    path,
+                    language,
+                    change,
+                    blocks,
+                    formatting_only_hunks=formatting_only,
+                    collapsed=collapsed,
+                ), None
+            return None, {"file": path, "reason": "no symbols overlap changed lines"}
+
+        except Exception as per_file_err:
+            return None, {
+                "file": file.get("new_path") or file.get("old_path") or "?",
+                "reason": f"unexpected: {per_file_err}"
+            }
+
+    def _analyze_from_diff(self, path: str, parser: ParserSpec, hunks: list[Hunk]) -> FileImpact | None:
+        """Resolve impacted members from hunk headers and context alone; None means fetch + parse."""
+        impacts = hunk_symbols.resolve_from_diff(hunks, parser.language)
+        if not impacts:
+            return None
+        blocks = [
+            Block(
+                impact.symbol,
+                impact.changed_lines,
+                snippet=impact.snippet,
+                location=self._compose_location(impact.symbol),
+                reason="overlaps changed lines" if impact.changed_lines else "removed lines",
+                removed_lines=impact.removed_lines or None,
+            )
+            for impact in impacts
+        ]
+        return FileImpact(path, parser.language, "modified", blocks, analysis_path="diff")
+
+    def _base_executor(self) -> ThreadPoolExecutor:
+        with self._base_pool_lock:
+            if self._base_pool is None:
+                self._base_pool = ThreadPoolExecutor(
+                    max_workers=max(1, settings.ANALYZER_MAX_PARALLELISM),
+                    thread_name_prefix="impact-base",
+                )
+            return self._base_pool
+
+    def _base_table_key(self, project, path: str, base_ref: str) -> str | None:
+        # Branch names move, so only tables for an exact commit are cached.
+        if base_ref and _COMMIT_SHA.fullmatch(base_ref):
+            return f"{getattr(project, 'id', '')}\0{base_ref}\0{path}"
+        return None
+
+    def _base_symbol_table(
+        self, project, path: str, base_ref: str, parser: ParserSpec, run_handler, blobs=None
+    ) -> tuple[list[Symbol], list[str]] | None:
+        """Symbols and lines of `path` at the base revision; None if it cannot be read or parsed."""
+        key = self._base_table_key(project, path, base_ref)
+        if key:
+            cached = self.base_symbols.get(key)
+            if cached is not None:
+                return cached
+        try:
+            content = self._try_get_file_content(project, path, [base_ref], blobs)
+            _, symbols = self._parse(parser, content, run_handler)
+        except Exception:
+            metrics.incr("analyzer.base_side_failures")
+            return None
+        table = (symbols, content.splitlines())
+        if key:
+            self.base_symbols.put(key, table)
+        return table
+
+    def _attach_removed_lines(
+        self,
+        blocks: list[Block],
+        head_symbols: list[Symbol],
+        base_table: tuple[list[Symbol], list[str]],
+        removed_lines: list[int],
+    ) -> None:
+        """Map sorted base-side `removed_lines` onto base symbols and record them on the matching blocks.
+
+        Symbols that only lost lines get a block of their own, built from the head symbol when it
+        still exists and from the base symbol when it was removed entirely; its snippet shows the
+        removed code with base line numbers.
+        """
+        base_symbols, base_lines = base_table
+        removed_set = set(removed_lines)
+        by_symbol = {self._symbol_identity(block.symbol): block for block in blocks}
+        head_by_identity: dict[tuple, Symbol] = {}
+        for symbol in head_symbols:
+            head_by_identity.setdefault(self._symbol_identity(symbol), symbol)
+
+        for base_symbol in base_symbols:
+            lo = bisect_left(removed_lines, base_symbol.span.start_line)
+            hi = bisect_right(removed_lines, base_symbol.span.end_line, lo)
+            if lo >= hi:
+                continue
+            relevant = removed_lines[lo:hi]
+            identity = self._symbol_identity(base_symbol)
+            block = by_symbol.get(identity)
+            if block is not None:
+                block.removed_lines = relevant
+                continue
+
+            head_symbol = head_by_identity.get(identity)
+            symbol = head_symbol or base_symbol
+            block = Block(
+                symbol,
+                [],
+                snippet=self._slice_snippet(
+                    base_lines,
+                    base_symbol.span.start_line,
+                    base_symbol.span.end_line,
+                    relevant,
+                    removed_set,
+                    mark="--",
+                ),
+                location=self._compose_location(symbol),
+                reason="removed lines" if head_symbol else "removed from file",
+                removed_lines=relevant,
+            )
+            blocks.append(block)
+            by_symbol[identity] = block
+
+    def _symbol_identity(self, symbol: Symbol) -> tuple:
+        return symbol.kind, symbol.qualified_name or symbol.display_name or symbol.name
 
     def _mr_refs(self, mr):
         """Return (head_ref_for_new, base_ref_for_old) with sensible fallbacks."""
@@ -126,12 +702,26 @@ class ImpactAnalyzer:
         base = base or mr.target_branch
         return head, base
 
-    def _try_get_file_content(self, project, path: str, refs: list[str]) -> str:
-        """Try multiple refs until one succeeds; raise the last error if all fail."""
+    def _try_get_file_content(
+        self, project, path: str, refs: list[str], blobs: dict[tuple[str, str], str] | None = None
+    ) -> str:
+        """Try multiple refs until one succeeds, prefetched `blobs` first; raise the last error if all fail.
+
+        An oversized file is not retried at other refs.
+        """
         last_err = None
+        limit = settings.ANALYZER_MAX_FILE_BYTES
         for ref in filter(None, refs):
+            content = blobs.get((path, ref)) if blobs is not None else None
+            if content is not None:
+                # Prefetched text is measured in characters, which never exceed its UTF-8 bytes.
+                if limit and len(content) > limit:
+                    raise FileTooLargeError(path, len(content), limit)
+                return content
             try:
                 return self.get_file_content(project, path, ref)
+            except FileTooLargeError:
+                raise
             except Exception as e:
                 last_err = e
                 continue
@@ -139,166 +729,190 @@ class ImpactAnalyzer:
 
     def get_impacted_blocks(
         self,
-        symbols: list[dict[str, Any]],
+        symbols: list[Symbol],
         changed_lines: set[int] | None,
         content: str,
         reason: str,
-    ) -> list[dict[str, Any]]:
-        blocks: list[dict[str, Any]] = []
-        for entry in symbols:
-            block = self._build_block(entry, changed_lines, content)
+    ) -> list[Block]:
+        # Sort the changed lines and split the file once; each symbol then finds its
+        # overlap with two binary searches and slices its snippet from the shared line index.
+        lines = content.splitlines() if content else []
+        ordered = sorted(changed_lines) if changed_lines is not None else None
+        marks = changed_lines if isinstance(changed_lines, (set, frozenset)) else set(ordered or ())
+
+        blocks: list[Block] = []
+        for symbol in symbols:
+            block = self._build_block(symbol, ordered, marks, lines)
             if block:
-                block["reason"] = reason
+                block.reason = reason
                 blocks.append(block)
         return blocks
 
+    def collapse_blocks(self, blocks: list[Block], lines: list[str]) -> tuple[list[Block], list[Block]]:
+        """Keep the innermost impacted blocks; return (emitted, collapsed).
+
+        A block encloses another when its span contains the other's and it covers all of the
+        other's changed and removed lines. A container whose lines are all covered by enclosed
+        blocks is collapsed; one with lines of its own (a field, an attribute) keeps just those,
+        with its snippet re-sliced around them. Every emitted block lists the locations of its
+        impacted containers in `enclosing`.
+        """
+        if len(blocks) < 2:
+            return blocks, []
+
+        # Tag lines by side: removed lines are numbered in the base revision.
+        touched = [
+            frozenset(("+", line) for line in block.changed_lines)
+            | frozenset(("-", line) for line in block.removed_lines or ())
+            for block in blocks
+        ]
+        ancestors: list[list[int]] = [[] for _ in blocks]
+        for i, outer in enumerate(blocks):
+            for j, inner in enumerate(blocks):
+                if i == j or not touched[j] <= touched[i]:
+                    continue
+                if inner.reason == "removed from file":
+                    # Base-side span; line coverage alone places it.
+                    ancestors[j].append(i)
+                elif outer.span.contains(inner.span) and (i < j or not inner.span.contains(outer.span)):
+                    ancestors[j].append(i)
+
+        covered: list[set] = [set() for _ in blocks]
+        for j, outer_indexes in enumerate(ancestors):
+            for i in outer_indexes:
+                covered[i] |= touched[j]
+
+        emitted: list[Block] = []
+        collapsed: list[Block] = []
+        for i, block in enumerate(blocks):
+            if ancestors[i]:
+                order = sorted(ancestors[i], key=lambda a: len(ancestors[a]))
+                block.enclosing = [blocks[a].location or blocks[a].symbol.name for a in order]
+            if not covered[i]:
+                emitted.append(block)
+                continue
+            own = touched[i] - covered[i]
+            if not own:
+                collapsed.append(block)
+                continue
+            block.changed_lines = sorted(line for side, line in own if side == "+")
+            block.removed_lines = sorted(line for side, line in own if side == "-") or None
+            block.snippet = (
+                self._slice_snippet(
+                    lines,
+                    block.span.start_line,
+                    block.span.end_line,
+                    block.changed_lines,
+                    set(block.changed_lines),
+                )
+                if block.changed_lines
+                else None
+            )
+            emitted.append(block)
+
+        metrics.incr("analyzer.collapsed_blocks", len(collapsed))
+        return emitted, collapsed
+
     def _build_block(
         self,
-        symbol_entry: dict[str, Any],
-        changed_lines: set[int] | None,
-        content: str,
+        symbol: Symbol,
+        changed_lines: list[int] | None,
+        marks: set[int],
+        lines: list[str],
         ctx: int = 3,
-    ) -> dict[str, Any] | None:
-        symbol = symbol_entry.get("symbol") or {}
-        span = symbol_entry.get("span") or {}
-        start_info = span.get("start") or {}
-        end_info = span.get("end") or {}
-        start_line = self._safe_int(start_info.get("line"))
-        end_line = self._safe_int(end_info.get("line"))
-        start_col = self._safe_int(start_info.get("column"))
-        end_col = self._safe_int(end_info.get("column"))
-        if not start_line or not end_line:
-            return None
-
-        if not isinstance(symbol, dict):
-            symbol = {}
+    ) -> Block | None:
+        """Build one block; `changed_lines` must be sorted, `marks` is the same lines as a set."""
+        start_line = symbol.span.start_line
+        end_line = symbol.span.end_line
 
-        identifier = (
-            symbol.get("qualified_name")
-            or symbol.get("display_name")
-            or symbol.get("name")
-        ) or ""
-        if not symbol.get("name") and identifier:
-            name = identifier.split(".")[-1]
-            symbol = {**symbol, "name": name}
-        if "display_name" not in symbol and identifier:
-            symbol = {**symbol, "display_name": identifier}
-        if "qualifiers" not in symbol and identifier:
-            qualifiers, _leaf = self._split_identifier(identifier)
-            if qualifiers:
-                symbol = {**symbol, "qualifiers": qualifiers}
-
-        block: dict[str, Any] = {
-            "symbol": {k: v for k, v in symbol.items() if v not in (None, "")},
-            "span": {"start_line": start_line, "end_line": end_line},
-            "changed_lines": [],
-        }
-        if start_col is not None:
-            block["span"]["start_column"] = start_col
-        if end_col is not None:
-            block["span"]["end_column"] = end_col
-
-        relevant: list[int] = []
-        if isinstance(changed_lines, set):
-            relevant = [ln for ln in changed_lines if start_line <= ln <= end_line]
-            if not relevant:
+        relevant: list[int] | None = None
+        if changed_lines is not None:
+            lo = bisect_left(changed_lines, start_line)
+            hi = bisect_right(changed_lines, end_line, lo)
+            if lo >= hi:
                 return None
-            block["changed_lines"] = sorted(relevant)
-        elif isinstance(changed_lines, Iterable):
-            relevant = [ln for ln in changed_lines if start_line <= ln <= end_line]
-            if not relevant:
-                return None
-            block["changed_lines"] = sorted(relevant)
-
-        snippet = self._slice_snippet(content, start_line, end_line, changed_lines, ctx)
-        if snippet:
-            block["snippet"] = snippet
-
-        location = self._compose_location(block["symbol"])
-        if location:
-            block["location"] = location
+            relevant = changed_lines[lo:hi]
 
-        return block
+        return Block(
+            symbol,
+            relevant or [],
+            snippet=self._slice_snippet(lines, start_line, end_line, relevant, marks, ctx),
+            location=self._compose_location(symbol),
+        )
 
     def _slice_snippet(
         self,
-        content: str,
+        lines: list[str],
         start: int,
         end: int,
-        changed_lines: set[int] | None,
+        local: list[int] | None,
+        marks: set[int],
         ctx: int = 3,
+        mark: str = ">>",
     ) -> str | None:
-        if not content or start is None or end is None or start < 1 or end < 1:
-            return None
-
-        lines = content.splitlines()
-        if not lines:
+        """Render numbered lines from the shared index; `local` is the sorted changed lines inside the span."""
+        if not lines or start is None or end is None or start < 1 or end < 1:
             return None
 
-        if not changed_lines:
+        if not local:
             s = max(start - 1, 0)
             e = min(end - 1, len(lines) - 1)
             if s > e:
                 return None
-            out = []
-            for i in range(s, e + 1):
-                out.append(f"{i+1:5d}   {lines[i]}")
-            return "\n".join(out)
+            return "\n".join(f"{i+1:5d}   {lines[i]}" for i in range(s, e + 1))
 
-        local = sorted([ln for ln in changed_lines if start <= ln <= end])
-        if not local:
-            return None
         s = max(local[0] - 1 - ctx, 0)
         e = min(local[-1] - 1 + ctx, len(lines) - 1)
         out = []
         for i in range(s, e + 1):
-            mark = ">>" if (i + 1) in changed_lines else "  "
-            out.append(f"{i+1:5d}{mark} {lines[i]}")
+            out.append(f"{i+1:5d}{mark if (i + 1) in marks else '  '} {lines[i]}")
         return "\n".join(out)
 
     def is_code_file(self, file_path: str) -> bool:
         if not file_path:
             return False
-        path = file_path.lower()
-        return (
-            (path.endswith('.cs') or path.endswith('.py') or path.endswith('.ts'))
-            and 'test' not in path and 'spec' not in path
-        )
+        return self.path_classifier().classify({"new_path": file_path}).skip is None
 
     def get_extension(self, file_path: str) -> str:
         return os.path.splitext(file_path)[1].lower()
 
-    def get_handler(self, ext: str):
-        return {
-            '.cs': analyze_cs_file_with_roslyn,
-        }.get(ext)
+    def get_parser(self, ext: str, language: str | None = None) -> ParserSpec | None:
+        return self.parsers.for_extension(ext) or (self.parsers.for_language(language) if language else None)
 
     def get_file_content(self, project, file_path: str, branch: str) -> str:
         """Get the content of a file in a project."""
-        import base64
-        raw = project.files.get(file_path=file_path, ref=branch)
-        content = base64.b64decode(raw.content).decode("utf-8", errors="replace")
-        return content.lstrip('\ufeff')
+        if self.hedger:
+            # A fetch slower than recent ones gets a duplicate request; the first response wins.
+            return self.hedger.call(self._read_raw_file, project, file_path, branch)
+        return self._read_raw_file(project, file_path, branch)
+
+    def _read_raw_file(self, project, file_path: str, ref: str) -> str:
+        """Stream the raw file endpoint into one buffer, giving up once it passes ANALYZER_MAX_FILE_BYTES.
+
+        Unlike `files.get`, there is no JSON/base64 envelope to decode, so the bytes are copied
+        once into the buffer and once more into the decoded text.
+        """
+        limit = settings.ANALYZER_MAX_FILE_BYTES
+        chunks = project.files.raw(
+            file_path=file_path, ref=ref, streamed=True, iterator=True, chunk_size=_RAW_CHUNK_BYTES
+        )
+        data = bytearray()
+        try:
+            for chunk in chunks:
+                data += chunk
+                if limit and len(data) > limit:
+                    raise FileTooLargeError(file_path, len(data), limit)
+        finally:
+            close = getattr(chunks, "close", None)
+            if close:
+                close()
+        metrics.incr("analyzer.file_bytes_read", len(data))
+        return data.decode("utf-8-sig", errors="replace")
 
     def get_changed_lines_from_diff(self, diff_text: str):
-        changed = set()
-        a_line = b_line = 0
-        for line in diff_text.splitlines():
-            if line.startswith("@@"):
-                import re
-                m = re.search(r"\-(\d+)(?:,(\d+))?\s+\+(\d+)(?:,(\d+))?", line)
-                a_line = int(m.group(1) or 0)
-                b_line = int(m.group(3) or 0)
-            elif line.startswith(" "):
-                a_line += 1; b_line += 1
-            elif line.startswith("-"):
-                a_line += 1
-            elif line.startswith("+"):
-                changed.add(b_line)
-                b_line += 1
-        return changed
-
-    def _unwrap_analysis(self, output: Any) -> tuple[str | None, list[dict[str, Any]]]:
+        return {line for hunk in parse_hunks(diff_text) for line in hunk.added_lines}
+
+    def _unwrap_analysis(self, output: Any) -> tuple[str | None, list[Symbol]]:
         language = None
         raw_symbols: Iterable[Any]
         if isinstance(output, dict):
@@ -306,14 +920,17 @@ class ImpactAnalyzer:
             raw_symbols = output.get("symbols") or []
         else:
             raw_symbols = output or []
-        symbols: list[dict[str, Any]] = []
+        symbols: list[Symbol] = []
         for node in raw_symbols:
-            normalized = self._ensure_symbol_entry(node)
+            normalized = self._ensure_symbol(node)
             if normalized:
                 symbols.append(normalized)
         return language, symbols
 
-    def _ensure_symbol_entry(self, node: Any) -> dict[str, Any] | None:
+    def _ensure_symbol(self, node: Any) -> Symbol | None:
+        """Accept a Symbol record or any parser-contract dict and return a complete Symbol."""
+        if isinstance(node, Symbol):
+            return self._complete_symbol(node, None)
         if not isinstance(node, dict):
             return None
 
@@ -324,19 +941,14 @@ class ImpactAnalyzer:
         end_info = span.get("end") if isinstance(span, dict) else None
 
         if not start_info or not end_info:
-            start_line = node.get("start_line") or node.get("StartLine")
-            end_line = node.get("end_line") or node.get("EndLine")
-            start_col = node.get("start_column") or node.get("StartColumn")
-            end_col = node.get("end_column") or node.get("EndColumn")
-            span = {
-                "start": {"line": start_line, "column": start_col},
-                "end": {"line": end_line, "column": end_col},
+            start_info = {
+                "line": node.get("start_line") or node.get("StartLine"),
+                "column": node.get("start_column") or node.get("StartColumn"),
+            }
+            end_info = {
+                "line": node.get("end_line") or node.get("EndLine"),
+                "column": node.get("end_column") or node.get("EndColumn"),
             }
-            start_info = span["start"]
-            end_info = span["end"]
-        else:
-            start_line = start_info.get("line")
-            end_line = end_info.get("line")
 
         start_line = self._safe_int(start_info.get("line"))
         end_line = self._safe_int(end_info.get("line"))
@@ -350,29 +962,45 @@ class ImpactAnalyzer:
                 "display_name": node.get("display_name") or node.get("DisplayName") or node.get("Name"),
             }
 
+        record = Symbol(
+            Span(
+                start_line,
+                end_line,
+                self._safe_int(start_info.get("column")),
+                self._safe_int(end_info.get("column")),
+            ),
+            kind=symbol.get("kind"),
+            name=symbol.get("name"),
+            display_name=symbol.get("display_name"),
+            qualified_name=symbol.get("qualified_name"),
+            qualifiers=symbol.get("qualifiers"),
+            namespace=symbol.get("namespace") or node.get("namespace") or node.get("Namespace") or node.get("NamespaceName"),
+            signature=symbol.get("signature") or node.get("signature") or node.get("Signature"),
+            references=node.get("references") or node.get("References") or None,
+        )
+        return self._complete_symbol(record, node)
+
+    def _complete_symbol(self, symbol: Symbol, node: dict[str, Any] | None) -> Symbol:
+        """Derive missing name, display name, qualified name and qualifiers from the identifier."""
         identifier = (
-            symbol.get("qualified_name")
-            or symbol.get("display_name")
-            or symbol.get("name")
-            or node.get("QualifiedName")
-            or node.get("FullName")
-            or node.get("Name")
+            symbol.qualified_name
+            or symbol.display_name
+            or symbol.name
+            or (node or {}).get("QualifiedName")
+            or (node or {}).get("FullName")
+            or (node or {}).get("Name")
         ) or ""
         if identifier:
             qualifiers, leaf = self._split_identifier(identifier)
-            symbol.setdefault("qualified_name", identifier)
-            symbol.setdefault("name", leaf or identifier)
-            if qualifiers:
-                symbol.setdefault("qualifiers", qualifiers)
-
-        namespace = node.get("namespace") or node.get("Namespace") or node.get("NamespaceName")
-        if namespace:
-            symbol.setdefault("namespace", namespace)
-        signature = node.get("signature") or node.get("Signature")
-        if signature:
-            symbol.setdefault("signature", signature)
-
-        return {"symbol": symbol, "span": span}
+            if symbol.qualified_name is None:
+                symbol.qualified_name = identifier
+            if not symbol.name:
+                symbol.name = leaf or identifier
+            if symbol.display_name is None:
+                symbol.display_name = identifier
+            if symbol.qualifiers is None and qualifiers:
+                symbol.qualifiers = qualifiers
+        return symbol
 
     def _split_identifier(self, identifier: str) -> tuple[list[str], str]:
         if not identifier:
@@ -382,20 +1010,19 @@ class ImpactAnalyzer:
             return [], identifier
         return parts[:-1], parts[-1]
 
-    def _compose_location(self, symbol: dict[str, Any]) -> str | None:
+    def _compose_location(self, symbol: Symbol) -> str | None:
         parts: list[str] = []
-        namespace = symbol.get("namespace")
+        namespace = symbol.namespace
         if namespace:
             parts.extend([p for p in str(namespace).split(".") if p])
-        for qualifier in symbol.get("qualifiers") or []:
+        for qualifier in symbol.qualifiers or []:
             parts.extend([p for p in str(qualifier).split(".") if p and p not in parts])
-        name = symbol.get("name") or symbol.get("display_name")
+        name = symbol.name or symbol.display_name
         if name:
             if not parts or parts[-1] != name:
                 parts.append(str(name))
         if not parts:
-            q = symbol.get("qualified_name") or symbol.get("display_name")
-            return q
+            return symbol.qualified_name or symbol.display_name
         return ".".join(parts)
 
     def _safe_int(self, value: Any) -> int | None:
@@ -406,13 +1033,6 @@ class ImpactAnalyzer:
         except (TypeError, ValueError):
             return None
 
-    def _language_for_extension(self, ext: str) -> str | None:
-        return {
-            '.cs': 'csharp',
-            '.py': 'python',
-            '.ts': 'typescript',
-        }.get(ext)
-
     def _summary_bucket(self) -> dict[str, set[str]]:
         return {
             "files": set(),
@@ -423,25 +1043,22 @@ class ImpactAnalyzer:
             "kinds": set(),
         }
 
-    def _update_summary(self, summary: dict[str, set[str]], path: str | None, blocks: list[dict[str, Any]]):
+    def _update_summary(self, summary: dict[str, set[str]], path: str | None, blocks: list[Block]):
         if path:
             summary["files"].add(path)
         for block in blocks:
-            symbol = block.get("symbol") or {}
-            namespace = symbol.get("namespace")
-            if namespace:
-                summary["namespaces"].add(namespace)
-            for qualifier in symbol.get("qualifiers") or []:
+            symbol = block.symbol
+            if symbol.namespace:
+                summary["namespaces"].add(symbol.namespace)
+            for qualifier in symbol.qualifiers or []:
                 summary["containers"].add(qualifier)
-            name = symbol.get("name")
-            if name:
-                summary["symbols"].add(name)
-            qualified = block.get("location") or symbol.get("qualified_name") or symbol.get("display_name")
+            if symbol.name:
+                summary["symbols"].add(symbol.name)
+            qualified = block.location or symbol.qualified_name or symbol.display_name
             if qualified:
                 summary["qualified_symbols"].add(qualified)
-            kind = symbol.get("kind")
-            if kind:
-                summary["kinds"].add(kind)
+            if symbol.kind:
+                summary["kinds"].add(symbol.kind)
 
     def _finalize_summary(self, summary: dict[str, set[str]]) -> dict[str, list[str]]:
         out = {}
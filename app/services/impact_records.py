@@ -0,0 +1,174 @@
+"""Compact record types that carry parser output and impact results through the analyzer.
+
+Blocks reference their symbol (and the symbol's span) instead of copying them, so every
+symbol exists once per parsed file no matter how many blocks, caches or summaries use it.
+Records are turned into plain dicts only when the analysis result is handed to the graph.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+
+class Span:
+    __slots__ = ("start_line", "end_line", "start_column", "end_column")
+
+    def __init__(
+        self,
+        start_line: int,
+        end_line: int,
+        start_column: int | None = None,
+        end_column: int | None = None,
+    ):
+        self.start_line = start_line
+        self.end_line = end_line
+        self.start_column = start_column
+        self.end_column = end_column
+
+    def contains(self, other: Span) -> bool:
+        return self.start_line <= other.start_line and other.end_line <= self.end_line
+
+    def to_dict(self) -> dict[str, int]:
+        out = {"start_line": self.start_line, "end_line": self.end_line}
+        if self.start_column is not None:
+            out["start_column"] = self.start_column
+        if self.end_column is not None:
+            out["end_column"] = self.end_column
+        return out
+
+    def to_contract(self) -> dict[str, dict[str, int | None]]:
+        """The parser-contract shape (`{"start": {...}, "end": {...}}`)."""
+        return {
+            "start": {"line": self.start_line, "column": self.start_column},
+            "end": {"line": self.end_line, "column": self.end_column},
+        }
+
+
+class Symbol:
+    __slots__ = (
+        "kind",
+        "display_name",
+        "name",
+        "qualifiers",
+        "namespace",
+        "signature",
+        "qualified_name",
+        "span",
+        "references",
+    )
+
+    # Serialization order of the descriptive fields; matches the historical dict layout.
+    FIELDS = ("kind", "display_name", "name", "qualifiers", "namespace", "signature", "qualified_name")
+
+    def __init__(
+        self,
+        span: Span,
+        kind: str | None = None,
+        name: str | None = None,
+        display_name: str | None = None,
+        qualified_name: str | None = None,
+        qualifiers: list[str] | None = None,
+        namespace: str | None = None,
+        signature: str | None = None,
+        references: list[str] | None = None,
+    ):
+        self.span = span
+        self.kind = kind
+        self.name = name
+        self.display_name = display_name
+        self.qualified_name = qualified_name
+        self.qualifiers = qualifiers
+        self.namespace = namespace
+        self.signature = signature
+        self.references = references  # names used in the symbol's own body, for the dependency index
+
+    def to_dict(self) -> dict[str, Any]:
+        out: dict[str, Any] = {}
+        for field in self.FIELDS:
+            value = getattr(self, field)
+            if value not in (None, ""):
+                out[field] = value
+        return out
+
+    def to_contract(self) -> dict[str, Any]:
+        """The generic parser-contract entry (`{"symbol": {...}, "span": {...}}`)."""
+        out: dict[str, Any] = {"symbol": self.to_dict(), "span": self.span.to_contract()}
+        if self.references:
+            out["references"] = self.references
+        return out
+
+
+class Block:
+    __slots__ = ("symbol", "changed_lines", "snippet", "location", "reason", "removed_lines", "enclosing")
+
+    def __init__(
+        self,
+        symbol: Symbol,
+        changed_lines: list[int],
+        snippet: str | None = None,
+        location: str | None = None,
+        reason: str | None = None,
+        removed_lines: list[int] | None = None,
+        enclosing: list[str] | None = None,
+    ):
+        self.symbol = symbol
+        self.changed_lines = changed_lines
+        self.snippet = snippet
+        self.location = location
+        self.reason = reason
+        self.removed_lines = removed_lines  # base-revision line numbers of `-` lines inside the symbol
+        self.enclosing = enclosing  # locations of impacted containers folded into this block, outermost first
+
+    @property
+    def span(self) -> Span:
+        return self.symbol.span
+
+    def to_dict(self) -> dict[str, Any]:
+        out: dict[str, Any] = {
+            "symbol": self.symbol.to_dict(),
+            "span": self.symbol.span.to_dict(),
+            "changed_lines": self.changed_lines,
+        }
+        if self.removed_lines:
+            out["removed_lines"] = self.removed_lines
+        if self.snippet:
+            out["snippet"] = self.snippet
+        if self.location:
+            out["location"] = self.location
+        if self.enclosing:
+            out["enclosing"] = self.enclosing
+        out["reason"] = self.reason
+        return out
+
+
+class FileImpact:
+    __slots__ = ("path", "language", "change", "blocks", "analysis_path", "formatting_only_hunks", "collapsed")
+
+    def __init__(
+        self,
+        path: str,
+        language: str | None,
+        change: str,
+        blocks: list[Block],
+        analysis_path: str = "parse",
+        formatting_only_hunks: int = 0,
+        collapsed: list[Block] | None = None,
+    ):
+        self.path = path
+        self.language = language
+        self.change = change
+        self.blocks = blocks
+        self.analysis_path = analysis_path  # "diff" (hunk headers and context only) or "parse"
+        self.formatting_only_hunks = formatting_only_hunks  # hunks dropped before building blocks
+        self.collapsed = collapsed or []  # container blocks folded into their members; summary only
+
+    def to_dict(self) -> dict[str, Any]:
+        out: dict[str, Any] = {
+            "path": self.path,
+            "language": self.language,
+            "change": self.change,
+            "blocks": [block.to_dict() for block in self.blocks],
+            "analysis_path": self.analysis_path,
+        }
+        if self.formatting_only_hunks:
+            out["formatting_only_hunks"] = self.formatting_only_hunks
+        return out
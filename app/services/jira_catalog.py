@@ -0,0 +1,290 @@
+"""Local, ranked catalog of a project's Jira tests, so test retrieval does not wait on `text ~` JQL.
+
+Every Test issue labelled `TEST_LABEL` is copied into a SQLite database with an FTS5 index
+over summary and description (porter-stemmed, like Jira's own text search). Searches rank by
+BM25, summary hits weighted above description hits, and take milliseconds.
+
+Syncs are incremental: each one asks Jira only for tests updated since the project's
+watermark (minus an overlap, because JQL dates are read in the Jira user's time zone).
+A test that loses its label or is deleted is not returned by that query, so every
+`full_sync_secs` the project is fetched completely and tests no longer listed are dropped.
+Syncs run on a background thread per project. Until a project has synced once, callers fall
+back to live JQL; while a later sync runs, the existing copy keeps answering.
+"""
+from __future__ import annotations
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from app.config import settings
+from app.metrics import metrics
+from app.services.jql_builder import MAX_TERMS, TEST_LABEL, jql_terms
+
+SYNC_FIELDS = ["key", "summary", "issuetype", "status", "components", "description", "updated"]
+_PAGE_SIZE = 100
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tests (
+    key TEXT PRIMARY KEY,
+    project TEXT NOT NULL,
+    summary TEXT,
+    description TEXT,
+    issuetype TEXT,
+    status TEXT,
+    components TEXT,  -- JSON list of names
+    updated TEXT,
+    seen_at REAL
+);
+CREATE INDEX IF NOT EXISTS tests_project ON tests(project);
+CREATE VIRTUAL TABLE IF NOT EXISTS tests_fts USING fts5(
+    summary, description, content='tests', content_rowid='rowid', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS tests_ai AFTER INSERT ON tests BEGIN
+    INSERT INTO tests_fts(rowid, summary, description) VALUES (new.rowid, new.summary, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS tests_ad AFTER DELETE ON tests BEGIN
+    INSERT INTO tests_fts(tests_fts, rowid, summary, description) VALUES ('delete', old.rowid, old.summary, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS tests_au AFTER UPDATE ON tests BEGIN
+    INSERT INTO tests_fts(tests_fts, rowid, summary, description) VALUES ('delete', old.rowid, old.summary, old.description);
+    INSERT INTO tests_fts(rowid, summary, description) VALUES (new.rowid, new.summary, new.description);
+END;
+CREATE TABLE IF NOT EXISTS sync_state (
+    project TEXT PRIMARY KEY,
+    watermark TEXT,
+    synced_at REAL,
+    full_synced_at REAL
+);
+"""
+
+
+def _parse_updated(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f%z")
+    except ValueError:
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return None
+
+
+def match_expression(terms: Iterable[str]) -> str:
+    """FTS5 query for any of `terms`, each term requiring all of its words."""
+    groups = []
+    for term in terms:
+        words = re.findall(r"\w+", term.lower())
+        if words:
+            groups.append("(" + " AND ".join(f'"{w}"' for w in words) + ")")
+    return " OR ".join(groups)
+
+
+class JiraTestCatalog:
+    """SQLite catalog of labelled Test issues, per project, synced incrementally from Jira."""
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        sync_interval_secs: float = 300.0,
+        full_sync_secs: float = 86400.0,
+        overlap_secs: float = 15 * 3600.0,
+    ):
+        self.path = path
+        self.sync_interval_secs = max(0.0, sync_interval_secs)
+        self.full_sync_secs = max(0.0, full_sync_secs)
+        self.overlap_secs = max(0.0, overlap_secs)
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()  # one connection, shared by the graph's threads
+        self._syncs: dict[str, threading.Thread] = {}
+        self._failed_at: dict[str, float] = {}  # project -> when its last sync failed
+        self._syncs_lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> JiraTestCatalog | None:
+        """The configured catalog; None when TEST_CATALOG_PATH is unset."""
+        if not settings.TEST_CATALOG_PATH:
+            return None
+        return cls(
+            settings.TEST_CATALOG_PATH,
+            sync_interval_secs=settings.TEST_CATALOG_SYNC_INTERVAL_SECS,
+            full_sync_secs=settings.TEST_CATALOG_FULL_SYNC_HOURS * 3600,
+            overlap_secs=settings.TEST_CATALOG_SYNC_OVERLAP_MINS * 60,
+        )
+
+    def ready(self, search: Callable[..., dict], project: str | None) -> bool:
+        """True when the catalog can answer for `project`, i.e. it has synced once.
+
+        Starts a background sync when one is due and none is running; never waits for it.
+        A failed sync leaves an earlier copy of the project usable and is retried after
+        `sync_interval_secs`.
+        """
+        if not project:
+            return False
+        state = self._state(project)
+        if state is None or time.time() - state["synced_at"] >= self.sync_interval_secs:
+            self._start_sync(search, project)
+        return state is not None
+
+    def syncing(self, project: str) -> threading.Thread | None:
+        """The project's running background sync, if any."""
+        with self._syncs_lock:
+            thread = self._syncs.get(project)
+        return thread if thread is not None and thread.is_alive() else None
+
+    def _start_sync(self, search: Callable[..., dict], project: str) -> None:
+        with self._syncs_lock:
+            running = self._syncs.get(project)
+            if running is not None and running.is_alive():
+                return
+            if time.time() - self._failed_at.get(project, float("-inf")) < self.sync_interval_secs:
+                return
+            thread = threading.Thread(
+                target=self._sync_in_background, args=(search, project), name="test-catalog-sync", daemon=True
+            )
+            self._syncs[project] = thread
+            thread.start()
+
+    def _sync_in_background(self, search: Callable[..., dict], project: str) -> None:
+        try:
+            self.sync(search, project)
+        except Exception as e:
+            with self._syncs_lock:
+                self._failed_at[project] = time.time()
+            metrics.incr("test_catalog.sync_failures", project=project, reason=type(e).__name__)
+
+    def sync(self, search: Callable[..., dict], project: str) -> int:
+        """Copy tests changed since the watermark (or all of them, when a full sync is due)."""
+        started = time.perf_counter()
+        state = self._state(project)
+        full = state is None or time.time() - (state["full_synced_at"] or 0) >= self.full_sync_secs
+        jql = f'project = "{project}" AND issueType = "Test" AND labels in ({TEST_LABEL})'
+        watermark = _parse_updated(state["watermark"]) if state else None
+        if watermark is not None and not full:
+            since = (watermark - timedelta(seconds=self.overlap_secs)).astimezone(timezone.utc)
+            jql += f' AND updated >= "{since:%Y/%m/%d %H:%M}"'
+        jql += " ORDER BY updated ASC"
+
+        sync_started = time.time()
+        count = 0
+        newest = watermark
+        while True:
+            page = search(jql, start_at=count, max_results=_PAGE_SIZE, fields=SYNC_FIELDS) or {}
+            issues = page.get("issues", []) or []
+            self._upsert(project, issues, sync_started)
+            count += len(issues)
+            for issue in issues:
+                updated = _parse_updated((issue.get("fields") or {}).get("updated"))
+                if updated is not None and (newest is None or updated > newest):
+                    newest = updated
+            if not issues or count >= int(page.get("total", count)):
+                break
+
+        with self._lock, self._db:
+            if full:
+                removed = self._db.execute(
+                    "DELETE FROM tests WHERE project = ? AND seen_at < ?", (project, sync_started)
+                ).rowcount
+                metrics.incr("test_catalog.removed", removed, project=project)
+            self._db.execute(
+                "INSERT INTO sync_state(project, watermark, synced_at, full_synced_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(project) DO UPDATE SET watermark = excluded.watermark, synced_at = excluded.synced_at, "
+                "full_synced_at = COALESCE(excluded.full_synced_at, sync_state.full_synced_at)",
+                (project, newest.isoformat() if newest else None, sync_started, sync_started if full else None),
+            )
+        metrics.incr("test_catalog.synced", count, project=project, mode="full" if full else "incremental")
+        metrics.observe("test_catalog.sync", time.perf_counter() - started, project=project)
+        return count
+
+    def search(
+        self,
+        project: str,
+        component: str | None,
+        keywords: Iterable[str],
+        *,
+        limit: int = 20,
+        max_terms: int = MAX_TERMS,
+    ) -> list[dict[str, Any]]:
+        """Best `limit` tests of `project` (and `component`) for the terms `build_jql` would use, by BM25.
+
+        Issues come back in Jira's search shape (`key` and `fields`).
+        """
+        expression = match_expression(jql_terms(keywords, max_terms))
+        if not expression:
+            return []
+        started = time.perf_counter()
+        sql = (
+            "SELECT t.key, t.summary, t.description, t.issuetype, t.status, t.components "
+            "FROM tests_fts JOIN tests t ON t.rowid = tests_fts.rowid "
+            "WHERE tests_fts MATCH ? AND t.project = ?"
+        )
+        params: list[Any] = [expression, project]
+        if component:
+            sql += " AND EXISTS (SELECT 1 FROM json_each(t.components) WHERE json_each.value = ?)"
+            params.append(component)
+        sql += " ORDER BY bm25(tests_fts, 2.0, 1.0) LIMIT ?"
+        params.append(max(1, limit))
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        metrics.observe("test_catalog.search", time.perf_counter() - started, project=project)
+        return [
+            {
+                "key": key,
+                "fields": {
+                    "summary": summary,
+                    "description": description,
+                    "issuetype": {"name": issuetype},
+                    "status": {"name": status},
+                    "components": [{"name": name} for name in json.loads(components or "[]")],
+                },
+            }
+            for key, summary, description, issuetype, status, components in rows
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _state(self, project: str) -> dict[str, Any] | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT watermark, synced_at, full_synced_at FROM sync_state WHERE project = ?", (project,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"watermark": row[0], "synced_at": row[1] or 0.0, "full_synced_at": row[2]}
+
+    def _upsert(self, project: str, issues: list[dict[str, Any]], seen_at: float) -> None:
+        rows = []
+        for issue in issues:
+            fields = issue.get("fields", {}) or {}
+            rows.append((
+                issue.get("key"),
+                project,
+                fields.get("summary"),
+                fields.get("description"),
+                (fields.get("issuetype") or {}).get("name"),
+                (fields.get("status") or {}).get("name"),
+                json.dumps([c.get("name") for c in (fields.get("components") or [])]),
+                fields.get("updated"),
+                seen_at,
+            ))
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT INTO tests(key, project, summary, description, issuetype, status, components, updated, seen_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(key) DO UPDATE SET "
+                "project = excluded.project, summary = excluded.summary, description = excluded.description, "
+                "issuetype = excluded.issuetype, status = excluded.status, components = excluded.components, "
+                "updated = excluded.updated, seen_at = excluded.seen_at",
+                rows,
+            )
@@ -3,6 +3,8 @@ from typing import Iterable
 
 
 _STOP = {"util","common","core","main","test","impl","service","manager"}
+MAX_TERMS = 12
+TEST_LABEL = "DSA_FT"
 
 
 def clean_kw(kw: str) -> str:
@@ -11,14 +13,19 @@ def clean_kw(kw: str) -> str:
     return kw
 
 
-def build_jql(project: str | None, component: str | None, keywords: Iterable[str]) -> tuple[str, dict]:
+def jql_terms(keywords: Iterable[str], max_terms: int = MAX_TERMS) -> list[str]:
+    """The cleaned keywords `build_jql` searches for, in order."""
+    return [clean_kw(k) for k in keywords if clean_kw(k) and k not in _STOP][:max_terms]
+
+
+def build_jql(project: str | None, component: str | None, keywords: Iterable[str], max_terms: int = MAX_TERMS) -> tuple[str, dict]:
     issue_types = ["Test"]
-    terms = [f'"{clean_kw(k)}"' for k in keywords if clean_kw(k) and k not in _STOP]
-    text_clause = " AND (" + " OR ".join([f"text ~ {t}" for t in terms[:12]]) + ")" if terms else ""
+    terms = [f'"{t}"' for t in jql_terms(keywords, max_terms)]
+    text_clause = " AND (" + " OR ".join([f"text ~ {t}" for t in terms[:max_terms]]) + ")" if terms else ""
     proj = f'project = "{project}"' if project else ""
     comp = f' AND component = "{component}"' if component else ""
     it = " OR ".join([f'issueType = "{t}"' for t in issue_types])
     base = (proj + comp + f" AND ({it})" + text_clause).strip()
     jql = base[4:] if base.startswith("AND ") else base
-    jql += " AND labels in (DSA_FT)"
-    return jql or f"issueType in ({', '.join(issue_types)})", {"project": project, "component": component, "terms_used": terms[:12]}
\ No newline at end of file
+    jql += f" AND labels in ({TEST_LABEL})"
+    return jql or f"issueType in ({', '.join(issue_types)})", {"project": project, "component": component, "terms_used": terms[:max_terms]}
\ No newline at end of file
@@ -0,0 +1,155 @@
+"""Decide from the diff entry alone which changed files are worth fetching and parsing.
+
+Every entry is classified before any content is read: binary and non-code files, tests,
+generated code, migrations and vendored trees are skipped up front, each under the name of
+the rule that matched so the run can report how many files every rule removed. The rule sets
+come from `ANALYZER_PATH_RULES`, keyed by project full path (or "*" for all projects):
+
+    ANALYZER_PATH_RULES='{"*": {"rules": {"vendor": ["**/External/**"]}},
+                          "group/app": {"rules": {"tests": []}, "languages": {".pyi": "python"}}}'
+
+A project's settings are layered over "*", which is layered over the defaults below; a rule
+set to an empty list is switched off. Patterns are globs matched case-insensitively against
+the whole path (a pattern without "/" matches the file name in any directory), or case-sensitive
+regular expressions when prefixed with "re:".
+"""
+from __future__ import annotations
+
+import os
+import re
+from typing import Any
+
+from app.config import settings
+
+DEFAULT_LANGUAGES: dict[str, str] = {".cs": "csharp", ".py": "python", ".ts": "typescript"}
+
+DEFAULT_RULES: dict[str, list[str]] = {
+    "tests": [
+        "**/test/**", "**/tests/**", "**/spec/**", "**/specs/**", "**/*.Tests/**", "**/*.UnitTests/**",
+        # C# test classes are PascalCase `FooTest(s)`; matched case-sensitively so Contest.cs or Latest.cs are kept.
+        r"re:(?:^|/)[^/]*(?:Tests?|[._]tests?)\.cs$", "test_*.py", "*_test.py", "conftest.py", "*.spec.ts", "*.test.ts",
+    ],
+    "generated": [
+        "*.Designer.cs", "*.g.cs", "*.g.i.cs", "*.generated.cs", "*AssemblyInfo.cs", "*ModelSnapshot.cs",
+        "*_pb2.py", "*_pb2_grpc.py", "*.d.ts", "*.generated.ts",
+    ],
+    "migrations": ["**/Migrations/**", "**/migrations/**"],
+    "vendor": ["**/vendor/**", "**/node_modules/**", "**/third_party/**", "**/site-packages/**", "**/wwwroot/lib/**"],
+}
+
+# Searched in the start of the diff, where a new or regenerated file carries its banner.
+DEFAULT_GENERATED_MARKERS: list[str] = [
+    r"<auto-generated",
+    r"@generated\b",
+    r"Code generated .* DO NOT EDIT",
+    r"This (?:file|code) was (?:automatically|auto-)generated",
+]
+_MARKER_SCAN_CHARS = 4096
+
+
+def _glob_to_regex(pattern: str) -> str:
+    body = pattern.lstrip("/")
+    out = [] if "/" in body else ["(?:.*/)?"]
+    i = 0
+    while i < len(body):
+        if body.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif body.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif body[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif body[i] == "?":
+            out.append("[^/]")
+            i += 1
+        else:
+            out.append(re.escape(body[i]))
+            i += 1
+    return "".join(out)
+
+
+class PathRule:
+    """One named rule: any of its globs matching the whole path, or any regex found in it."""
+
+    __slots__ = ("name", "_globs", "_regex")
+
+    def __init__(self, name: str, patterns: list[str]):
+        self.name = name
+        globs = [_glob_to_regex(p) for p in patterns if not p.startswith("re:")]
+        regexes = [p[3:] for p in patterns if p.startswith("re:")]
+        self._globs = re.compile("|".join(f"(?:{g})" for g in globs), re.I) if globs else None
+        self._regex = re.compile("|".join(f"(?:{r})" for r in regexes)) if regexes else None
+
+    def matches(self, path: str) -> bool:
+        return bool(
+            (self._globs and self._globs.fullmatch(path))
+            or (self._regex and self._regex.search(path))
+        )
+
+
+class PathDecision:
+    __slots__ = ("language", "rule", "skip")
+
+    def __init__(self, language: str | None, rule: str | None = None, skip: dict[str, Any] | None = None):
+        self.language = language
+        self.rule = rule  # name of the rule that skipped the file, if any
+        self.skip = skip  # the `skipped` entry to report instead of analyzing
+
+
+class PathClassifier:
+    def __init__(
+        self,
+        rules: dict[str, list[str]] | None = None,
+        languages: dict[str, str] | None = None,
+        generated_markers: list[str] | None = None,
+        max_diff_bytes: int = 0,
+    ):
+        self.rules = [PathRule(name, patterns) for name, patterns in (rules or {}).items() if patterns]
+        self.languages = {ext.lower(): language for ext, language in (languages or {}).items() if language}
+        markers = generated_markers or []
+        self._markers = re.compile("|".join(f"(?:{m})" for m in markers), re.I) if markers else None
+        self.max_diff_bytes = max(0, max_diff_bytes)
+
+    @classmethod
+    def for_project(cls, full_path: str | None = None) -> PathClassifier:
+        """Defaults, then the "*" entry of ANALYZER_PATH_RULES, then the project's own entry."""
+        rules = dict(DEFAULT_RULES)
+        languages = dict(DEFAULT_LANGUAGES)
+        markers = list(DEFAULT_GENERATED_MARKERS)
+        max_diff_bytes = 0
+        for key in ("*", full_path):
+            config = settings.ANALYZER_PATH_RULES.get(key or "") or {}
+            rules.update(config.get("rules") or {})
+            languages.update(config.get("languages") or {})
+            if "generated_markers" in config:
+                markers = list(config["generated_markers"] or [])
+            max_diff_bytes = int(config.get("max_diff_bytes", max_diff_bytes))
+        return cls(rules, languages, markers, max_diff_bytes)
+
+    def language_for(self, path: str) -> str | None:
+        return self.languages.get(os.path.splitext(path or "")[1].lower())
+
+    def classify(self, entry: dict[str, Any]) -> PathDecision:
+        """Language of the entry's file, or the rule and `skipped` entry that rule it out."""
+        path = entry.get("new_path") or entry.get("old_path") or ""
+        language = self.language_for(path)
+        if entry.get("binary") or not language:
+            return self._skip(path, None, "non_code", "non-code or binary")
+
+        normalized = path.replace("\\", "/")
+        for rule in self.rules:
+            if rule.matches(normalized):
+                return self._skip(path, language, rule.name, f"path rule: {rule.name}")
+
+        diff_text = entry.get("diff") or ""
+        if self.max_diff_bytes and len(diff_text.encode("utf-8")) > self.max_diff_bytes:
+            return self._skip(path, language, "diff_size", f"diff larger than {self.max_diff_bytes} bytes")
+        if self._markers and not entry.get("deleted_file") and self._markers.search(diff_text, 0, _MARKER_SCAN_CHARS):
+            return self._skip(path, language, "generated_marker", "generated code marker")
+        return PathDecision(language)
+
+    @staticmethod
+    def _skip(path: str, language: str | None, rule: str, reason: str) -> PathDecision:
+        return PathDecision(language, rule, {"file": path, "reason": reason, "rule": rule})
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable
+
+from app.metrics import metrics
+
+
+def git_blob_sha(content: str) -> str:
+    """SHA-1 of the content as a git blob, i.e. the same id GitLab reports as `blob_id`."""
+    data = content.encode("utf-8")
+    digest = hashlib.sha1(b"blob %d\0" % len(data))
+    digest.update(data)
+    return digest.hexdigest()
+
+
+class SymbolCache:
+    """Content-addressed cache of parser output.
+
+    Entries are keyed by (language, parser version, blob sha), so identical content is
+    parsed once no matter which MR, ref or path it came from. The memory tier is an LRU
+    bounded by entry count; the optional disk tier survives restarts and is trimmed
+    oldest-first once it grows past `disk_max_bytes`.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        disk_dir: str | None = None,
+        disk_max_bytes: int = 512 * 1024 * 1024,
+        dump: Callable[[Any], Any] | None = None,
+        load: Callable[[Any], Any] | None = None,
+        name: str = "symbol_cache",
+    ):
+        self.name = name  # metrics prefix
+        self.max_entries = max(0, max_entries)
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = disk_max_bytes
+        # The memory tier holds values as-is; the disk tier stores dump(value) as JSON.
+        self._dump = dump or (lambda value: value)
+        self._load = load or (lambda data: data)
+        self._memory: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._disk_bytes = 0
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            self._disk_bytes = sum(p.stat().st_size for p in self.disk_dir.glob("*/*.json"))
+
+    @staticmethod
+    def key(language: str, parser_version: str, content: str) -> str:
+        raw = f"{language}\0{parser_version}\0{git_blob_sha(content)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+        if value is not None:
+            self._count("memory_hits")
+            return value
+
+        value = self._disk_get(key)
+        if value is not None:
+            self._remember(key, value)
+            self._count("disk_hits")
+            return value
+
+        self._count("misses")
+        return None
+
+    def __contains__(self, key: str) -> bool:
+        """Memory-tier membership, without touching recency or hit counters."""
+        with self._lock:
+            return key in self._memory
+
+    def put(self, key: str, value: Any) -> None:
+        self._remember(key, value)
+        self._disk_put(key, value)
+        self._count("stores")
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            out = dict(self._counters)
+            out["memory_entries"] = len(self._memory)
+            out["disk_bytes"] = self._disk_bytes
+        return out
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+        metrics.incr(f"{self.name}.{name}")
+
+    def _remember(self, key: str, value: Any) -> None:
+        if not self.max_entries:
+            return
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    def _disk_get(self, key: str) -> Any | None:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with path.open("r", encoding="utf-8") as fh:
+                value = self._load(json.load(fh))
+            os.utime(path)  # refresh recency for eviction
+            return value
+        except (OSError, ValueError, TypeError, AttributeError):
+            return None
+
+    def _disk_put(self, key: str, value: Any) -> None:
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            data = json.dumps(self._dump(value), separators=(",", ":")).encode("utf-8")
+            tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            previous = path.stat().st_size if path.exists() else 0
+            os.replace(tmp, path)
+        except (OSError, TypeError, ValueError):
+            return
+        with self._lock:
+            self._disk_bytes += len(data) - previous
+            over_budget = self._disk_bytes > self.disk_max_bytes
+        if over_budget:
+            self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        """Drop least recently used files until the tier is back under 90% of its budget."""
+        entries = []
+        for path in self.disk_dir.glob("*/*.json"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        target = int(self.disk_max_bytes * 0.9)
+        evicted = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+
+        with self._lock:
+            self._disk_bytes = total
+            self._counters["evictions"] += evicted
+        if evicted:
+            metrics.incr(f"{self.name}.evictions", evicted)
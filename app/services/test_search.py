@@ -0,0 +1,284 @@
+"""One Jira search for the tests of every functional category, attributed back to categories locally.
+
+Searching category by category costs one round trip each. Combined mode runs a single JQL
+over the union of the categories' terms, then assigns each returned test to the categories
+whose terms appear in its summary or description. A term matches when each of its words
+starts a word in that text, which roughly follows Jira's stemmed `text ~` matching. Tests
+that match no category are dropped, as the per-category queries would not have returned them.
+
+`catalog_search` answers the same buckets from the local `JiraTestCatalog` instead, ranked by BM25.
+
+`TermSearchCache` remembers, per (project, component, label, term), the tests a term matched.
+A query then only sends its uncached terms to Jira and unions the cached results locally.
+"""
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from itertools import zip_longest
+from typing import TYPE_CHECKING, Any, Callable, Iterable
+
+from app.config import settings
+from app.metrics import metrics
+from app.services.jql_builder import MAX_TERMS, TEST_LABEL, build_jql, clean_kw, jql_terms
+
+PREFERRED_TYPES = {"test", "qa test", "xray test", "manual test", "automated test"}
+CATEGORY_LIMIT = 20  # tests kept per category, as with one `maxResults=20` query per category
+if TYPE_CHECKING:
+    from app.services.jira_catalog import JiraTestCatalog
+
+_PAGE_SIZE = 50
+_CACHED_FIELDS = ("summary", "description", "issuetype", "components")
+
+
+def as_test(issue: dict[str, Any]) -> dict[str, Any]:
+    fields = issue.get("fields", {}) or {}
+    return {
+        "key": issue.get("key"),
+        "summary": fields.get("summary"),
+        "issuetype": (fields.get("issuetype") or {}).get("name", ""),
+        "components": [c.get("name") for c in (fields.get("components") or [])],
+    }
+
+
+def preferred(items: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    return [t for t in items if (t.get("issuetype") or "").lower() in PREFERRED_TYPES] or items
+
+
+def union_terms(categories: Iterable[tuple[str, list[str]]]) -> list[str]:
+    """The terms each category's own query would use, deduplicated and interleaved so a
+    term cap cuts every category evenly."""
+    seen: set[str] = set()
+    out: list[str] = []
+    for row in zip_longest(*(terms[:MAX_TERMS] for _, terms in categories)):
+        for term in row:
+            if term and term not in seen:
+                seen.add(term)
+                out.append(term)
+    return out
+
+
+def term_pattern(term: str) -> re.Pattern | None:
+    words = re.findall(r"\w+", clean_kw(term).lower())
+    if not words:
+        return None
+    return re.compile("".join(rf"(?=.*\b{re.escape(w)})" for w in words), re.S)
+
+
+def _text(issue: dict[str, Any]) -> str:
+    fields = issue.get("fields", {}) or {}
+    return f"{fields.get('summary') or ''}\n{fields.get('description') or ''}".lower()
+
+
+def fetch_issues(search: Callable[..., dict], jql: str, limit: int) -> tuple[list[dict[str, Any]], bool]:
+    """Up to `limit` issues of `jql`, in pages, and whether that is every issue it matches."""
+    issues: list[dict[str, Any]] = []
+    while len(issues) < limit:
+        page = search(jql, start_at=len(issues), max_results=min(_PAGE_SIZE, limit - len(issues))) or {}
+        batch = page.get("issues", []) or []
+        issues.extend(batch)
+        if not batch or len(issues) >= int(page.get("total", len(issues))):
+            return issues, True
+    return issues, False
+
+
+def _key_order(issue: dict[str, Any]) -> tuple[str, int]:
+    project, _, number = (issue.get("key") or "").rpartition("-")
+    return project, int(number) if number.isdigit() else 0
+
+
+class TermSearchCache:
+    """Tests matching each search term, per (project, component, label, term), kept for `ttl_secs`.
+
+    Jira only reports which issues matched the whole OR-chain, so the issues are assigned to
+    terms locally by the same word-prefix match as combined mode. Uncached terms are queried
+    newest key first, so a term's entry holds its newest matches. An entry answers a query when
+    it holds at least `max_results` issues or every match of the term. The merged result is the
+    newest `max_results` issues of the union.
+    """
+
+    def __init__(self, ttl_secs: float = 3600.0, *, max_entries: int = 5000, fetch_limit: int = 50):
+        self.ttl_secs = max(0.0, ttl_secs)
+        self.max_entries = max(1, max_entries)
+        self.fetch_limit = max(1, fetch_limit)
+        # key -> (stored at, newest matches, whether that is every match)
+        self._entries: OrderedDict[tuple[str, str, str, str], tuple[float, list[dict[str, Any]], bool]] = OrderedDict()
+        self._stats: dict[str, list[int]] = {}  # project -> [hits, lookups]
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> TermSearchCache | None:
+        """The configured cache; None when JIRA_TERM_CACHE_TTL_SECS is 0."""
+        if settings.JIRA_TERM_CACHE_TTL_SECS <= 0:
+            return None
+        return cls(
+            settings.JIRA_TERM_CACHE_TTL_SECS,
+            max_entries=settings.JIRA_TERM_CACHE_MAX_ENTRIES,
+            fetch_limit=settings.JIRA_TERM_CACHE_FETCH_LIMIT,
+        )
+
+    def issues(
+        self,
+        search: Callable[..., dict],
+        project: str | None,
+        component: str | None,
+        keywords: Iterable[str],
+        *,
+        max_terms: int = MAX_TERMS,
+        max_results: int = CATEGORY_LIMIT,
+    ) -> list[dict[str, Any]]:
+        """Issues matching any of the terms `build_jql(project, component, keywords)` would search."""
+        terms = list(dict.fromkeys(t.lower() for t in jql_terms(keywords, max_terms)))
+        scope = (project or "", component or "", TEST_LABEL)
+        cached: list[list[dict[str, Any]]] = []
+        missing: list[str] = []
+        for term in terms:
+            entry = self._get((*scope, term), max_results)
+            if entry is None:
+                missing.append(term)
+            else:
+                cached.append(entry)
+        self._count(project or "", hits=len(cached), lookups=len(terms))
+
+        fresh: list[dict[str, Any]] = []
+        if missing:
+            jql, _ = build_jql(project, component, missing, max_terms=len(missing))
+            fresh, complete = fetch_issues(search, f"{jql} ORDER BY key DESC", max(self.fetch_limit, max_results))
+            fresh = [{"key": i.get("key"), "fields": {k: (i.get("fields") or {}).get(k) for k in _CACHED_FIELDS}} for i in fresh]
+            for term in missing:
+                pattern = term_pattern(term)
+                self._put((*scope, term), [i for i in fresh if pattern and pattern.match(_text(i))], complete)
+
+        merged: dict[str, dict[str, Any]] = {}
+        for issue in [*fresh, *(i for entry in cached for i in entry)]:
+            merged.setdefault(issue.get("key") or "", issue)
+        return sorted(merged.values(), key=_key_order, reverse=True)[:max_results]
+
+    def hit_rates(self) -> dict[str, float]:
+        with self._lock:
+            return {project: hits / total for project, (hits, total) in self._stats.items() if total}
+
+    def _get(self, key: tuple[str, str, str, str], needed: int) -> list[dict[str, Any]] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, issues, complete = entry
+            if time.monotonic() - stored_at >= self.ttl_secs:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return issues if complete or len(issues) >= needed else None
+
+    def _put(self, key: tuple[str, str, str, str], issues: list[dict[str, Any]], complete: bool) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), issues, complete)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _count(self, project: str, hits: int, lookups: int) -> None:
+        if not lookups:
+            return
+        metrics.incr("jira.term_cache", hits, project=project, outcome="hit")
+        metrics.incr("jira.term_cache", lookups - hits, project=project, outcome="miss")
+        with self._lock:
+            stats = self._stats.setdefault(project, [0, 0])
+            stats[0] += hits
+            stats[1] += lookups
+            rate = stats[0] / stats[1]
+        metrics.set_gauge("jira.term_cache.hit_rate", round(rate, 4), project=project)
+
+
+def combined_search(
+    search: Callable[..., dict],
+    project: str | None,
+    component: str | None,
+    categories: list[tuple[str, list[str]]],
+    *,
+    max_terms: int = 60,
+    max_results: int = 200,
+    term_cache: TermSearchCache | None = None,
+) -> tuple[list[dict[str, Any]], dict[str, dict[str, Any]]]:
+    """Run one search for `categories` ((name, terms) in order) and bucket the results.
+
+    Returns (flat, buckets) shaped like the per-category search: `flat` holds each test once,
+    in category order, and every bucket has `terms_used`, `jql` and `tests` (plus `error`).
+    """
+    terms_union = union_terms(categories)
+    jql, meta = build_jql(project, component, terms_union, max_terms=max_terms)
+    used = set(meta["terms_used"])
+    patterns = {
+        name: [p for p in (term_pattern(t) for t in terms[:MAX_TERMS] if f'"{clean_kw(t)}"' in used) if p is not None]
+        for name, terms in categories
+    }
+    matched: dict[str, list[dict[str, Any]]] = {name: [] for name, _ in categories}
+
+    def attribute(issues: list[dict[str, Any]]) -> None:
+        for issue in issues:
+            text = _text(issue)
+            hits = [name for name, pats in patterns.items() if any(p.match(text) for p in pats)]
+            if not hits:
+                metrics.incr("jira.tests_unattributed")
+            for name in hits:
+                if len(matched[name]) < CATEGORY_LIMIT:
+                    matched[name].append(as_test(issue))
+
+    try:
+        if term_cache is not None:
+            attribute(term_cache.issues(
+                search, project, component, terms_union, max_terms=max_terms, max_results=max_results,
+            ))
+        else:
+            start = 0
+            while start < max_results:
+                page = search(jql, start_at=start, max_results=min(_PAGE_SIZE, max_results - start)) or {}
+                issues = page.get("issues", []) or []
+                attribute(issues)
+                start += len(issues)
+                full = all(len(items) >= CATEGORY_LIMIT for items in matched.values())
+                if not issues or full or start >= int(page.get("total", start)):
+                    break
+    except Exception as e:
+        buckets = {name: {"terms_used": terms, "jql": jql, "tests": [], "error": str(e)} for name, terms in categories}
+        return [], buckets
+    metrics.incr("jira.searches", mode="combined")
+
+    flat: list[dict[str, Any]] = []
+    seen_keys: set[str] = set()
+    buckets: dict[str, dict[str, Any]] = {}
+    for name, terms in categories:
+        items = matched[name]
+        for item in items:
+            if item["key"] and item["key"] not in seen_keys:
+                seen_keys.add(item["key"])
+                flat.append(item)
+        buckets[name] = {"terms_used": terms, "jql": jql, "tests": preferred(items)}
+    return flat, buckets
+
+
+def catalog_search(
+    catalog: JiraTestCatalog,
+    project: str,
+    component: str | None,
+    categories: list[tuple[str, list[str]]],
+) -> tuple[list[dict[str, Any]], dict[str, dict[str, Any]]]:
+    """The per-category search answered from the local catalog: the top tests of each category by BM25.
+
+    Buckets keep their shape; `jql` is the query live mode would have sent.
+    """
+    flat: list[dict[str, Any]] = []
+    seen_keys: set[str] = set()
+    buckets: dict[str, dict[str, Any]] = {}
+    for name, terms in categories:
+        jql, _ = build_jql(project, component, terms)
+        items = [as_test(issue) for issue in catalog.search(project, component, terms, limit=CATEGORY_LIMIT)]
+        for item in items:
+            if item["key"] and item["key"] not in seen_keys:
+                seen_keys.add(item["key"])
+                flat.append(item)
+        buckets[name] = {"terms_used": terms, "jql": jql, "tests": preferred(items), "source": "catalog"}
+    metrics.incr("jira.searches", mode="catalog")
+    return flat, buckets
@@ -6,6 +6,7 @@ using System.Text.Json;
 using System.Text.Json.Serialization;
 using Microsoft.CodeAnalysis;
 using Microsoft.CodeAnalysis.CSharp;
+using Microsoft.CodeAnalysis.CSharp.Syntax;
 using Microsoft.CodeAnalysis.Text;
 
 namespace CSharpCodeParser;
@@ -19,6 +20,11 @@ internal static class Program
 
     public static int Main(string[] args)
     {
+        if (args.Length > 0 && args[0] == "--worker")
+        {
+            return Worker.Run(JsonOptions);
+        }
+
         try
         {
             var source = ReadSource(args);
@@ -51,6 +57,81 @@ internal static class Program
     }
 }
 
+/// <summary>
+/// Resident mode: one JSON request per STDIN line, one JSON response per STDOUT line.
+/// Keeps the runtime, JIT and reference cache warm across files.
+/// </summary>
+internal static class Worker
+{
+    public static int Run(JsonSerializerOptions options)
+    {
+        // Pay the reference cache cost once, before the first request arrives.
+        _ = ReferenceCache.References;
+
+        using var input = new StreamReader(Console.OpenStandardInput(), Encoding.UTF8);
+        using var output = new StreamWriter(Console.OpenStandardOutput(), new UTF8Encoding(false)) { AutoFlush = true };
+
+        string? line;
+        while ((line = input.ReadLine()) is not null)
+        {
+            if (string.IsNullOrWhiteSpace(line))
+            {
+                continue;
+            }
+
+            output.WriteLine(JsonSerializer.Serialize(Handle(line), options));
+        }
+
+        return 0;
+    }
+
+    private static WorkerResponse Handle(string line)
+    {
+        long? id = null;
+        try
+        {
+            using var doc = JsonDocument.Parse(line);
+            var root = doc.RootElement;
+            if (root.TryGetProperty("id", out var idElement) && idElement.ValueKind == JsonValueKind.Number)
+            {
+                id = idElement.GetInt64();
+            }
+
+            var op = root.TryGetProperty("op", out var opElement) ? opElement.GetString() : "analyze";
+            switch (op)
+            {
+                case "ping":
+                    return new WorkerResponse { Id = id, Ok = true };
+                case "analyze":
+                    var content = root.TryGetProperty("content", out var contentElement) ? contentElement.GetString() : null;
+                    return new WorkerResponse { Id = id, Ok = true, Symbols = Analyzer.Analyze(content) };
+                default:
+                    return new WorkerResponse { Id = id, Ok = false, Error = $"unknown op '{op}'" };
+            }
+        }
+        catch (Exception ex)
+        {
+            Console.Error.WriteLine(ex);
+            return new WorkerResponse { Id = id, Ok = false, Error = ex.Message };
+        }
+    }
+}
+
+internal sealed class WorkerResponse
+{
+    [JsonPropertyName("id")]
+    public long? Id { get; set; }
+
+    [JsonPropertyName("ok")]
+    public bool Ok { get; set; }
+
+    [JsonPropertyName("symbols")]
+    public IReadOnlyList<SymbolDto>? Symbols { get; set; }
+
+    [JsonPropertyName("error")]
+    public string? Error { get; set; }
+}
+
 internal static class Analyzer
 {
     public static IReadOnlyList<SymbolDto> Analyze(string? source)
@@ -109,6 +190,11 @@ internal static class Analyzer
                 var dto = SymbolMapper.ToDto(symbol, lineSpan);
                 dto.Type = typeLabel;
                 dto.Kind = typeLabel;
+                if (typeLabel != "namespace")
+                {
+                    dto.References = ReferenceCollector.Collect(node, symbol.Name);
+                }
+
                 symbols.Add(dto);
             }
 
@@ -122,6 +208,32 @@ internal static class Analyzer
     }
 }
 
+/// <summary>
+/// Names used by a declaration itself, for the reverse-dependency index. Nested members and
+/// local functions are declarations of their own and report their own references.
+/// </summary>
+internal static class ReferenceCollector
+{
+    public static List<string>? Collect(SyntaxNode declaration, string ownName)
+    {
+        var names = new SortedSet<string>(StringComparer.Ordinal);
+        // The predicate is also asked about the root, which is itself a declaration.
+        foreach (var node in declaration.DescendantNodes(child => child == declaration || !IsDeclaration(child)))
+        {
+            if (node is SimpleNameSyntax name)
+            {
+                names.Add(name.Identifier.ValueText);
+            }
+        }
+
+        names.Remove(ownName);
+        return names.Count > 0 ? names.ToList() : null;
+    }
+
+    private static bool IsDeclaration(SyntaxNode node) =>
+        node is MemberDeclarationSyntax or LocalFunctionStatementSyntax;
+}
+
 file static class ReferenceCache
 {
     private static readonly Lazy<IReadOnlyList<MetadataReference>> LazyReferences = new(Build);
@@ -255,6 +367,7 @@ internal sealed class SymbolDto
     public int EndLine { get; set; }
     public int? StartColumn { get; set; }
     public int? EndColumn { get; set; }
+    public List<string>? References { get; set; }
 }
 
 
@@ -0,0 +1,45 @@
+import http.server
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings are read at import time; the tests never reach these hosts.
+for name, value in {
+    "GITLAB_URL": "http://gitlab.test",
+    "GITLAB_TOKEN": "test",
+    "JIRA_INSTANCE_URL": "http://jira.test",
+    "JIRA_API_TOKEN": "test",
+    "JIRA_USERNAME": "test",
+}.items():
+    os.environ.setdefault(name, value)
+
+
+@pytest.fixture
+def server():
+    """Answers each request with the next (status, headers) in `script`, then 200."""
+    state = {"script": [], "methods": []}
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def _reply(self):
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            state["methods"].append(self.command)
+            status, headers = state["script"].pop(0) if state["script"] else (200, {})
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        do_GET = do_POST = _reply
+
+        def log_message(self, *args):
+            pass
+
+    srv = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{srv.server_port}", state
+    srv.shutdown()
@@ -0,0 +1,70 @@
+import gitlab
+import pytest
+
+from app.clients.gitlab_client import MergeRequestSnapshot
+from app.clients.gitlab_graphql import BlobBatchFetcher
+from app.clients.gitlab_stub_server import GitLabStubServer
+from app.services.impact_analyzer import ImpactAnalyzer
+
+HEAD = "h" * 40
+BASE = "b" * 40
+PATHS = ["app/a.py", "app/b.py", "app/c.py"]
+
+
+def _source(path):
+    return f"def {path[4]}():\n    return 1\n"
+
+
+def _added(text):
+    return "".join(f"+{line}\n" for line in text.splitlines())
+
+
+@pytest.fixture
+def stub():
+    with GitLabStubServer() as server:
+        for path in PATHS:
+            server.add(7, HEAD, path, _source(path))  # REST reads address the project by id
+            server.add("group/app", HEAD, path, _source(path))  # GraphQL by full path
+        yield server
+
+
+def _analyze(server):
+    fetcher = BlobBatchFetcher(server.graphql_url, "token", batch_size=50)
+    analyzer = ImpactAnalyzer(gitlab.Gitlab(server.url, private_token="token"), blob_fetcher=fetcher)
+    snapshot = MergeRequestSnapshot(
+        7,
+        2,
+        source_branch="feature",
+        target_branch="main",
+        diff_refs={"head_sha": HEAD, "base_sha": BASE, "start_sha": BASE},
+        references={"full": "group/app!2"},
+        changes=[
+            {"old_path": path, "new_path": path, "new_file": True, "diff": "@@ -0,0 +1,2 @@\n" + _added(_source(path))}
+            for path in PATHS
+        ],
+    )
+    try:
+        result = analyzer.get_impacted_code_areas(7, 2, snapshot=snapshot)
+    finally:
+        fetcher.close()
+    assert not result.get("skipped")
+    return sorted(block["symbol"]["name"] for file in result["files"] for block in file["blocks"])
+
+
+def test_every_file_comes_from_one_graphql_request(stub):
+    assert _analyze(stub) == ["a", "b", "c"]
+    assert stub.requests == {"graphql": 1}
+
+
+def test_file_missing_from_the_batch_is_read_over_rest(stub):
+    del stub.files[("group/app", HEAD, "app/b.py")]
+
+    assert _analyze(stub) == ["a", "b", "c"]
+    assert stub.requests == {"graphql": 1, "files_raw": 1}
+
+
+def test_graphql_error_falls_back_to_rest_for_every_file(stub):
+    stub.graphql_error = "Field 'blobs' doesn't exist on type 'Repository'"
+
+    assert _analyze(stub) == ["a", "b", "c"]
+    assert stub.requests == {"graphql": 1, "files_raw": 3}
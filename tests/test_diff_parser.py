@@ -0,0 +1,40 @@
+import pytest
+
+from app.services.diff_parser import is_formatting_only, parse_hunks
+
+
+def _hunk(removed, added, context=()):
+    body = [f" {line}" for line in context] + [f"-{line}" for line in removed] + [f"+{line}" for line in added]
+    (hunk,) = parse_hunks("@@ -1,9 +1,9 @@\n" + "\n".join(body) + "\n")
+    return hunk
+
+
+def test_python_dedent_is_a_code_change():
+    hunk = _hunk(
+        ["        total += x", "    return total"],
+        ["        total += x", "        return total"],
+        context=["    for x in xs:"],
+    )
+    assert not is_formatting_only(hunk, "python")
+
+
+def test_python_rewrap_and_comment_inside_brackets_is_formatting():
+    hunk = _hunk(
+        ["    result = compute(a, b)  # old note"],
+        ["    result = compute(", "        a,", "        b  # new note", "    )"],
+    )
+    assert is_formatting_only(hunk, "python")
+
+
+def test_csharp_reindent_and_rewrap_is_formatting():
+    hunk = _hunk(
+        ["    if (ready) { Run(a, b); }"],
+        ["        if (ready)", "        {", "            Run(a,b); // go", "        }"],
+    )
+    assert is_formatting_only(hunk, "csharp")
+
+
+@pytest.mark.parametrize("language", ["csharp", "python"])
+@pytest.mark.parametrize("removed,added", [("x = a - -b", "x = a--b"), ("y = + +i", "y = ++i"), ("return a b", "return ab")])
+def test_spaces_between_tokens_are_significant(language, removed, added):
+    assert not is_formatting_only(_hunk([removed], [added]), language)
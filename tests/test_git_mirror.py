@@ -0,0 +1,87 @@
+import os
+import subprocess
+
+import pytest
+
+from app.services.git_mirror import MirrorStore
+
+
+def _git(cwd, *args):
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout.strip()
+
+
+@pytest.fixture
+def remotes(tmp_path):
+    root = tmp_path / "remotes"
+    heads = {}
+    for name in ("group/one", "group/two"):
+        repo = root / name
+        repo.mkdir(parents=True)
+        _git(repo, "init", "-q")
+        (repo / "a.py").write_text("x = 1\n")
+        _git(repo, "add", ".")
+        _git(repo, "-c", "user.name=t", "-c", "user.email=t@t", "commit", "-qm", "init")
+        heads[name] = _git(repo, "rev-parse", "HEAD")
+    return root, heads
+
+
+def _cloned(store, name, head):
+    mirror = store.get(name)
+    assert store.mirror_for(name, head) is None  # the first call only starts the clone
+    mirror._clone_thread.join(timeout=30)
+    return store.mirror_for(name, head)
+
+
+def test_first_clone_runs_in_background_then_serves_reads(tmp_path, remotes):
+    root, heads = remotes
+    store = MirrorStore(tmp_path / "mirrors", remote_base=str(root))
+
+    mirror = _cloned(store, "group/one", heads["group/one"])
+
+    assert mirror is not None and mirror.leases == 1
+    assert mirror.read(heads["group/one"], "a.py") == "x = 1\n"
+    store.release(mirror)
+    assert mirror.leases == 0
+    store.close()
+
+
+def test_leased_mirror_is_not_evicted(tmp_path, remotes):
+    root, heads = remotes
+    store = MirrorStore(tmp_path / "mirrors", remote_base=str(root))
+    one = _cloned(store, "group/one", heads["group/one"])
+    store.max_disk_bytes = 0
+
+    two = _cloned(store, "group/two", heads["group/two"])
+
+    assert one.path.exists() and two.path.exists()
+    store.release(one)
+    store.enforce_budget()
+    assert not one.path.exists() and one.evicted
+    assert two.path.exists()
+    assert not store.acquire(one)
+    store.release(two)
+    store.close()
+
+
+def test_size_is_walked_again_only_after_a_fetch(tmp_path, remotes, monkeypatch):
+    root, heads = remotes
+    store = MirrorStore(tmp_path / "mirrors", remote_base=str(root), fetch_interval_secs=0)
+    mirror = _cloned(store, "group/one", heads["group/one"])
+    store.release(mirror)
+    walks = []
+    real_walk = os.walk
+    monkeypatch.setattr(os, "walk", lambda path: walks.append(path) or real_walk(path))
+
+    for _ in range(3):
+        store.release(store.mirror_for("group/one", heads["group/one"]))
+    assert len(walks) <= 1
+
+    repo = root / "group/one"
+    (repo / "b.py").write_text("y = 2\n")
+    _git(repo, "add", ".")
+    _git(repo, "-c", "user.name=t", "-c", "user.email=t@t", "commit", "-qm", "more")
+    walks.clear()
+    size_before = mirror.disk_bytes()
+    store.release(store.mirror_for("group/one", _git(repo, "rev-parse", "HEAD")))
+    assert len(walks) == 1 and mirror.disk_bytes() > size_before
+    store.close()
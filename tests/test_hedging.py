@@ -0,0 +1,58 @@
+import threading
+import time
+
+from app.clients.hedging import HedgedCalls
+
+
+def _warm(hedger, latency):
+    for _ in range(hedger.min_samples):
+        hedger._latencies.append(latency)
+
+
+def test_slow_call_is_hedged_and_the_fast_copy_wins():
+    hedger = HedgedCalls(min_delay_secs=0.01, max_rate=1.0, min_samples=5, max_workers=4)
+    _warm(hedger, 0.01)
+    calls = []
+
+    def fetch():
+        calls.append(threading.current_thread().name)
+        time.sleep(0.5 if len(calls) == 1 else 0)
+        return len(calls)
+
+    assert hedger.call(fetch) == 2
+    hedger.close()
+
+
+def test_saturated_pool_runs_the_call_inline_without_hedging():
+    hedger = HedgedCalls(min_delay_secs=0.01, max_rate=1.0, min_samples=5, max_workers=2)
+    _warm(hedger, 0.01)
+    release = threading.Event()
+    blockers = [threading.Thread(target=hedger.call, args=(release.wait,)) for _ in range(2)]
+    for thread in blockers:
+        thread.start()
+    while hedger._outstanding < 2:
+        time.sleep(0.001)
+
+    calls = []
+    assert hedger.call(lambda: calls.append(threading.current_thread()) or "done") == "done"
+    assert calls == [threading.current_thread()]
+
+    release.set()
+    for thread in blockers:
+        thread.join()
+    assert hedger._outstanding == 0
+    hedger.close()
+
+
+def test_latency_includes_time_queued():
+    hedger = HedgedCalls(max_workers=2)
+    release = threading.Event()
+    first = hedger._submit(release.wait, (), {})
+    second = hedger._submit(release.wait, (), {})
+    queued = hedger._submit(lambda: None, (), {})  # waits for a free worker
+    time.sleep(0.2)
+    release.set()
+    for future in (first, second, queued):
+        future.result()
+    assert min(hedger._latencies) >= 0.2  # the queued call waited ~0.2 s before it started
+    hedger.close()
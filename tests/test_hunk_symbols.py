@@ -0,0 +1,84 @@
+from app.services import hunk_symbols
+from app.services.diff_parser import parse_hunks
+
+
+def test_member_named_only_by_header_falls_back_to_parse():
+    diff = (
+        "@@ -40,7 +40,7 @@ public int Total(int a, int b)\n"
+        "             var x = a;\n"
+        "             var y = b;\n"
+        "             var z = x + y;\n"
+        "-            return z;\n"
+        "+            return z + 1;\n"
+        "         }\n"
+    )
+    assert hunk_symbols.resolve_from_diff(parse_hunks(diff), "csharp") is None
+
+
+def test_member_in_context_keeps_declaration_line_and_header_type():
+    diff = (
+        "@@ -10,6 +10,6 @@ public class Calculator\n"
+        "         public int Total(int a, int b)\n"
+        "         {\n"
+        "             var z = a + b;\n"
+        "-            return z;\n"
+        "+            return z + 1;\n"
+        "         }\n"
+    )
+    (impact,) = hunk_symbols.resolve_from_diff(parse_hunks(diff), "csharp")
+    assert impact.symbol.name == "Total"
+    assert impact.symbol.span.start_line == 10
+    assert impact.symbol.qualified_name == "Calculator.Total"
+    assert impact.changed_lines == [13]
+
+
+def test_python_top_level_function_is_not_qualified_by_header_class():
+    diff = (
+        "@@ -20,4 +20,4 @@ class Foo:\n"
+        " def bar():\n"
+        "     x = 1\n"
+        "-    return x\n"
+        "+    return x + 1\n"
+    )
+    assert hunk_symbols.resolve_from_diff(parse_hunks(diff), "python") is None
+
+
+def test_python_method_keeps_header_class():
+    diff = (
+        "@@ -20,4 +20,4 @@ class Foo:\n"
+        "     def bar(self):\n"
+        "         x = 1\n"
+        "-        return x\n"
+        "+        return x + 1\n"
+    )
+    (impact,) = hunk_symbols.resolve_from_diff(parse_hunks(diff), "python")
+    assert (impact.symbol.kind, impact.symbol.qualified_name, impact.symbol.qualifiers) == ("method", "Foo.bar", ["Foo"])
+
+
+def test_csharp_method_after_closed_sibling_type_falls_back_to_parse():
+    diff = (
+        "@@ -10,7 +10,7 @@ public class Outer\n"
+        "     class Inner { }\n"
+        " \n"
+        "     public void M()\n"
+        "     {\n"
+        "-        Run(1);\n"
+        "+        Run(2);\n"
+        "     }\n"
+    )
+    assert hunk_symbols.resolve_from_diff(parse_hunks(diff), "csharp") is None
+
+
+def test_csharp_method_after_multiline_sibling_type_falls_back_to_parse():
+    diff = (
+        "@@ -10,9 +10,9 @@ namespace Shop\n"
+        "     class Inner\n"
+        "     {\n"
+        "     }\n"
+        "         public void M()\n"
+        "         {\n"
+        "-            Run(1);\n"
+        "+            Run(2);\n"
+        "         }\n"
+    )
+    assert hunk_symbols.resolve_from_diff(parse_hunks(diff), "csharp") is None
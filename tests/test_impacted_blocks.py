@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from app.services.impact_analyzer import ImpactAnalyzer
+from app.services.impact_records import Span, Symbol
+
+
+def _reference_blocks(spans, changed_lines, content, ctx=3):
+    """The per-symbol scan that get_impacted_blocks replaced: (span, changed lines, snippet) per block."""
+    out = []
+    for start, end in spans:
+        relevant = None
+        if changed_lines is not None:
+            relevant = sorted(ln for ln in changed_lines if start <= ln <= end)
+            if not relevant:
+                continue
+        out.append(((start, end), relevant or [], _reference_snippet(content, start, end, changed_lines, ctx)))
+    return out
+
+
+def _reference_snippet(content, start, end, changed_lines, ctx):
+    if not content or start < 1 or end < 1:
+        return None
+    lines = content.splitlines()
+    if not lines:
+        return None
+    if not changed_lines:
+        s, e = max(start - 1, 0), min(end - 1, len(lines) - 1)
+        if s > e:
+            return None
+        return "\n".join(f"{i+1:5d}   {lines[i]}" for i in range(s, e + 1))
+    local = sorted(ln for ln in changed_lines if start <= ln <= end)
+    s, e = max(local[0] - 1 - ctx, 0), min(local[-1] - 1 + ctx, len(lines) - 1)
+    return "\n".join(
+        f"{i+1:5d}{'>>' if (i + 1) in changed_lines else '  '} {lines[i]}" for i in range(s, e + 1)
+    )
+
+
+def _synthetic(seed, n_lines, n_symbols, n_changed):
+    rng = random.Random(seed)
+    content = "\n".join(f"    line {i} = {rng.random():.6f};" for i in range(1, n_lines + 1)) + "\n"
+    spans = []
+    for _ in range(n_symbols):
+        start = rng.randint(1, n_lines)
+        spans.append((start, min(n_lines + 5, start + rng.randint(0, 200))))  # some spans run past the end
+    changed = set(rng.sample(range(1, n_lines + 1), n_changed))
+    return content, spans, changed
+
+
+@pytest.mark.parametrize("seed,n_lines,n_symbols,n_changed", [(1, 200, 40, 15), (2, 5000, 1500, 800), (3, 8000, 1200, 2000)])
+@pytest.mark.parametrize("kind", ["set", "list", "empty", "none"])
+def test_blocks_match_per_symbol_scan(seed, n_lines, n_symbols, n_changed, kind):
+    content, spans, changed = _synthetic(seed, n_lines, n_symbols, n_changed)
+    changed_lines = {"set": changed, "list": sorted(changed, reverse=True), "empty": set(), "none": None}[kind]
+    symbols = [Symbol(Span(start, end), kind="method", name=f"M{i}") for i, (start, end) in enumerate(spans)]
+
+    blocks = ImpactAnalyzer(None).get_impacted_blocks(symbols, changed_lines, content, "modified")
+
+    got = [((b.span.start_line, b.span.end_line), b.changed_lines, b.snippet) for b in blocks]
+    assert got == _reference_blocks(spans, changed_lines, content)
+    assert all(b.reason == "modified" for b in blocks)
@@ -0,0 +1,87 @@
+import threading
+
+from app.services.jira_catalog import JiraTestCatalog
+
+
+def _issue(key, summary, updated):
+    return {
+        "key": key,
+        "fields": {
+            "summary": summary,
+            "description": "",
+            "issuetype": {"name": "Test"},
+            "status": {"name": "Open"},
+            "components": [{"name": "C"}],
+            "updated": updated,
+        },
+    }
+
+
+def _wait(catalog, project):
+    thread = catalog.syncing(project)
+    if thread is not None:
+        thread.join(10)
+
+
+class GatedSearch:
+    """Jira search that blocks every call until `release` is set."""
+
+    def __init__(self, issues):
+        self.issues = issues
+        self.calls = 0
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, jql, start_at=0, max_results=50, fields=None):
+        self.calls += 1
+        self.entered.set()
+        assert self.release.wait(10)
+        return {"issues": self.issues[start_at:start_at + max_results], "total": len(self.issues)}
+
+
+def test_first_sync_runs_in_background(tmp_path):
+    catalog = JiraTestCatalog(str(tmp_path / "catalog.db"), sync_interval_secs=3600)
+    search = GatedSearch([_issue("P-1", "payment refund", "2026-01-01T00:00:00.000+0000")])
+
+    assert catalog.ready(search, "P") is False  # returns at once; callers search Jira live
+    assert search.entered.wait(10)
+    assert catalog.ready(search, "P") is False
+    search.release.set()
+    _wait(catalog, "P")
+
+    assert catalog.ready(search, "P") is True
+    assert [i["key"] for i in catalog.search("P", None, ["refund"])] == ["P-1"]
+    assert search.calls == 1
+
+
+def test_resync_keeps_serving_the_existing_copy(tmp_path):
+    catalog = JiraTestCatalog(str(tmp_path / "catalog.db"), sync_interval_secs=0)
+    search = GatedSearch([_issue("P-1", "payment refund", "2026-01-01T00:00:00.000+0000")])
+    search.release.set()
+    catalog.sync(search, "P")
+
+    search.release.clear()
+    search.entered.clear()
+    search.issues.append(_issue("P-2", "refund ledger", "2026-01-02T00:00:00.000+0000"))
+    assert catalog.ready(search, "P") is True
+    assert search.entered.wait(10)
+    assert [i["key"] for i in catalog.search("P", None, ["refund"])] == ["P-1"]
+    search.release.set()
+    _wait(catalog, "P")
+
+    assert {i["key"] for i in catalog.search("P", None, ["refund"])} == {"P-1", "P-2"}
+
+
+def test_failed_sync_is_not_retried_within_the_interval(tmp_path):
+    catalog = JiraTestCatalog(":memory:", sync_interval_secs=3600)
+    calls = []
+
+    def down(jql, **kwargs):
+        calls.append(jql)
+        raise RuntimeError("down")
+
+    assert catalog.ready(down, "P") is False
+    _wait(catalog, "P")
+    assert catalog.ready(down, "P") is False
+    assert catalog.syncing("P") is None
+    assert len(calls) == 1
@@ -0,0 +1,18 @@
+import pytest
+from pydantic import SecretStr
+
+from app.clients import llm_client
+from app.config import settings
+
+
+def test_rejected_completion_is_retried_by_the_transport_only(server, monkeypatch):
+    base_url, state = server
+    state["script"] = [(429, {"Retry-After": "0"})] * 20
+    monkeypatch.setattr(settings, "LLM_BASE_URL", base_url + "/v1")
+    monkeypatch.setattr(settings, "LLM_API_KEY", SecretStr("test"))
+
+    client = llm_client.LLMClient()
+    with pytest.raises(Exception):
+        client.llm.invoke("hello")
+
+    assert state["methods"] == ["POST"] * (1 + settings.HTTP_MAX_RETRIES)
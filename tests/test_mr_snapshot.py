@@ -0,0 +1,161 @@
+import base64
+from types import SimpleNamespace
+
+import app.agent.graph as graph
+from app.config import settings
+from app.services.impact_analyzer import ImpactAnalyzer
+
+HEAD = "h" * 40
+BASE = "b" * 40
+
+
+class FakeMergeRequest:
+    def __init__(self, changes):
+        self._changes = changes
+        self.iid = 2
+        self.title = "Return one"
+        self.web_url = "http://gitlab.test/group/app/-/merge_requests/2"
+        self.source_branch = "feature"
+        self.target_branch = "main"
+        self.sha = HEAD
+        self.diff_refs = {"head_sha": HEAD, "base_sha": BASE, "start_sha": BASE}
+        self.changes_calls = 0
+
+    def changes(self):
+        self.changes_calls += 1
+        return {"changes": self._changes}
+
+
+class FakePages(list):
+    """Stands in for python-gitlab's GitlabList: iterable, with the `X-Total` count as `total`."""
+
+    @property
+    def total(self):
+        return len(self)
+
+
+class FakeGitLab:
+    """Counts the MR-level calls; files are served from a dict keyed by (path, ref)."""
+
+    def __init__(self, mr, files):
+        self.mr = mr
+        self.project_gets = []
+        self.mr_gets = 0
+        self.files = files
+        self.reads = []
+        self.projects = SimpleNamespace(get=self._get_project)
+
+    def http_list(self, path, iterator=False, per_page=None):
+        return FakePages(self.mr._changes)
+
+    def _get_project(self, project_id, **kwargs):
+        self.project_gets.append(kwargs.get("lazy", False))
+        return SimpleNamespace(
+            id=project_id,
+            mergerequests=SimpleNamespace(get=self._get_mr),
+            files=SimpleNamespace(get=self._get_file, raw=self._raw_file),
+        )
+
+    def _get_mr(self, iid, **kwargs):
+        self.mr_gets += 1
+        return self.mr
+
+    def _content(self, file_path, ref):
+        self.reads.append((file_path, ref))
+        try:
+            return self.files[(file_path, ref)].encode()
+        except KeyError:
+            raise FileNotFoundError(f"{file_path}@{ref}") from None
+
+    def _get_file(self, file_path, ref):
+        return SimpleNamespace(content=base64.b64encode(self._content(file_path, ref)).decode())
+
+    def _raw_file(self, file_path, ref, streamed=False, iterator=False, chunk_size=1024, **kwargs):
+        data = self._content(file_path, ref)
+        return iter([data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]) if iterator else data
+
+
+def test_run_fetches_merge_request_and_changes_once(monkeypatch):
+    mr = FakeMergeRequest([{
+        "old_path": "app/calc.py",
+        "new_path": "app/calc.py",
+        "diff": "@@ -1,2 +1,2 @@\n def one():\n-    return 0\n+    return 1\n",
+    }])
+    gl = FakeGitLab(mr, {
+        ("app/calc.py", HEAD): "def one():\n    return 1\n",
+        ("app/calc.py", BASE): "def one():\n    return 0\n",
+    })
+    monkeypatch.setattr(graph._gl, "_client", gl)
+    monkeypatch.setattr(graph, "_impact", ImpactAnalyzer(gl))
+
+    state = {"gitlab_project_id": "1", "gitlab_mr_id": "2", "errors": []}
+    state.update(graph.get_merge_request_diff(state))
+    state.update(graph.get_impacted_code_entities(state))
+
+    assert not state["errors"]
+    assert gl.mr_gets == 1
+    assert mr.changes_calls == 1
+    assert gl.project_gets and all(gl.project_gets)  # only lazy lookups, never a project GET
+    assert state["mr_web_url"] == mr.web_url
+    files = state["impacted_code_entities"]["files"]
+    assert [f["path"] for f in files] == ["app/calc.py"]
+    assert [b["symbol"]["name"] for b in files[0]["blocks"]] == ["one"]
+
+
+def test_base_side_is_not_read_when_the_head_fetch_fails(monkeypatch):
+    mr = FakeMergeRequest([{
+        "old_path": "app/calc.py",
+        "new_path": "app/calc.py",
+        "diff": "@@ -1,2 +1,2 @@\n def one():\n-    return 0\n+    return 1\n",
+    }])
+    gl = FakeGitLab(mr, {("app/calc.py", BASE): "def one():\n    return 0\n"})
+    monkeypatch.setattr(graph._gl, "_client", gl)
+    analyzer = ImpactAnalyzer(gl)
+    monkeypatch.setattr(graph, "_impact", analyzer)
+
+    state = {"gitlab_project_id": "1", "gitlab_mr_id": "2", "errors": []}
+    state.update(graph.get_merge_request_diff(state))
+    state.update(graph.get_impacted_code_entities(state))
+
+    skipped = state["impacted_code_entities"]["skipped"]
+    assert [s["file"] for s in skipped] == ["app/calc.py"] and "fetch failed" in skipped[0]["reason"]
+    if analyzer._base_pool is not None:
+        analyzer._base_pool.shutdown(wait=True)
+    assert ("app/calc.py", BASE) not in gl.reads
+
+
+def _paginated_run(monkeypatch, changes, files):
+    mr = FakeMergeRequest(changes)
+    gl = FakeGitLab(mr, files)
+    monkeypatch.setattr(settings, "GITLAB_PAGINATED_DIFFS", True)
+    monkeypatch.setattr(graph._gl, "_client", gl)
+    monkeypatch.setattr(graph, "_impact", ImpactAnalyzer(gl))
+
+    state = {"gitlab_project_id": "1", "gitlab_mr_id": "2", "errors": []}
+    state.update(graph.get_merge_request_diff(state))
+    state.update(graph.get_impacted_code_entities(state))
+    return state
+
+
+def test_capped_paginated_run_reports_every_diff_of_the_mr(monkeypatch):
+    changes = [
+        {"old_path": f"app/m{i}.py", "new_path": f"app/m{i}.py", "new_file": True, "diff": "@@ -0,0 +1 @@\n+x = 1\n"}
+        for i in range(3)
+    ]
+    monkeypatch.setattr(settings, "ANALYZER_MAX_FILES", 1)
+
+    state = _paginated_run(monkeypatch, changes, {("app/m0.py", HEAD): "x = 1\n"})
+
+    assert not state["errors"]
+    assert state["impacted_code_entities"]["truncated"]["limit"] == "ANALYZER_MAX_FILES"
+    # The cap reads one entry past the limit to know it was reached, then stops paging.
+    assert [d["new_path"] for d in state["merge_request_diffs"]] == ["app/m0.py", "app/m1.py"]
+    assert state["merge_request_diff_count"] == 3
+    assert graph.summarize_changes(state["merge_request_diffs"], state["merge_request_diff_count"]).startswith("Files: 2 of 3 ")
+
+
+def test_empty_paginated_run_reports_no_diffs(monkeypatch):
+    state = _paginated_run(monkeypatch, [], {})
+
+    assert state["errors"] == ["No diffs found for the given MR."]
+    assert state["merge_request_diff_count"] == 0
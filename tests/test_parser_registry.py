@@ -0,0 +1,31 @@
+import pytest
+
+from app.config import settings
+from app.services.code_analyzer.registry import EXTERNAL, ParserRegistry, ParserSpec, default_registry
+
+
+def _spec(**kwargs):
+    return ParserSpec("toy", "toy", (".toy",), lambda content: [], **kwargs)
+
+
+def test_python_parses_inline_by_default():
+    spec = default_registry().for_extension(".py")
+    assert spec.name == "python-ast" and not spec.use_process_pool
+
+
+def test_timeout_override_for_inline_parser_is_rejected(monkeypatch):
+    monkeypatch.setattr(settings, "PARSER_LIMITS", {"toy": {"timeout_secs": 5}})
+    with pytest.raises(ValueError, match="use_process_pool"):
+        ParserRegistry().register(_spec())
+
+
+def test_timeout_override_for_external_parser_is_rejected(monkeypatch):
+    monkeypatch.setattr(settings, "PARSER_LIMITS", {"toy": {"timeout_secs": 5}})
+    with pytest.raises(ValueError, match="own timeout"):
+        ParserRegistry().register(_spec(mode=EXTERNAL))
+
+
+def test_timeout_override_applies_with_process_pool(monkeypatch):
+    monkeypatch.setattr(settings, "PARSER_LIMITS", {"toy": {"use_process_pool": True, "timeout_secs": 5}})
+    spec = ParserRegistry().register(_spec())
+    assert spec.use_process_pool and spec.timeout_secs == 5.0
@@ -0,0 +1,29 @@
+import pytest
+
+from app.services.path_classifier import DEFAULT_LANGUAGES, DEFAULT_RULES, PathClassifier
+
+classifier = PathClassifier(DEFAULT_RULES, DEFAULT_LANGUAGES)
+
+
+@pytest.mark.parametrize("path", [
+    "src/Orders/OrderServiceTests.cs",
+    "src/Orders/OrderServiceTest.cs",
+    "src/Orders/Order_test.cs",
+    "src/Orders/Order.tests.cs",
+    "Tests.cs",
+    "src/App.UnitTests/Helpers.cs",
+])
+def test_csharp_test_files_are_skipped(path):
+    assert classifier.classify({"new_path": path}).rule == "tests"
+
+
+@pytest.mark.parametrize("path", [
+    "src/Contests/ContestService.cs",
+    "src/Contests/Contest.cs",
+    "src/Contests/Contests.cs",
+    "src/Feeds/Latest.cs",
+    "src/Legal/Protest.cs",
+])
+def test_names_ending_in_test_letters_are_analyzed(path):
+    decision = classifier.classify({"new_path": path})
+    assert decision.skip is None and decision.language == "csharp"
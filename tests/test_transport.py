@@ -0,0 +1,36 @@
+import pytest
+import requests
+
+from app.clients import transport
+from app.clients.transport import PooledAdapter, RetryBudget
+
+
+def _session(base_url, monkeypatch):
+    monkeypatch.setattr(transport, "backoff_delay", lambda attempt, base=None, cap=None: 0.0)
+    adapter = PooledAdapter(base_url.split("//")[1], max_retries=3, budget=RetryBudget(min_retries=100))
+    adapter.limiter = None
+    session = requests.Session()
+    session.mount(base_url + "/", adapter)
+    return session
+
+
+@pytest.mark.parametrize("status,headers", [(429, {}), (429, {"Retry-After": "0"}), (503, {"Retry-After": "0"})])
+def test_rejected_post_is_retried(server, monkeypatch, status, headers):
+    base_url, state = server
+    state["script"] = [(status, headers)]
+
+    response = _session(base_url, monkeypatch).post(base_url + "/rest/api/2/search", json={"jql": "x"})
+
+    assert response.status_code == 200
+    assert state["methods"] == ["POST", "POST"]
+
+
+@pytest.mark.parametrize("status", [502, 503, 504])
+def test_transient_post_failure_is_not_retried(server, monkeypatch, status):
+    base_url, state = server
+    state["script"] = [(status, {})]
+
+    response = _session(base_url, monkeypatch).post(base_url + "/rest/api/2/issue", json={})
+
+    assert response.status_code == status
+    assert state["methods"] == ["POST"]
@@ -0,0 +1,86 @@
+import sys
+
+import pytest
+
+from app.services.code_analyzer import cs_code_analyzer
+from app.services.code_analyzer.worker_pool import AnalyzerWorkerError, AnalyzerWorkerPool, AnalyzerWorkerTimeout
+
+STUB = [sys.executable, "-m", "app.services.code_analyzer.stub_worker"]
+SOURCE = "namespace Shop\n{\n    public class Cart\n    {\n        Item First;\n    }\n}\n"
+
+
+@pytest.fixture
+def pool():
+    pools = []
+
+    def make(command=STUB, **kwargs):
+        pools.append(AnalyzerWorkerPool(command, **{"size": 1, "request_timeout": 10.0, **kwargs}))
+        return pools[-1]
+
+    yield make
+    for p in pools:
+        p.close()
+
+
+def test_analyze_returns_the_workers_symbols(pool):
+    workers = pool(size=2)
+
+    symbols = workers.analyze(SOURCE)
+
+    assert [(s["Kind"], s["QualifiedName"], s["StartLine"], s["EndLine"]) for s in symbols] == [
+        ("namespace", "Shop", 1, 7),
+        ("class", "Shop.Cart", 3, 6),
+    ]
+    assert symbols[1]["References"] == ["First", "Item"]
+    assert workers.stats() == {"size": 2, "alive": 1, "idle": 2, "restarts": 0}
+
+
+def test_worker_killed_while_idle_is_restarted_on_next_checkout(pool):
+    workers = pool()
+    workers.analyze(SOURCE)
+    (worker,) = workers._workers
+    worker._proc.kill()
+    worker._proc.wait()
+
+    assert [s["Name"] for s in workers.analyze(SOURCE)] == ["Shop", "Cart"]
+    assert workers.stats() == {"size": 1, "alive": 1, "idle": 1, "restarts": 1}
+
+
+def test_worker_crashing_mid_request_fails_it_and_is_restarted(pool):
+    workers = pool(command=[sys.executable, "-c", "import sys; sys.stdin.readline(); sys.exit(3)"])
+
+    with pytest.raises(AnalyzerWorkerError, match="worker exited"):
+        workers.analyze(SOURCE)
+    with pytest.raises(AnalyzerWorkerError, match="worker exited"):
+        workers.analyze(SOURCE)
+
+    assert workers.stats()["restarts"] == 1
+
+
+def test_slow_worker_times_out_and_is_replaced(pool):
+    workers = pool(command=[*STUB, "--delay", "5"], request_timeout=0.5)
+
+    with pytest.raises(AnalyzerWorkerTimeout):
+        workers.analyze(SOURCE)
+
+    (worker,) = workers._workers
+    assert not worker.alive()
+    assert workers.stats()["idle"] == 1
+
+
+def test_worker_failure_falls_back_to_the_one_shot_analyzer(pool, monkeypatch):
+    calls = []
+
+    def check_output(args, **kwargs):
+        calls.append((args, kwargs["input"]))
+        return '[{"Type": "class", "Name": "Cart", "StartLine": 3, "EndLine": 6}]'
+
+    monkeypatch.setattr(cs_code_analyzer, "_pool", pool(command=[sys.executable, "-c", "pass"]))
+    monkeypatch.setattr(cs_code_analyzer.settings, "CS_ANALYZER_WORKERS", 1)
+    monkeypatch.setattr(cs_code_analyzer.settings, "cs_code_analyzer", "CSharpCodeParser.dll")
+    monkeypatch.setattr(cs_code_analyzer.subprocess, "check_output", check_output)
+
+    analysis = cs_code_analyzer.analyze_cs_file_with_roslyn(SOURCE)
+
+    assert calls == [(["dotnet", "CSharpCodeParser.dll", "-"], SOURCE)]
+    assert [(s.kind, s.name, s.span.start_line) for s in analysis["symbols"]] == [("class", "Cart", 3)]